@@ -1,3 +1,20 @@
 from django.contrib import admin
+from django.utils import timezone
 
-# Register your models here.
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "priority", "attempts", "run_after", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("name",)
+    ordering = ("-id",)
+    readonly_fields = ("attempts", "locked_at", "locked_by", "last_error", "created_at", "finished_at")
+    actions = ["retry"]
+
+    @admin.action(description="Retry selected jobs now")
+    def retry(self, request, queryset):
+        queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None
+        )
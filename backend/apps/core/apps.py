@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Register the background jobs of every app, see core/jobs.py
+        autodiscover_modules("jobs")
+
+        # Invalidation of the authentication cache, see core/auth_cache.py
+        from . import signals  # noqa: F401
+
+        # Count the queries of the requests MetricsMiddleware records, on
+        # every connection (each thread has its own), see core/metrics.py
+        from core.metrics import install_query_recorder
+        connection_created.connect(install_query_recorder, dispatch_uid="core.metrics")
@@ -0,0 +1,211 @@
+"""
+Cache of the credentials -> user resolution of core/authentication.py.
+
+Token keys and JWT user ids resolve to the user without a query while
+their entry lives: entries are kept in a bounded in-process LRU for
+AUTH_CACHE_TIMEOUT seconds (0, off, by default) and, with AUTH_CACHE_ALIAS,
+in that Django cache (shared by the processes) for AUTH_CACHE_SHARED_TIMEOUT
+seconds.
+
+Saving or deleting a user, deleting a token and logging out drop the
+entries involved (see core/signals.py), so a password change, deactivation
+or logout applies at once in this process and in the shared cache. Other
+processes may answer from their own copy for up to AUTH_CACHE_TIMEOUT
+seconds, which also bounds changes made without signals (``update()``).
+
+No secret is cached: token entries hold the user pk under a hash of the
+token key, and user entries only the USER_FIELDS values. Users are rebuilt
+for every request with the other fields deferred, so no instance is shared
+between requests and reading e.g. the password hash queries the row.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# Cached user fields besides the pk, USER_ID_FIELD and USERNAME_FIELD
+USER_FIELDS = ("is_active", "is_staff", "is_superuser")
+
+
+class LocalCache:
+    """
+    Thread-safe LRU mapping whose entries expire.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout, max_entries):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local = LocalCache()
+
+
+def is_enabled():
+    return settings.AUTH_CACHE_TIMEOUT > 0
+
+
+def shared():
+    return caches[settings.AUTH_CACHE_ALIAS] if settings.AUTH_CACHE_ALIAS else None
+
+
+def token_key(key):
+    # Token keys are credentials, keep them out of the cache server
+    return f"auth:token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def user_key(pk):
+    return f"auth:user:{pk}"
+
+
+def jwt_user_key(user_id):
+    return f"auth:jwt:{user_id}"
+
+
+def get(key):
+    value = local.get(key)
+    if value is None and shared() is not None:
+        value = shared().get(key)
+        if value is not None:
+            local.set(key, value, settings.AUTH_CACHE_TIMEOUT, settings.AUTH_CACHE_MAX_ENTRIES)
+    return value
+
+
+async def aget(key):
+    value = local.get(key)
+    if value is None and shared() is not None:
+        value = await shared().aget(key)
+        if value is not None:
+            local.set(key, value, settings.AUTH_CACHE_TIMEOUT, settings.AUTH_CACHE_MAX_ENTRIES)
+    return value
+
+
+def store(entries):
+    for key, value in entries.items():
+        local.set(key, value, settings.AUTH_CACHE_TIMEOUT, settings.AUTH_CACHE_MAX_ENTRIES)
+    if shared() is not None:
+        shared().set_many(entries, settings.AUTH_CACHE_SHARED_TIMEOUT)
+
+
+async def astore(entries):
+    for key, value in entries.items():
+        local.set(key, value, settings.AUTH_CACHE_TIMEOUT, settings.AUTH_CACHE_MAX_ENTRIES)
+    if shared() is not None:
+        await shared().aset_many(entries, settings.AUTH_CACHE_SHARED_TIMEOUT)
+
+
+def delete(*keys):
+    for key in keys:
+        local.delete(key)
+    if shared() is not None:
+        shared().delete_many(keys)
+
+
+def user_fields(model):
+    """
+    Return the attnames of the cached fields of a user model, in field order.
+    """
+    names = {model._meta.pk.name, jwt_settings.USER_ID_FIELD, model.USERNAME_FIELD, *USER_FIELDS}
+    return [field.attname for field in model._meta.concrete_fields if field.name in names]
+
+
+def dump(user):
+    return tuple(getattr(user, attname) for attname in user_fields(type(user)))
+
+
+def load(values):
+    model = get_user_model()
+    return model.from_db(DEFAULT_DB_ALIAS, user_fields(model), values)
+
+
+def load_token(key, user):
+    token = Token.from_db(DEFAULT_DB_ALIAS, ["key", "user_id"], [key, user.pk])
+    token.user = user
+    return token
+
+
+# Token authentication: token key -> user pk, user pk -> user values
+
+def get_token(key):
+    """
+    Return the cached ``(user, token)`` of a token key, or None.
+    """
+    user_pk = get(token_key(key))
+    user = user_pk is not None and get(user_key(user_pk))
+    if not user:
+        return None
+    user = load(user)
+    return user, load_token(key, user)
+
+
+async def aget_token(key):
+    user_pk = await aget(token_key(key))
+    user = user_pk is not None and await aget(user_key(user_pk))
+    if not user:
+        return None
+    user = load(user)
+    return user, load_token(key, user)
+
+
+def token_entries(user, token):
+    return {token_key(token.key): user.pk, user_key(user.pk): dump(user)}
+
+
+# JWT authentication: USER_ID_FIELD value -> user values
+
+def get_jwt_user(user_id):
+    user = get(jwt_user_key(user_id))
+    return None if user is None else load(user)
+
+
+async def aget_jwt_user(user_id):
+    user = await aget(jwt_user_key(user_id))
+    return None if user is None else load(user)
+
+
+def jwt_user_entries(user):
+    return {jwt_user_key(getattr(user, jwt_settings.USER_ID_FIELD)): dump(user)}
+
+
+def forget_user(user):
+    """
+    Drop the cached resolutions to ``user``.
+    """
+    delete(user_key(user.pk), jwt_user_key(getattr(user, jwt_settings.USER_ID_FIELD)))
+
+
+def forget_token(key):
+    delete(token_key(key))
@@ -0,0 +1,303 @@
+"""
+Authentication classes of the API (DEFAULT_AUTHENTICATION_CLASSES).
+
+They behave like the DRF / simplejwt classes they extend and add an
+``aauthenticate()`` coroutine, so that async views resolve the user with
+async queries instead of blocking the event loop. aauthenticate() runs the
+classes of DEFAULT_AUTHENTICATION_CLASSES in order, like a DRF view does.
+
+Token and JWT users are resolved through core/auth_cache.py, without a
+query while their entry is cached. With JWT_STATELESS, views using
+StatelessUserMixin get a TokenUser built from the JWT claims instead.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt import authentication as jwt_authentication
+from rest_framework_simplejwt import models as jwt_models
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core import auth_cache
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """
+    DRF token authentication: ``Authorization: Token <key>``.
+    """
+
+    def get_key(self, request):
+        """
+        Return the token key of the Authorization header, None when the
+        header is not a token header.
+        """
+        auth = authentication.get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _('Invalid token header. No credentials provided.')
+            raise exceptions.AuthenticationFailed(msg)
+        elif len(auth) > 2:
+            msg = _('Invalid token header. Token string should not contain spaces.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            msg = _('Invalid token header. Token string should not contain invalid characters.')
+            raise exceptions.AuthenticationFailed(msg)
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        return None if key is None else self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request):
+        key = self.get_key(request)
+        return None if key is None else await self.aauthenticate_credentials(key)
+
+    def authenticate_credentials(self, key):
+        if not auth_cache.is_enabled():
+            return super().authenticate_credentials(key)
+        cached = auth_cache.get_token(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        auth_cache.store(auth_cache.token_entries(user, token))
+        return (user, token)
+
+    async def aauthenticate_credentials(self, key):
+        if auth_cache.is_enabled():
+            cached = await auth_cache.aget_token(key)
+            if cached is not None:
+                return cached
+
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        if auth_cache.is_enabled():
+            await auth_cache.astore(auth_cache.token_entries(token.user, token))
+        return (token.user, token)
+
+
+class SessionAuthentication(authentication.SessionAuthentication):
+    """
+    DRF session authentication, the user set by AuthenticationMiddleware.
+    """
+
+    async def aauthenticate(self, request):
+        # Only safe methods are served asynchronously, CSRF does not apply
+        auser = getattr(request, 'auser', None)
+        user = await auser() if auser else None
+        if not user or not user.is_active:
+            return None
+        return (user, None)
+
+
+class JWTAuthentication(jwt_authentication.JWTAuthentication):
+    """
+    simplejwt authentication: ``Authorization: Bearer <access token>``.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if not auth_cache.is_enabled() or user_id is None:
+            return super().get_user(validated_token)
+
+        user = auth_cache.get_jwt_user(user_id)
+        if user is not None:
+            return self.check_user(user, validated_token)
+        user = super().get_user(validated_token)
+        auth_cache.store(auth_cache.jwt_user_entries(user))
+        return user
+
+    async def aget_user(self, validated_token):
+        """
+        Async get_user().
+        """
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise jwt_authentication.InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        if auth_cache.is_enabled():
+            user = await auth_cache.aget_jwt_user(user_id)
+            if user is not None:
+                return self.check_user(user, validated_token)
+
+        try:
+            user = await self.user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise exceptions.AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        user = self.check_user(user, validated_token)
+        if auth_cache.is_enabled():
+            await auth_cache.astore(auth_cache.jwt_user_entries(user))
+        return user
+
+    def check_user(self, user, validated_token):
+        """
+        Apply the checks of get_user() to a user found without it.
+        """
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise exceptions.AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class TokenUser(jwt_models.TokenUser):
+    """
+    User of a stateless JWT: id, username, is_staff and follow_version are
+    read from the claims (see userbase/serializers/jwt.py), the other
+    ``row_fields`` from the user row, loaded on first use. Loading it is a
+    sync query. Other attributes raise AttributeError.
+    """
+
+    row_fields = (
+        "follow_version", "followed_count", "email", "first_name", "last_name", "date_joined", "last_login",
+    )
+
+    @cached_property
+    def id(self):
+        # The claim is a string, views compare and hash the model's value
+        field = get_user_model()._meta.get_field(jwt_settings.USER_ID_FIELD)
+        return field.to_python(self.token[jwt_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def user(self):
+        model = get_user_model()
+        try:
+            return model.objects.get(**{jwt_settings.USER_ID_FIELD: self.id})
+        except model.DoesNotExist as e:
+            raise exceptions.AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+    def claim(self, name):
+        # Tokens issued without the claim fall back to the row
+        return self.token[name] if name in self.token else getattr(self.user, name)
+
+    @cached_property
+    def username(self):
+        return self.claim("username")
+
+    @cached_property
+    def is_staff(self):
+        return self.claim("is_staff")
+
+    @cached_property
+    def is_superuser(self):
+        return self.claim("is_superuser")
+
+    def __getattr__(self, name):
+        if name not in self.row_fields:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return self.claim(name)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the user query: request.user is a TokenUser.
+    A deactivated user is accepted until the access token expires.
+    """
+
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            raise jwt_authentication.InvalidToken(_("Token contained no recognizable user identification"))
+        return TokenUser(validated_token)
+
+    async def aget_user(self, validated_token):
+        return self.get_user(validated_token)
+
+
+def get_authenticators(stateless=False):
+    """
+    Return the DEFAULT_AUTHENTICATION_CLASSES instances, JWT ones made
+    stateless if ``stateless`` and JWT_STATELESS are set.
+    """
+    stateless = stateless and settings.JWT_STATELESS
+    return [
+        StatelessJWTAuthentication() if stateless and issubclass(auth, JWTAuthentication) else auth()
+        for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ]
+
+
+class StatelessUserMixin:
+    """
+    For API views that only use ``request.user.pk``: with JWT_STATELESS, JWT
+    requests are authenticated from the token claims, without loading the
+    user row. A query of the view finding no user row (the user was deleted
+    since the token was issued) is then a 401, as with a stateful JWT.
+    """
+
+    def get_authenticators(self):
+        return get_authenticators(stateless=True)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, get_user_model().DoesNotExist):
+            exc = exceptions.AuthenticationFailed(_("User not found"), code="user_not_found")
+        return super().handle_exception(exc)
+
+
+async def aauthenticate(request, stateless=False):
+    """
+    Authenticate a Django request with DEFAULT_AUTHENTICATION_CLASSES and
+    return ``(user, auth)``, AnonymousUser when no class accepts it. Classes
+    without aauthenticate() run in a thread. Invalid credentials raise
+    AuthenticationFailed. ``stateless`` is that of get_authenticators().
+    """
+    # APIClient.force_authenticate(), as honoured by DRF's Request
+    force_user = getattr(request, '_force_auth_user', None)
+    force_token = getattr(request, '_force_auth_token', None)
+    if force_user is not None or force_token is not None:
+        return force_user, force_token
+
+    for authenticator in get_authenticators(stateless):
+        if hasattr(authenticator, 'aauthenticate'):
+            result = await authenticator.aauthenticate(request)
+        else:
+            result = await sync_to_async(authenticator.authenticate)(Request(request))
+        if result is not None:
+            return result
+    return AnonymousUser(), None
+
+
+def authenticate_header(request):
+    """
+    Return the WWW-Authenticate value of a 401, None when the first class
+    has none (the error is then a 403), like APIView.
+    """
+    authenticators = get_authenticators()
+    return authenticators[0].authenticate_header(request) if authenticators else None
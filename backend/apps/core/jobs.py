@@ -0,0 +1,234 @@
+"""
+Database-backed background jobs.
+
+Apps register job functions in their ``jobs.py`` module (imported when the
+app registry is ready) and enqueue them by name:
+
+    from core import jobs
+
+    @jobs.register("organization.process_logo")
+    def process_logo(organization_id):
+        ...
+
+    jobs.enqueue("organization.process_logo", {"organization_id": 1})
+
+A job row written inside a transaction becomes visible to the workers when
+the transaction commits, so a job never runs against uncommitted data.
+Workers (``manage.py run_jobs``) claim due jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED`` where the backend supports it and with
+a conditional UPDATE per job elsewhere (SQLite), so two workers never run
+the same job. A running job refreshes its ``locked_at`` every
+JOBS_HEARTBEAT_INTERVAL seconds; jobs that stop doing so for
+JOBS_LOCK_TIMEOUT seconds belong to a dead worker and are requeued, which
+counts as an attempt.
+"""
+import logging
+import random
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def register(name):
+    """
+    Register the decorated function as the job ``name``.
+    """
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_job_function(name):
+    return _registry[name]
+
+
+def enqueue(name, payload=None, priority=0, delay=None, max_attempts=None):
+    """
+    Queue a job and return it. With JOBS_EAGER set, it is run once the
+    current transaction commits instead, in the calling process.
+    """
+    if name not in _registry:
+        raise KeyError(f"Unknown job: {name}")
+    job = Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_after=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: _run_eagerly(job), robust=True)
+    return job
+
+
+def _run_eagerly(job):
+    claimed = Job.objects.filter(pk=job.pk, status=Job.Status.QUEUED).update(
+        status=Job.Status.RUNNING, locked_at=timezone.now(), locked_by="eager"
+    )
+    if claimed:
+        run_job(job, "eager")
+
+
+def requeue_stale_jobs():
+    """
+    Put back jobs whose worker died: running without a heartbeat for
+    JOBS_LOCK_TIMEOUT seconds. The lost run counts as an attempt, jobs out
+    of attempts are failed. Return the (requeued, failed) counts.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING, locked_at__lt=now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    )
+    lost = {"attempts": F("attempts") + 1, "locked_at": None, "locked_by": ""}
+    failed = stale.filter(attempts__gte=F("max_attempts") - 1).update(
+        status=Job.Status.FAILED, finished_at=now, last_error="Worker stopped responding.", **lost
+    )
+    requeued = stale.update(status=Job.Status.QUEUED, **lost)
+    return requeued, failed
+
+
+def touch_job(job, worker):
+    """
+    Refresh the lock of a job ``worker`` is running. Return False when the
+    job is no longer locked by it.
+    """
+    return bool(
+        Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, locked_by=worker).update(
+            locked_at=timezone.now()
+        )
+    )
+
+
+@contextmanager
+def heartbeat(job, worker):
+    """
+    Call touch_job() every JOBS_HEARTBEAT_INTERVAL seconds from a thread
+    while the block runs.
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.JOBS_HEARTBEAT_INTERVAL):
+                try:
+                    if not touch_job(job, worker):
+                        break
+                except DatabaseError:
+                    logger.warning("Heartbeat of job %s failed", job, exc_info=True)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def claim_jobs(worker, limit=1):
+    """
+    Lock up to ``limit`` due jobs for ``worker``, highest priority first,
+    and return them.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now).order_by(
+        "-priority", "run_after", "id"
+    )
+    using = router.db_for_write(Job)
+
+    if connections[using].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=using):
+            jobs = list(due.select_for_update(skip_locked=True)[:limit])
+            Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=Job.Status.RUNNING, locked_at=now, locked_by=worker
+            )
+    else:
+        # Optimistic claim: only the worker whose UPDATE still sees the job
+        # queued gets it
+        jobs = []
+        for job in due[:limit * 2]:
+            claimed = Job.objects.filter(pk=job.pk, status=Job.Status.QUEUED).update(
+                status=Job.Status.RUNNING, locked_at=now, locked_by=worker
+            )
+            if claimed:
+                jobs.append(job)
+                if len(jobs) == limit:
+                    break
+
+    for job in jobs:
+        job.status, job.locked_at, job.locked_by = Job.Status.RUNNING, now, worker
+    return jobs
+
+
+def retry_delay(attempts):
+    """
+    Return the backoff before the next attempt: JOBS_RETRY_BACKOFF seconds
+    doubled per failed attempt, capped at an hour, with 10% jitter.
+    """
+    delay = min(settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), 3600)
+    return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+
+def run_job(job, worker):
+    """
+    Run a job claimed by ``worker`` and record the outcome, unless the job
+    was requeued and claimed by another worker meanwhile. Return True on
+    success.
+    """
+    job.attempts += 1
+    try:
+        with heartbeat(job, worker):
+            get_job_function(job.name)(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.Status.QUEUED
+            job.run_after = timezone.now() + retry_delay(job.attempts)
+        else:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+        logger.warning("Job %s failed (attempt %s/%s)", job, job.attempts, job.max_attempts, exc_info=True)
+        success = False
+    else:
+        job.status = Job.Status.DONE
+        job.finished_at = timezone.now()
+        job.last_error = ""
+        success = True
+    job.locked_at, job.locked_by = None, ""
+    Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, locked_by=worker).update(
+        attempts=job.attempts,
+        status=job.status,
+        run_after=job.run_after,
+        finished_at=job.finished_at,
+        last_error=job.last_error,
+        locked_at=None,
+        locked_by="",
+    )
+    return success
+
+
+def purge_finished_jobs(days=None):
+    """
+    Delete jobs that finished more than ``days`` (JOBS_RETENTION_DAYS) ago.
+    """
+    days = settings.JOBS_RETENTION_DAYS if days is None else days
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.Status.DONE, Job.Status.FAILED],
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
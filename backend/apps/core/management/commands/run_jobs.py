@@ -0,0 +1,110 @@
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from core.jobs import claim_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    """
+    Run queued background jobs (see core/jobs.py).
+
+    Without --burst the worker polls until it receives SIGINT/SIGTERM and
+    then finishes its running jobs. The cron container runs it in burst mode
+    every minute (see CRONJOBS in settings.py).
+
+    Usage:
+        python manage.py run_jobs --concurrency 4
+        python manage.py run_jobs --burst --max-time 55
+    """
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Jobs run at the same time, each on its own thread (default: 1)'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no job is due'
+        )
+        parser.add_argument(
+            '--max-time',
+            type=float,
+            help='Stop claiming jobs after this many seconds'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the queue is empty (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.counts = {'done': 0, 'failed': 0}
+        self.lock = threading.Lock()
+        self.deadline = time.monotonic() + options['max_time'] if options['max_time'] else None
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+
+        requeued, failed = requeue_stale_jobs()
+        if requeued or failed:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale jobs, failed {failed}'))
+
+        # Finish the running jobs on SIGINT/SIGTERM instead of dying mid-job
+        handlers = {
+            signum: signal.signal(signum, lambda *args: self.stop.set())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            concurrency = max(1, options['concurrency'])
+            if concurrency == 1:
+                self.work(worker, options)
+            else:
+                threads = [
+                    threading.Thread(target=self.work, args=(f'{worker}:{i}', options), daemon=True)
+                    for i in range(concurrency)
+                ]
+                for thread in threads:
+                    thread.start()
+                while any(thread.is_alive() for thread in threads):
+                    for thread in threads:
+                        thread.join(0.5)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(f"Jobs done: {self.counts['done']}, failed: {self.counts['failed']}")
+
+    def work(self, worker, options):
+        """
+        Claim and run jobs one at a time until stopped.
+        """
+        try:
+            while not self.stop.is_set():
+                if self.deadline and time.monotonic() > self.deadline:
+                    break
+                jobs = claim_jobs(worker)
+                if not jobs:
+                    if options['burst']:
+                        break
+                    self.stop.wait(options['sleep'])
+                    continue
+                for job in jobs:
+                    outcome = 'done' if run_job(job, worker) else 'failed'
+                    with self.lock:
+                        self.counts[outcome] += 1
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'{job}: {outcome}')
+                close_old_connections()
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
@@ -0,0 +1,71 @@
+"""
+Streaming readers for the data loading management commands.
+"""
+import csv
+import json
+
+
+def iter_json_array(file, chunk_size=65536):
+    """
+    Yield the objects of a JSON array one by one without loading the whole
+    document into memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size)
+    position = 0
+    started = False
+    eof = not buffer
+
+    while True:
+        # Skip whitespace and separators, reading more input when needed
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = file.read(chunk_size), 0
+            eof = not buffer
+
+        if position >= len(buffer):
+            if started:
+                raise ValueError("Unexpected end of JSON array")
+            return
+        if not started:
+            if buffer[position] != "[":
+                raise ValueError("Expected a JSON array")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = file.read(chunk_size)
+            eof = not more
+            buffer, position = buffer[position:] + more, 0
+            continue
+
+        yield item
+        position = end
+        if position > chunk_size:
+            buffer, position = buffer[position:], 0
+
+
+def iter_records(path, file_format):
+    """
+    Stream organization records from a JSON array, NDJSON or CSV file.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        if file_format == 'json':
+            yield from iter_json_array(file)
+        elif file_format == 'ndjson':
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(file):
+                yield row
@@ -0,0 +1,239 @@
+"""
+Request metrics in the Prometheus text exposition format.
+
+MetricsMiddleware (core/middleware.py) records, per resolved URL name and
+method, the request latency, the number of database queries and the time
+spent in them, and the response size as histograms, and counts requests per
+status. Observations go to an in-process registry: a dict lookup, a bisect
+and a few additions under a lock.
+
+With METRICS_DIR set, every process writes a snapshot of its registry to a
+file of that directory at most every METRICS_FLUSH_INTERVAL seconds, and
+``/metrics`` adds up the snapshots of all processes, so any worker of a
+multi-process server answers for all of them. Snapshots of exited workers are
+kept (counters never go down); empty the directory when the server starts.
+"""
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name: (help, label names, buckets); buckets are None for counters
+METRICS = {
+    "http_request_duration_seconds": (
+        "Request latency in seconds.", ("view", "method"), LATENCY_BUCKETS
+    ),
+    "http_request_db_queries": (
+        "Database queries per request.", ("view", "method"), (0, 1, 2, 3, 5, 10, 20, 50, 100)
+    ),
+    "http_request_db_duration_seconds": (
+        "Time per request spent in database queries, in seconds.", ("view", "method"), LATENCY_BUCKETS
+    ),
+    "http_response_size_bytes": (
+        "Response body size in bytes.",
+        ("view", "method"),
+        (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+    ),
+    "http_requests_total": (
+        "Requests by view, method and status.", ("view", "method", "status"), None
+    ),
+}
+
+METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+
+# [queries, seconds] of the current request, see record_query()
+request_queries = ContextVar("request_queries", default=None)
+
+
+class Registry:
+    """
+    Histograms and counters of one process.
+
+    A histogram is kept as a list of per-bucket counts (the last one is +Inf)
+    followed by the sum of the observed values.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.values = {}
+            self.path = None
+            self.flushed_at = time.monotonic()
+
+    def after_fork(self):
+        # A forked worker starts empty (the parent reports its own values),
+        # with a new lock in case another thread held it during the fork
+        self.lock = threading.Lock()
+        self.reset()
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self.lock:
+            series = self.values.get((name, labels))
+            if series is None:
+                series = self.values[(name, labels)] = [0] * (len(buckets) + 2)
+            series[bisect_left(buckets, value)] += 1
+            series[-1] += value
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.values[(name, labels)] = self.values.get((name, labels), 0) + value
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                [name, list(labels), list(value) if isinstance(value, list) else value]
+                for (name, labels), value in self.values.items()
+            ]
+
+    def flush(self, directory, force=False):
+        """
+        Write the snapshot to this process' file of ``directory``, at most
+        every METRICS_FLUSH_INTERVAL seconds unless ``force``.
+        """
+        if not force and time.monotonic() - self.flushed_at < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.flushed_at = time.monotonic()
+        if self.path is None:
+            # Unique per process start, a reused pid must not overwrite the
+            # file of an exited worker
+            self.path = os.path.join(directory, f"metrics-{os.getpid()}-{uuid.uuid4().hex[:8]}.json")
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, self.path)
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry.after_fork)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting the queries of the current request.
+    """
+    counters = request_queries.get()
+    if counters is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        counters[0] += 1
+        counters[1] += time.perf_counter() - started
+
+
+def install_query_recorder(sender=None, connection=None, **kwargs):
+    """
+    Add record_query() to a connection (connection_created receiver). It
+    passes queries through untouched outside recorded requests.
+    """
+    # The signal is sent again every time a thread's connection reconnects
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def observe_request(request, response, duration, queries):
+    """
+    Record a finished request.
+    """
+    match = request.resolver_match
+    view = match.view_name if match else "unresolved"
+    # Any method name is accepted, keep the label values bounded
+    method = request.method if request.method in METHODS else "other"
+    labels = (view, method)
+
+    registry.observe("http_request_duration_seconds", labels, duration)
+    registry.observe("http_request_db_queries", labels, queries[0])
+    registry.observe("http_request_db_duration_seconds", labels, queries[1])
+    if not response.streaming:
+        # Streamed bodies (exports) have no size until they are sent
+        registry.observe("http_response_size_bytes", labels, len(response.content))
+    registry.inc("http_requests_total", (view, method, str(response.status_code)))
+
+    if settings.METRICS_DIR:
+        registry.flush(settings.METRICS_DIR)
+
+
+def collect():
+    """
+    Return ``{(name, labels): value}`` for this process, or added up over
+    the processes sharing METRICS_DIR.
+    """
+    if not settings.METRICS_DIR:
+        snapshots = [registry.snapshot()]
+    else:
+        registry.flush(settings.METRICS_DIR, force=True)
+        snapshots = []
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, "metrics-*.json")):
+            try:
+                with open(path) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                # Removed since the glob
+                continue
+
+    values = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot:
+            if name not in METRICS:
+                continue
+            key = (name, tuple(labels))
+            if isinstance(value, list):
+                total = values.setdefault(key, [0] * len(value))
+                for index, count in enumerate(value):
+                    total[index] += count
+            else:
+                values[key] = values.get(key, 0) + value
+    return values
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_labels(names, values, **extra):
+    pairs = [*zip(names, values), *extra.items()]
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def render(values):
+    """
+    Return ``values`` (see collect()) in the Prometheus text format.
+    """
+    lines = []
+    for name, (description, label_names, buckets) in METRICS.items():
+        series = sorted((labels, value) for (metric, labels), value in values.items() if metric == name)
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {'counter' if buckets is None else 'histogram'}")
+        for labels, value in series:
+            if buckets is None:
+                lines.append(f"{name}{format_labels(label_names, labels)} {format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, float("inf")), value):
+                cumulative += count
+                le = format_labels(label_names, labels, le=format_value(float(bound)))
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(label_names, labels)} {format_value(float(value[-1]))}")
+            lines.append(f"{name}_count{format_labels(label_names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
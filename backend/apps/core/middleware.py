@@ -0,0 +1,52 @@
+"""
+Request metrics, see core/metrics.py.
+"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core import metrics
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, database queries and response size of every
+    request, when METRICS_ENABLED. Keep it first in MIDDLEWARE so that the
+    other middleware are part of the measure.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = [0, 0.0]
+        token = metrics.request_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.request_queries.reset(token)
+        metrics.observe_request(request, response, time.perf_counter() - started, queries)
+        return response
+
+    async def __acall__(self, request):
+        # The context, and so the counters, is copied into sync_to_async threads
+        queries = [0, 0.0]
+        token = metrics.request_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.request_queries.reset(token)
+        metrics.observe_request(request, response, time.perf_counter() - started, queries)
+        return response
@@ -1,2 +1,4 @@
 from .tree_model import TreeModel
 from .singleton import SingletonModel
+from .fields import BulkAutoSlugField
+from .job import Job
@@ -0,0 +1,34 @@
+from autoslug import AutoSlugField
+from autoslug.utils import crop_slug
+
+
+class BulkAutoSlugField(AutoSlugField):
+    """
+    AutoSlugField that can hand out unique slugs in memory.
+
+    AutoSlugField.pre_save() runs one uniqueness query per row, also inside
+    bulk_create(). Bulk loaders reserve slugs up front with reserve_slug()
+    and mark the instances with ``_slug_reserved = True`` to skip that query.
+    """
+
+    def pre_save(self, instance, add):
+        if getattr(instance, "_slug_reserved", False):
+            return self.value_from_object(instance)
+        return super().pre_save(instance, add)
+
+    def reserve_slug(self, value, taken, default="item"):
+        """
+        Return the slug AutoSlugField would generate for ``value`` when the
+        slugs in ``taken`` already exist, and add it to ``taken``.
+        """
+        slug = self.slugify(value) if value else ""
+        slug = self.slugify(crop_slug(self, slug or default))
+        original_slug = slug
+        index = 1
+        while slug in taken:
+            index += 1
+            tail = f"{self.index_sep}{index}"
+            original_slug = original_slug[:self.max_length - len(tail)]
+            slug = f"{original_slug}{tail}"
+        taken.add(slug)
+        return slug
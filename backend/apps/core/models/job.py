@@ -0,0 +1,48 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A unit of background work, run by the run_jobs command.
+
+    ``name`` is a function registered with ``core.jobs.register``, called
+    with ``payload`` as keyword arguments. Jobs with a higher priority run
+    first; failed attempts are retried after an exponential backoff until
+    ``max_attempts`` is reached.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = "core"
+        # The claim query: queued jobs that are due, by priority
+        indexes = [
+            models.Index(
+                fields=["-priority", "run_after", "id"],
+                name="job_queue_idx",
+                condition=models.Q(status="queued")
+            ),
+            models.Index(fields=["status", "locked_at"], name="job_status_locked_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,102 @@
+"""
+WITH RECURSIVE queries over the parent column of a TreeModel.
+
+They need no stored columns and run on PostgreSQL and SQLite. Each query
+returns the whole subtree or ancestor chain in one round trip, with every row
+annotated with ``tree_level``: its distance from the starting node.
+
+Recursion stops after ``model.CTE_MAX_LEVELS`` levels, so that parent loops
+written around save() (e.g. with update()) cannot recurse forever; nodes
+reached more than once are returned once, at their nearest level.
+"""
+from django.db import connections
+
+
+def _names(model):
+    connection = connections[model._default_manager.db]
+    quote = connection.ops.quote_name
+    return (
+        quote(model._meta.db_table),
+        quote(model._meta.pk.column),
+        quote(model._meta.get_field("parent").column),
+    )
+
+
+def _levels(model, max_depth):
+    return model.CTE_MAX_LEVELS if max_depth is None else min(max_depth, model.CTE_MAX_LEVELS)
+
+
+def descendants_cte(model, node_id, max_depth=None):
+    """
+    Return (sql, params) of the ``tree (node_id, tree_level)`` CTE of the
+    descendants of ``node_id``.
+    """
+    table, pk, parent = _names(model)
+    sql = (
+        f"WITH RECURSIVE tree (node_id, tree_level) AS ("
+        f" SELECT {pk}, 1 FROM {table} WHERE {parent} = %s"
+        f" UNION ALL"
+        f" SELECT child.{pk}, tree.tree_level + 1 FROM {table} child"
+        f" JOIN tree ON child.{parent} = tree.node_id WHERE tree.tree_level < %s"
+        f")"
+    )
+    return sql, [node_id, _levels(model, max_depth)]
+
+
+def ancestors_cte(model, node_id, max_depth=None):
+    """
+    Return (sql, params) of the ``tree (node_id, parent_id, tree_level)`` CTE
+    of ``node_id`` (level 0) and its ancestors.
+    """
+    table, pk, parent = _names(model)
+    sql = (
+        f"WITH RECURSIVE tree (node_id, parent_id, tree_level) AS ("
+        f" SELECT {pk}, {parent}, 0 FROM {table} WHERE {pk} = %s"
+        f" UNION ALL"
+        f" SELECT ancestor.{pk}, ancestor.{parent}, tree.tree_level + 1 FROM {table} ancestor"
+        f" JOIN tree ON ancestor.{pk} = tree.parent_id WHERE tree.tree_level < %s"
+        f")"
+    )
+    return sql, [node_id, _levels(model, max_depth)]
+
+
+def _select_nodes(model, cte, params, where=""):
+    table, pk, _ = _names(model)
+    sql = (
+        f"{cte} SELECT {table}.*, levels.tree_level FROM {table}"
+        f" JOIN (SELECT node_id, MIN(tree_level) AS tree_level FROM tree GROUP BY node_id) levels"
+        f" ON {table}.{pk} = levels.node_id {where}"
+        f" ORDER BY levels.tree_level, {table}.{pk}"
+    )
+    return sql, params
+
+
+def descendants_sql(model, node_id, max_depth=None):
+    """
+    Return (sql, params) selecting the descendants of ``node_id``, nearest first.
+    """
+    return _select_nodes(model, *descendants_cte(model, node_id, max_depth))
+
+
+def ancestors_sql(model, node_id, max_depth=None):
+    """
+    Return (sql, params) selecting the ancestors of ``node_id``, parent first.
+    """
+    return _select_nodes(model, *ancestors_cte(model, node_id, max_depth), where="WHERE levels.tree_level > 0")
+
+
+def descendant_ids_sql(model, node_id, max_depth=None):
+    """
+    Return (sql, params) selecting the ids of the descendants of ``node_id``,
+    for ``filter(pk__in=RawSQL(...))``.
+    """
+    cte, params = descendants_cte(model, node_id, max_depth)
+    return f"{cte} SELECT node_id FROM tree", params
+
+
+def ancestor_ids_sql(model, node_id, max_depth=None):
+    """
+    Return (sql, params) selecting ``node_id`` and the ids of its ancestors.
+    """
+    cte, params = ancestors_cte(model, node_id, max_depth)
+    return f"{cte} SELECT node_id FROM tree", params
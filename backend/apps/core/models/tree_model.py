@@ -1,25 +1,206 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Max, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat, Substr
 from django.core.exceptions import ValidationError
 
+from .tree_cte import ancestor_ids_sql, ancestors_sql, descendant_ids_sql, descendants_sql
+
 
 class TreeModel(models.Model):
     """
     An abstract base class for tree-like models.
+
+    Every node stores a materialized path: the base36 encoded, fixed width ids
+    of its ancestors followed by its own id. Descendants, ancestors, depth and
+    loop checks are answered from the path with a single indexed query. The
+    path column holds 255 characters, so trees are limited to
+    ``max_tree_levels()`` (31) levels; deeper nodes are rejected with a
+    ValidationError.
+
+    Set ``tree_backend = "cte"`` on a subclass to answer decendant() and
+    ancestry() with recursive CTEs over ``parent`` instead. Paths are then
+    not maintained, and the subclass may drop the columns with
+    ``tree_path = None`` and ``tree_depth = None``. Recursion stops after
+    CTE_MAX_LEVELS levels.
     """
 
+    PATH_STEP = 8  # characters per level, enough for ids below 36 ** 8
+    CTE_MAX_LEVELS = 1000
+
     parent = models.ForeignKey(
         'self', default=None, null=True, blank=True, on_delete=models.CASCADE, related_name="%(app_label)s_%(class)s_child"
     )
+    tree_path = models.CharField(max_length=255, default="", editable=False, db_index=True)
+    tree_depth = models.PositiveIntegerField(default=0, editable=False)
+
+    tree_backend = "path"  # or "cte"
 
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_parent_id = instance.__dict__.get("parent_id")
+        return instance
+
+    @classmethod
+    def max_tree_levels(cls):
+        """
+        Return the number of levels a tree_path can hold.
+        """
+        return cls._meta.get_field("tree_path").max_length // cls.PATH_STEP
+
+    @classmethod
+    def check_tree_depth(cls, depth):
+        """
+        Raise ValidationError when a node at ``depth`` (0 for roots) does not
+        fit in tree_path.
+        """
+        if depth >= cls.max_tree_levels():
+            raise ValidationError(f'Trees are limited to {cls.max_tree_levels()} levels.')
+
+    @classmethod
+    def encode_path_step(cls, pk):
+        """
+        Return the fixed width path segment of the given primary key.
+        """
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+        step = ""
+        while pk:
+            pk, remainder = divmod(pk, 36)
+            step = digits[remainder] + step
+        return step.rjust(cls.PATH_STEP, "0")
+
+    @classmethod
+    def decode_path(cls, tree_path):
+        """
+        Return the primary keys stored in a path, root first.
+        """
+        return [
+            int(tree_path[i:i + cls.PATH_STEP], 36) for i in range(0, len(tree_path), cls.PATH_STEP)
+        ]
+
+    def _parent_position(self):
+        """
+        Return the (tree_path, tree_depth) of the parent as stored in the database.
+        """
+        if self.parent_id is None:
+            return "", -1
+        return self.__class__._default_manager.filter(pk=self.parent_id).values_list(
+            "tree_path", "tree_depth"
+        ).get()
+
+    def _stored_position(self, lock=False):
+        """
+        Return the (tree_path, tree_depth) of the node as stored in the
+        database, locked with ``lock``, ("", 0) before it is saved. The
+        instance may have been loaded before an ancestor moved.
+        """
+        if self._state.adding or self.pk is None:
+            return "", 0
+        queryset = self.__class__._default_manager.filter(pk=self.pk)
+        if lock:
+            queryset = queryset.select_for_update()
+        return queryset.values_list("tree_path", "tree_depth").first() or ("", 0)
+
+    def _check_cte_loop(self):
+        """
+        Raise ValidationError when the parent is the node or one of its
+        descendants, from the ancestors of the parent.
+        """
+        if self.pk is None or self.parent_id is None:
+            return
+        ancestors = RawSQL(*ancestor_ids_sql(self.__class__, self.parent_id))
+        if self.__class__._default_manager.filter(pk=self.pk, pk__in=ancestors).exists():
+            raise ValidationError('Loop is not allowed.')
+
+    def _subtree_levels(self):
+        """
+        Return how many levels the stored subtree spans below this node.
+        """
+        if not self.tree_path:
+            return 0
+        deepest = self.__class__._default_manager.filter(
+            tree_path__startswith=self.tree_path
+        ).aggregate(deepest=Max("tree_depth"))["deepest"]
+        return (deepest or self.tree_depth) - self.tree_depth
+
+    def save(self, *args, **kwargs):
+        """
+        Save the object and keep the path of it and of its subtree in sync.
+
+        Reparenting rewrites the whole subtree with one UPDATE. Other saves
+        leave the path columns alone, since the instance may hold the path of
+        before an ancestor moved. With the cte backend only the loop check runs.
+        """
+        update_fields = kwargs.get("update_fields")
+        moved = self._state.adding or self.parent_id != getattr(self, "_loaded_parent_id", None)
+        if not moved or (update_fields is not None and "parent" not in update_fields):
+            if self.tree_backend != "cte" and not self._state.adding:
+                kwargs["update_fields"] = self._tree_update_fields(update_fields)
+            return super().save(*args, **kwargs)
+
+        if self.tree_backend == "cte":
+            self._check_cte_loop()
+            super().save(*args, **kwargs)
+            self._loaded_parent_id = self.parent_id
+            return
+
+        manager = self.__class__._default_manager
+        with transaction.atomic(using=kwargs.get("using") or manager.db):
+            old_path, old_depth = self.tree_path, self.tree_depth = self._stored_position(lock=True)
+            parent_path, parent_depth = self._parent_position()
+            if old_path and parent_path.startswith(old_path):
+                raise ValidationError('Loop is not allowed.')
+            new_depth = parent_depth + 1
+            self.check_tree_depth(new_depth + self._subtree_levels())
+
+            super().save(*args, **kwargs)
+
+            new_path = parent_path + self.encode_path_step(self.pk)
+            if old_path:
+                manager.filter(tree_path__startswith=old_path).update(
+                    tree_path=Concat(
+                        Value(new_path), Substr("tree_path", len(old_path) + 1),
+                        output_field=models.CharField()
+                    ),
+                    tree_depth=F("tree_depth") + (new_depth - old_depth),
+                )
+            else:
+                manager.filter(pk=self.pk).update(tree_path=new_path, tree_depth=new_depth)
+
+        self.tree_path, self.tree_depth = new_path, new_depth
+        self._loaded_parent_id = self.parent_id
+
+    def _tree_update_fields(self, update_fields):
+        """
+        Return the fields a save that does not move the node writes: the
+        given or loaded ones, without tree_path and tree_depth.
+        """
+        if update_fields is None:
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+            ]
+        return [name for name in update_fields if name not in ("tree_path", "tree_depth")]
+
     def xclean(self):
         """
-        Check objects descendant to prevent loops in the tree structure.
+        Check objects descendant to prevent loops in the tree structure, and
+        that the node and its subtree fit in tree_path below the parent.
         """
-        if self.parent in self.decendant():
+        if self.tree_backend == "cte":
+            return self._check_cte_loop()
+        if self.parent_id is None:
+            return
+        self.tree_path, self.tree_depth = self._stored_position()
+        parent_path, parent_depth = self._parent_position()
+        if self.tree_path and parent_path.startswith(self.tree_path):
             raise ValidationError('Loop is not allowed.')
+        self.check_tree_depth(parent_depth + 1 + self._subtree_levels())
 
     def children(self):
         """
@@ -30,20 +211,82 @@ class TreeModel(models.Model):
         else:
             return list()
 
-    def decendant(self):
+    def decendant(self, max_depth=None):
         """
-        Return a list of objects that are descendants of the current object.
+        Return objects that are descendants of the current object, at most
+        ``max_depth`` levels below it.
         """
-        from functools import reduce
-        children = self.children()
-        return reduce(lambda x, y: x | y, list(c.decendant() for c in children), children)
+        if not self.id:
+            return self.__class__.objects.none()
+        if self.tree_backend == "cte":
+            descendants = RawSQL(*descendant_ids_sql(self.__class__, self.id, max_depth))
+            # A corrupt loop through the node would return the node itself
+            return self.__class__.objects.filter(pk__in=descendants).exclude(pk=self.id)
+        if not self.tree_path:
+            return self.__class__.objects.none()
+        queryset = self.__class__.objects.filter(
+            tree_path__startswith=self.tree_path, tree_depth__gt=self.tree_depth
+        )
+        if max_depth is not None:
+            queryset = queryset.filter(tree_depth__lte=self.tree_depth + max_depth)
+        return queryset
 
-    def ancestry(self):
+    def ancestry(self, max_depth=None):
         """
         Return a list of ancestors (parent and its parent, and so on) of the current object.
         """
-        ancestor = [self.parent]
-        while ancestor[-1]:
-            ancestor.append(ancestor[-1].parent)
-        ancestor.pop()
-        return ancestor
+        if self.tree_backend == "cte" and self.id:
+            return list(self.cte_ancestry(max_depth))
+        if self.tree_backend == "cte" or not self.tree_path:
+            if self.parent is None:
+                return []
+            return ([self.parent] + self.parent.ancestry())[:max_depth]
+        ids = self.decode_path(self.tree_path)[:-1]
+        if max_depth is not None:
+            ids = ids[-max_depth:] if max_depth else []
+        if not ids:
+            return []
+        return list(self.__class__.objects.filter(pk__in=ids).order_by("-tree_depth"))
+
+    def cte_decendant(self, max_depth=None):
+        """
+        Return the descendants from one recursive query, nearest first, each
+        annotated with ``tree_level`` (1 for children).
+        """
+        if not self.id:
+            return self.__class__.objects.none()
+        return self.__class__.objects.raw(*descendants_sql(self.__class__, self.id, max_depth))
+
+    def cte_ancestry(self, max_depth=None):
+        """
+        Return the ancestors from one recursive query, parent first, each
+        annotated with ``tree_level`` (1 for the parent).
+        """
+        if not self.id:
+            return self.__class__.objects.none()
+        return self.__class__.objects.raw(*ancestors_sql(self.__class__, self.id, max_depth))
+
+    @classmethod
+    def rebuild_tree_paths(cls, batch_size=1000):
+        """
+        Recompute the path of every node level by level, e.g. for rows that
+        were written without save(). Nothing to do with the cte backend.
+        """
+        if cls.tree_backend == "cte":
+            return
+        manager = cls._default_manager
+        level = list(manager.filter(parent__isnull=True).only("pk", "parent"))
+        paths = {}
+        depth = 0
+        while level:
+            cls.check_tree_depth(depth)
+            for node in level:
+                node.tree_path = paths.get(node.parent_id, "") + cls.encode_path_step(node.pk)
+                node.tree_depth = depth
+            manager.bulk_update(level, ["tree_path", "tree_depth"], batch_size=batch_size)
+            paths = {node.pk: node.tree_path for node in level}
+            ids = list(paths)
+            level = []
+            for start in range(0, len(ids), batch_size):
+                level += manager.filter(parent_id__in=ids[start:start + batch_size]).only("pk", "parent")
+            depth += 1
@@ -0,0 +1,169 @@
+"""
+DRF paginators usable from async views.
+
+``apaginate_queryset()`` works like ``paginate_queryset()`` with the COUNT
+and the page read by async queries; links and responses are built by the DRF
+methods, so both paths return the same pages. ``request`` is a DRF Request
+(only its query parameters and URL are used).
+"""
+import json
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination, _reverse_ordering
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination with an async variant.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached property, the sync COUNT never runs
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        self.page.object_list = [item async for item in self.page.object_list.aiterator()]
+        return self.page.object_list
+
+
+class AsyncCursorPagination(CursorPagination):
+    """
+    CursorPagination with an async variant.
+
+    An ordering of several fields, such as ``("name", "id")``, is paged on
+    all of them: the cursor position holds the value of each field and the
+    page is read with a compound keyset filter. DRF filters on the first
+    field only and skips the rows sharing its value with an OFFSET, which
+    grows with the number of duplicates.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([item async for item in queryset.aiterator()])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the slice of ``queryset`` holding the page and the row after
+        it, None when pagination is off. First half of
+        CursorPagination.paginate_queryset().
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = self.filter_position(queryset, current_position)
+
+        return queryset[offset:offset + self.page_size + 1]
+
+    def filter_position(self, queryset, position):
+        """
+        Keep the rows after ``position`` in the direction of the cursor.
+        """
+        if len(self.ordering) == 1:
+            values = [position]
+        else:
+            try:
+                values = json.loads(position)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+
+        # (a, b) > (x, y) is a > x OR (a = x AND b > y), built from the last field
+        condition = None
+        for order, value in reversed(list(zip(self.ordering, values))):
+            order_attr = order.lstrip('-')
+            # Test for: (cursor reversed) XOR (queryset reversed)
+            lookup = '__lt' if self.cursor.reverse != order.startswith('-') else '__gt'
+            beyond = Q(**{order_attr + lookup: value})
+            condition = beyond if condition is None else beyond | (Q(**{order_attr: value}) & condition)
+        return queryset.filter(condition)
+
+    def _get_position_from_instance(self, instance, ordering):
+        if len(ordering) == 1:
+            return super()._get_position_from_instance(instance, ordering)
+        return json.dumps([
+            str(instance[order.lstrip('-')] if isinstance(instance, dict) else getattr(instance, order.lstrip('-')))
+            for order in ordering
+        ])
+
+    def set_page(self, results):
+        """
+        Set the page and its links from the ``results`` read from
+        get_page_queryset() and return the page. Second half of
+        CursorPagination.paginate_queryset().
+        """
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
@@ -0,0 +1,65 @@
+"""
+JSON renderer backed by orjson, when it is installed.
+
+The output is byte-identical to DRF's JSONRenderer with the default
+(compact, unicode) settings, large and tiny floats aside: dates and times,
+decimals and lazy strings are still encoded by DRF's encoder, and
+U+2028/U+2029 are escaped. Anything orjson rejects (indented output,
+integers over 64 bits, ...) is rendered by JSONRenderer itself.
+
+Floats below 1e-4 or from 1e16 on are written in orjson's exponent notation
+(``1e-7`` instead of ``1e-07``), which is why it is not a default renderer:
+views using FastJSONRendererMixin render with it when ORGANIZATION_FAST_LIST
+is set, and with JSONRenderer otherwise.
+"""
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safe escapes as JSONRenderer
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+def get_json_renderer():
+    """
+    Return the JSON renderer class selected by ORGANIZATION_FAST_LIST.
+    """
+    return FastJSONRenderer if settings.ORGANIZATION_FAST_LIST else JSONRenderer
+
+
+class FastJSONRendererMixin:
+    """
+    For API views: the JSONRenderer of ``renderer_classes`` is replaced by
+    the one get_json_renderer() selects.
+    """
+
+    def get_renderers(self):
+        json_renderer = get_json_renderer()
+        return [
+            json_renderer() if renderer is JSONRenderer else renderer()
+            for renderer in self.renderer_classes
+        ]
@@ -0,0 +1 @@
+from .sparse import SparseFieldsetMixin
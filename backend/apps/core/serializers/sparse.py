@@ -0,0 +1,79 @@
+"""
+Sparse fieldsets: ``?fields=name,slug`` returns only the listed fields and
+``?omit=headcount`` every field but the listed ones.
+
+The selection is validated against ``Meta.fields``. Views pass it to the
+serializer as the ``fields`` context entry and load only the columns it
+reads with ``queryset.only(*serializer_class.get_sparse_columns(fields))``.
+"""
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+
+def _split(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that keeps the fields picked by the client.
+    """
+
+    # Serialized field -> model columns it reads, when it is not a column
+    # of the same name
+    sparse_columns = {}
+    # Columns loaded whatever the selection (primary key, pagination keys)
+    sparse_required_columns = ("id",)
+
+    @classmethod
+    def parse_sparse_fields(cls, query_params):
+        """
+        Return the selected field names in ``Meta.fields`` order, or None
+        when the request selects every field. Unknown names raise a
+        ValidationError (400).
+        """
+        fields = query_params.get(FIELDS_PARAM)
+        omit = query_params.get(OMIT_PARAM)
+        if fields is None and omit is None:
+            return None
+
+        allowed = list(cls.Meta.fields)
+        errors = {}
+        selected = set(allowed)
+        for param, value in ((FIELDS_PARAM, fields), (OMIT_PARAM, omit)):
+            if value is None:
+                continue
+            names = set(_split(value))
+            unknown = names.difference(allowed)
+            if unknown:
+                errors[param] = [
+                    f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                    f"Choose from: {', '.join(allowed)}."
+                ]
+            selected = selected & names if param == FIELDS_PARAM else selected - names
+        if errors:
+            raise serializers.ValidationError(errors)
+        if not selected:
+            raise serializers.ValidationError({FIELDS_PARAM: ["No field left to return."]})
+        if len(selected) == len(allowed):
+            return None
+        return tuple(name for name in allowed if name in selected)
+
+    @classmethod
+    def get_sparse_columns(cls, fields):
+        """
+        Return the model columns needed to serialize ``fields``.
+        """
+        columns = dict.fromkeys(cls.sparse_required_columns)
+        for name in fields:
+            columns.update(dict.fromkeys(cls.sparse_columns.get(name, (name,))))
+        return list(columns)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get("fields")
+        if selected is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
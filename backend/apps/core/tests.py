@@ -1,3 +1,648 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection, models
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import isolate_apps, CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+from core import auth_cache, jobs, metrics
+from core.authentication import JWTAuthentication, TokenAuthentication
+from core.models import Job, TreeModel
+from core.renderers import FastJSONRenderer
 
-# Create your tests here.
+CALLS = []
+
+
+@jobs.register("tests.record")
+def record(value):
+    CALLS.append(value)
+
+
+@jobs.register("tests.fail")
+def fail():
+    raise RuntimeError("boom")
+
+
+class TreeModelTest(TransactionTestCase):
+    """Test materialized path maintenance of TreeModel"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.isolation = isolate_apps("core")
+        cls.isolation.enable()
+
+        class Node(TreeModel):
+            name = models.CharField(max_length=20)
+
+            class Meta:
+                app_label = "core"
+
+        cls.Node = Node
+        with connection.schema_editor() as editor:
+            editor.create_model(Node)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.Node)
+        cls.isolation.disable()
+        super().tearDownClass()
+
+    def setUp(self):
+        # root -> a -> a1 -> a1x
+        #      -> b
+        self.root = self.Node.objects.create(name="root")
+        self.a = self.Node.objects.create(name="a", parent=self.root)
+        self.b = self.Node.objects.create(name="b", parent=self.root)
+        self.a1 = self.Node.objects.create(name="a1", parent=self.a)
+        self.a1x = self.Node.objects.create(name="a1x", parent=self.a1)
+
+    def tearDown(self):
+        self.Node.objects.all().delete()
+
+    def names(self, nodes):
+        return sorted(node.name for node in nodes)
+
+    def test_path_and_depth(self):
+        """Test path and depth are set on create"""
+        a1x = self.Node.objects.get(pk=self.a1x.pk)
+        self.assertEqual(a1x.tree_depth, 3)
+        self.assertEqual(
+            self.Node.decode_path(a1x.tree_path),
+            [self.root.pk, self.a.pk, self.a1.pk, self.a1x.pk]
+        )
+
+    def test_decendant_single_query(self):
+        """Test descendants come from one query"""
+        with CaptureQueriesContext(connection) as queries:
+            names = self.names(self.root.decendant())
+        self.assertEqual(names, ["a", "a1", "a1x", "b"])
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.names(self.a1x.decendant()), [])
+
+    def test_ancestry_single_query(self):
+        """Test ancestors are returned nearest first from one query"""
+        with CaptureQueriesContext(connection) as queries:
+            ancestors = self.a1x.ancestry()
+        self.assertEqual([node.name for node in ancestors], ["a1", "a", "root"])
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.root.ancestry(), [])
+
+    def test_reparent_moves_subtree(self):
+        """Test moving a node rewrites the paths of its subtree"""
+        self.a.parent = self.b
+        self.a.save()
+
+        a1x = self.Node.objects.get(pk=self.a1x.pk)
+        self.assertEqual(a1x.tree_depth, 4)
+        self.assertEqual([node.name for node in a1x.ancestry()], ["a1", "a", "b", "root"])
+        self.assertEqual(self.names(self.b.decendant()), ["a", "a1", "a1x"])
+
+    def test_stale_instance_keeps_moved_path(self):
+        """Test saving an instance loaded before its ancestor moved keeps the new path"""
+        stale = self.Node.objects.get(pk=self.a1.pk)
+        self.a.parent = self.b
+        self.a.save()
+
+        stale.name = "a1 renamed"
+        stale.save()
+        self.assertEqual(self.names(self.b.decendant()), ["a", "a1 renamed", "a1x"])
+
+        # Moving a stale instance rewrites its subtree from the stored path
+        stale.parent = self.root
+        stale.save()
+        a1x = self.Node.objects.get(pk=self.a1x.pk)
+        self.assertEqual(a1x.tree_depth, 2)
+        self.assertEqual([node.name for node in a1x.ancestry()], ["a1 renamed", "root"])
+        self.assertEqual(self.names(self.b.decendant()), ["a"])
+
+    def test_move_to_root(self):
+        """Test detaching a subtree makes it a root"""
+        self.a.parent = None
+        self.a.save()
+
+        a1 = self.Node.objects.get(pk=self.a1.pk)
+        self.assertEqual(a1.tree_depth, 1)
+        self.assertEqual(self.names(self.root.decendant()), ["b"])
+
+    def test_loop_is_rejected(self):
+        """Test a node cannot be moved below its own descendant"""
+        self.a.parent = self.a1x
+        with self.assertRaises(ValidationError):
+            self.a.xclean()
+        with self.assertRaises(ValidationError):
+            self.a.save()
+
+    def test_rebuild_tree_paths(self):
+        """Test paths can be rebuilt for rows written without save()"""
+        self.Node.objects.update(tree_path="", tree_depth=0)
+        self.Node.rebuild_tree_paths()
+
+        a1x = self.Node.objects.get(pk=self.a1x.pk)
+        self.assertEqual(a1x.tree_depth, 3)
+        self.assertEqual([node.name for node in a1x.ancestry()], ["a1", "a", "root"])
+
+    def test_depth_limits(self):
+        """Test descendants and ancestors can be limited in depth"""
+        self.assertEqual(self.names(self.root.decendant(max_depth=1)), ["a", "b"])
+        self.assertEqual([node.name for node in self.a1x.ancestry(max_depth=2)], ["a1", "a"])
+
+    def test_depth_limit(self):
+        """Test nodes deeper than tree_path can hold are rejected"""
+        self.assertEqual(self.Node.max_tree_levels(), 31)
+        node = self.root
+        for depth in range(1, 31):
+            node = self.Node.objects.create(name=f"n{depth}", parent=node)
+        self.assertEqual(node.tree_depth, 30)
+        with self.assertRaises(ValidationError):
+            self.Node.objects.create(name="too deep", parent=node)
+        with self.assertRaises(ValidationError):
+            self.Node(name="too deep", parent=node).xclean()
+
+        # Moving a subtree checks its deepest node
+        self.a.parent = self.Node.objects.get(name="n28")
+        with self.assertRaises(ValidationError):
+            self.a.xclean()
+        with self.assertRaises(ValidationError):
+            self.a.save()
+        self.assertEqual(self.Node.objects.get(pk=self.a1x.pk).tree_depth, 3)
+
+    def test_cte_decendant(self):
+        """Test recursive CTE descendants with annotated level"""
+        with CaptureQueriesContext(connection) as queries:
+            levels = {node.name: node.tree_level for node in self.root.cte_decendant()}
+        self.assertEqual(levels, {"a": 1, "b": 1, "a1": 2, "a1x": 3})
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.names(self.root.cte_decendant(max_depth=2)), ["a", "a1", "b"])
+
+    def test_cte_ancestry(self):
+        """Test recursive CTE ancestors with annotated level"""
+        ancestors = list(self.a1x.cte_ancestry())
+        self.assertEqual([node.name for node in ancestors], ["a1", "a", "root"])
+        self.assertEqual([node.tree_level for node in ancestors], [1, 2, 3])
+        self.assertEqual([node.name for node in self.a1x.cte_ancestry(max_depth=1)], ["a1"])
+
+    def test_cte_backend(self):
+        """Test the cte backend answers decendant() and ancestry()"""
+        self.Node.tree_backend = "cte"
+        try:
+            self.assertEqual(self.names(self.a.decendant()), ["a1", "a1x"])
+            self.assertEqual([node.name for node in self.a1.ancestry()], ["a", "root"])
+        finally:
+            self.Node.tree_backend = "path"
+
+
+class CteTreeModelTest(TransactionTestCase):
+    """Test TreeModel with the cte backend and without path columns"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.isolation = isolate_apps("core")
+        cls.isolation.enable()
+
+        class CteNode(TreeModel):
+            name = models.CharField(max_length=20)
+            tree_path = None
+            tree_depth = None
+            tree_backend = "cte"
+
+            class Meta:
+                app_label = "core"
+
+        cls.Node = CteNode
+        with connection.schema_editor() as editor:
+            editor.create_model(CteNode)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            editor.delete_model(cls.Node)
+        cls.isolation.disable()
+        super().tearDownClass()
+
+    def setUp(self):
+        # root -> a -> a1 -> a1x
+        #      -> b
+        self.root = self.Node.objects.create(name="root")
+        self.a = self.Node.objects.create(name="a", parent=self.root)
+        self.b = self.Node.objects.create(name="b", parent=self.root)
+        self.a1 = self.Node.objects.create(name="a1", parent=self.a)
+        self.a1x = self.Node.objects.create(name="a1x", parent=self.a1)
+
+    def tearDown(self):
+        self.Node.objects.update(parent=None)
+        self.Node.objects.all().delete()
+
+    def names(self, nodes):
+        return sorted(node.name for node in nodes)
+
+    def test_no_path_columns(self):
+        """Test the model has no tree_path and tree_depth columns"""
+        fields = {field.name for field in self.Node._meta.get_fields()}
+        self.assertNotIn("tree_path", fields)
+        self.assertNotIn("tree_depth", fields)
+
+    def test_decendant_queryset(self):
+        """Test decendant() returns a QuerySet that can be filtered"""
+        descendants = self.root.decendant()
+        self.assertEqual(self.names(descendants), ["a", "a1", "a1x", "b"])
+        self.assertEqual(descendants.filter(name__startswith="a1").count(), 2)
+        self.assertEqual(self.names(self.root.decendant(max_depth=1)), ["a", "b"])
+        self.assertEqual(self.names(self.Node(name="new").decendant()), [])
+
+    def test_ancestry(self):
+        """Test ancestors nearest first"""
+        self.assertEqual([node.name for node in self.a1x.ancestry()], ["a1", "a", "root"])
+        self.assertEqual([node.name for node in self.Node(parent=self.a1).ancestry()], ["a1", "a", "root"])
+
+    def test_loop_not_allowed(self):
+        """Test a node cannot be moved below itself"""
+        self.a.parent = self.a1x
+        with self.assertRaises(ValidationError):
+            self.a.xclean()
+        with self.assertRaises(ValidationError):
+            self.a.save()
+        self.a.parent = self.a
+        with self.assertRaises(ValidationError):
+            self.a.save()
+        self.a.parent = self.b
+        self.a.save()
+        self.assertEqual([node.name for node in self.a1x.ancestry()], ["a1", "a", "b", "root"])
+
+    def test_corrupt_loop_terminates(self):
+        """Test queries stop on a loop written around save()"""
+        self.Node.objects.filter(pk=self.a.pk).update(parent=self.a1x)
+        self.assertEqual(self.names(self.a.decendant()), ["a1", "a1x"])
+        levels = {node.name: node.tree_level for node in self.a.cte_decendant()}
+        self.assertEqual(levels, {"a1": 1, "a1x": 2, "a": 3})
+        self.assertEqual(self.names(self.a1.ancestry()), ["a", "a1x"])
+
+
+class JobQueueTest(TestCase):
+    """Test the database-backed job queue"""
+
+    def setUp(self):
+        CALLS.clear()
+
+    def run_jobs(self):
+        out = io.StringIO()
+        call_command("run_jobs", burst=True, stdout=out)
+        return out.getvalue()
+
+    def test_priority_order(self):
+        """Test higher priority jobs run first, then oldest first"""
+        jobs.enqueue("tests.record", {"value": "low"})
+        jobs.enqueue("tests.record", {"value": "high"}, priority=5)
+        jobs.enqueue("tests.record", {"value": "low2"})
+        self.assertIn("Jobs done: 3, failed: 0", self.run_jobs())
+        self.assertEqual(CALLS, ["high", "low", "low2"])
+        self.assertEqual(set(Job.objects.values_list("status", flat=True)), {Job.Status.DONE})
+
+    def test_delayed_job(self):
+        """Test a job does not run before it is due"""
+        job = jobs.enqueue("tests.record", {"value": "later"}, delay=timedelta(minutes=5))
+        self.run_jobs()
+        self.assertEqual(CALLS, [])
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.run_jobs()
+        self.assertEqual(CALLS, ["later"])
+
+    def test_retry_with_backoff(self):
+        """Test failed jobs are retried after a backoff until max_attempts"""
+        job = jobs.enqueue("tests.fail", max_attempts=2)
+        with self.assertLogs("core.jobs", "WARNING"):
+            self.assertIn("failed: 1", self.run_jobs())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=20))
+
+        self.assertIn("failed: 0", self.run_jobs())  # not due yet
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs("core.jobs", "WARNING"):
+            self.run_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+        self.assertIn("RuntimeError: boom", job.last_error)
+
+    def test_claim_is_exclusive(self):
+        """Test a claimed job is not handed to another worker"""
+        jobs.enqueue("tests.record", {"value": 1})
+        jobs.enqueue("tests.record", {"value": 2})
+        first = jobs.claim_jobs("worker-a")
+        second = jobs.claim_jobs("worker-b")
+        third = jobs.claim_jobs("worker-c")
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(first[0].pk, second[0].pk)
+        self.assertEqual(third, [])
+
+    def test_stale_jobs_are_requeued(self):
+        """Test jobs of a dead worker are put back on the queue"""
+        job = jobs.enqueue("tests.record", {"value": "again"})
+        [claimed] = jobs.claim_jobs("dead-worker")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.run_jobs()
+        self.assertEqual(CALLS, ["again"])
+
+        # The dead worker finishing late does not overwrite the outcome
+        Job.objects.filter(pk=job.pk).update(last_error="kept")
+        jobs.run_job(claimed, "dead-worker")
+        self.assertEqual(Job.objects.get(pk=job.pk).last_error, "kept")
+
+    def test_requeue_counts_attempts(self):
+        """Test a job that keeps losing its worker fails after max_attempts"""
+        job = jobs.enqueue("tests.record", {"value": "crash"}, max_attempts=2)
+        for status in (Job.Status.QUEUED, Job.Status.FAILED):
+            jobs.claim_jobs("dead-worker")
+            Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+            jobs.requeue_stale_jobs()
+            job.refresh_from_db()
+            self.assertEqual(job.status, status)
+        self.assertEqual(job.attempts, 2)
+        self.assertTrue(job.last_error)
+        self.assertIn("Jobs done: 0", self.run_jobs())
+
+    def test_heartbeat_keeps_lock(self):
+        """Test a running job refreshes its lock, so it is not requeued"""
+        job = jobs.enqueue("tests.record", {"value": "long"})
+        [claimed] = jobs.claim_jobs("worker")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertTrue(jobs.touch_job(claimed, "worker"))
+        self.assertEqual(jobs.requeue_stale_jobs(), (0, 0))
+        self.assertFalse(jobs.touch_job(claimed, "other-worker"))
+
+        # run_job() touches the job from a thread while it runs
+        beats = []
+        with override_settings(JOBS_HEARTBEAT_INTERVAL=0.01), \
+                mock.patch.object(jobs, "touch_job", lambda job, worker: beats.append(worker) or True), \
+                mock.patch.dict(jobs._registry, {"tests.record": lambda value: time.sleep(0.1)}):
+            self.assertTrue(jobs.run_job(claimed, "worker"))
+        self.assertIn("worker", beats)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode(self):
+        """Test eager jobs run on commit in the calling process"""
+        with self.captureOnCommitCallbacks(execute=True):
+            job = jobs.enqueue("tests.record", {"value": "now"})
+        self.assertEqual(CALLS, ["now"])
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.Status.DONE)
+
+    def test_purge_finished_jobs(self):
+        """Test old finished jobs are deleted"""
+        job = jobs.enqueue("tests.record", {"value": "old"})
+        self.run_jobs()
+        Job.objects.filter(pk=job.pk).update(finished_at=timezone.now() - timedelta(days=30))
+        jobs.enqueue("tests.record", {"value": "new"})
+        self.assertEqual(jobs.purge_finished_jobs(), 1)
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class FastJSONRendererTest(TestCase):
+    """Test FastJSONRenderer renders the bytes of JSONRenderer"""
+
+    def test_same_bytes(self):
+        data = {
+            "text": "Ünal \u2028 \u2029 \"quoted\" \n\x01 </script>",
+            "numbers": [1, -2, 3.5, 0.001, None, True],
+            "decimal": Decimal("1.10"),
+            "date": date(2024, 2, 29),
+            "datetime": datetime(2024, 2, 29, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            "lazy": gettext_lazy("Holding"),
+            1: "integer key",
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_fallback(self):
+        """Test what orjson cannot encode is rendered by JSONRenderer"""
+        data = {"a": [1, 2], "big": 2 ** 70}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
+
+
+@override_settings(METRICS_ENABLED=1, METRICS_DIR="")
+class MetricsTest(TestCase):
+    """Test request metrics and the /metrics endpoint"""
+
+    def setUp(self):
+        metrics.registry.reset()
+
+    def scrape(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        return response.content.decode()
+
+    def test_records_requests(self):
+        first = self.client.get("/api/organizations/")
+        self.client.get("/api/organizations/")
+        self.client.get("/no-such-page/")
+        body = self.scrape()
+
+        self.assertIn('http_requests_total{view="organization-list",method="GET",status="200"} 2', body)
+        self.assertIn('http_requests_total{view="unresolved",method="GET",status="404"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{view="organization-list",method="GET"} 2', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="organization-list",method="GET",le="+Inf"} 2', body)
+        self.assertIn("# TYPE http_request_db_queries histogram", body)
+        self.assertIn('http_request_db_queries_count{view="organization-list",method="GET"} 2', body)
+        self.assertIn(
+            f'http_response_size_bytes_sum{{view="organization-list",method="GET"}} {float(2 * len(first.content))!r}',
+            body,
+        )
+
+    def test_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/organizations/?page_size=5")
+        values = metrics.collect()
+        series = values[("http_request_db_queries", ("organization-list", "GET"))]
+        # One observation in the bucket of the number of queries
+        buckets = metrics.METRICS["http_request_db_queries"][2]
+        self.assertEqual(series[buckets.index(len(queries))], 1)
+        self.assertEqual(series[-1], len(queries))
+
+    async def test_async_request(self):
+        """Test queries run in sync_to_async threads count for the request"""
+        response = await self.async_client.get("/api/organizations/")
+        self.assertEqual(response.status_code, 200)
+        values = metrics.collect()
+        self.assertEqual(values[("http_requests_total", ("organization-list", "GET", "200"))], 1)
+        self.assertGreater(values[("http_request_db_queries", ("organization-list", "GET"))][-1], 0)
+
+    def test_processes_add_up(self):
+        """Test the snapshots of the processes sharing METRICS_DIR are summed"""
+        labels = ("organization-list", "GET")
+        other = metrics.Registry()
+        other.observe("http_request_duration_seconds", labels, 0.2)
+        other.inc("http_requests_total", (*labels, "200"), 3)
+        with tempfile.TemporaryDirectory() as directory, self.settings(METRICS_DIR=directory):
+            other.flush(directory, force=True)
+            metrics.registry.observe("http_request_duration_seconds", labels, 0.02)
+            metrics.registry.inc("http_requests_total", (*labels, "200"))
+            values = metrics.collect()
+            self.assertEqual(len(os.listdir(directory)), 2)
+            with open(other.path) as file:
+                self.assertEqual(len(json.load(file)), 2)
+
+        self.assertEqual(values[("http_requests_total", (*labels, "200"))], 4)
+        durations = values[("http_request_duration_seconds", labels)]
+        self.assertEqual(sum(durations[:-1]), 2)
+        self.assertAlmostEqual(durations[-1], 0.22)
+
+    def test_render(self):
+        values = {
+            ("http_requests_total", ('say "hi"\\', "GET", "200")): 1,
+            ("http_request_db_queries", ("v", "GET")): [1, 0, 2, 0, 0, 0, 0, 0, 0, 1, 250],
+        }
+        body = metrics.render(values)
+        self.assertIn('http_requests_total{view="say \\"hi\\"\\\\",method="GET",status="200"} 1\n', body)
+        self.assertIn('http_request_db_queries_bucket{view="v",method="GET",le="0.0"} 1\n', body)
+        self.assertIn('http_request_db_queries_bucket{view="v",method="GET",le="2.0"} 3\n', body)
+        self.assertIn('http_request_db_queries_bucket{view="v",method="GET",le="100.0"} 3\n', body)
+        self.assertIn('http_request_db_queries_bucket{view="v",method="GET",le="+Inf"} 4\n', body)
+        self.assertIn('http_request_db_queries_sum{view="v",method="GET"} 250.0\n', body)
+        self.assertIn('http_request_db_queries_count{view="v",method="GET"} 4\n', body)
+
+    @override_settings(METRICS_ENABLED=0)
+    def test_disabled(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+        self.client.get("/api/organizations/")
+        self.assertEqual(metrics.collect(), {})
+
+
+@override_settings(AUTH_CACHE_TIMEOUT=30)
+class AuthCacheTest(TestCase):
+    """Test token and JWT users resolved from the authentication cache"""
+
+    def setUp(self):
+        auth_cache.local.clear()
+        self.user = get_user_model().objects.create_user(username="cached", password="Secret.123")
+        self.token = Token.objects.create(user=self.user)
+        self.factory = RequestFactory()
+
+    def token_request(self):
+        return self.factory.get("/", HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def jwt_request(self):
+        return self.factory.get("/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_token_cached(self):
+        with self.assertNumQueries(1):
+            TokenAuthentication().authenticate(self.token_request())
+        with self.assertNumQueries(0):
+            user, token = TokenAuthentication().authenticate(self.token_request())
+        self.assertEqual((user.pk, user.username, token.key), (self.user.pk, "cached", self.token.key))
+        # The password hash is not cached, it is read on use
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password("Secret.123"))
+        # A new instance per request
+        self.assertIsNot(TokenAuthentication().authenticate(self.token_request())[0], user)
+
+    def test_no_secrets_cached(self):
+        """Test neither the token key nor the password hash are cached"""
+        TokenAuthentication().authenticate(self.token_request())
+        JWTAuthentication().authenticate(self.jwt_request())
+        cached = repr(list(auth_cache.local.entries.items()))
+        self.assertNotIn(self.token.key, cached)
+        self.assertNotIn(self.user.password, cached)
+        self.assertIn("cached", cached)
+
+    def test_jwt_cached(self):
+        with self.assertNumQueries(1):
+            JWTAuthentication().authenticate(self.jwt_request())
+        with self.assertNumQueries(0):
+            user, _ = JWTAuthentication().authenticate(self.jwt_request())
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_async_cached(self):
+        """Test the async path fills and uses the same cache"""
+        async_to_sync(TokenAuthentication().aauthenticate)(self.token_request())
+        async_to_sync(JWTAuthentication().aauthenticate)(self.jwt_request())
+        with self.assertNumQueries(0):
+            TokenAuthentication().authenticate(self.token_request())
+            user, _ = async_to_sync(JWTAuthentication().aauthenticate)(self.jwt_request())
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_token_deleted(self):
+        TokenAuthentication().authenticate(self.token_request())
+        request = self.token_request()
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            TokenAuthentication().authenticate(request)
+
+    def test_user_deactivated(self):
+        jwt_request = self.jwt_request()
+        TokenAuthentication().authenticate(self.token_request())
+        JWTAuthentication().authenticate(jwt_request)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            TokenAuthentication().authenticate(self.token_request())
+        with self.assertRaises(AuthenticationFailed):
+            JWTAuthentication().authenticate(jwt_request)
+
+    def test_password_changed(self):
+        TokenAuthentication().authenticate(self.token_request())
+        self.user.set_password("Changed.456")
+        self.user.save()
+        with self.assertNumQueries(1):
+            user, _ = TokenAuthentication().authenticate(self.token_request())
+        self.assertTrue(user.check_password("Changed.456"))
+
+    def test_logout(self):
+        self.client.post(
+            "/api/userbase/auth/logout/", HTTP_AUTHORIZATION=f"Token {self.token.key}"
+        )
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        with self.assertRaises(AuthenticationFailed):
+            TokenAuthentication().authenticate(self.token_request())
+
+    @override_settings(AUTH_CACHE_MAX_ENTRIES=2)
+    def test_bounded(self):
+        for user_id in range(5):
+            auth_cache.store({auth_cache.jwt_user_key(user_id): (user_id,)})
+        self.assertEqual(list(auth_cache.local.entries), [auth_cache.jwt_user_key(3), auth_cache.jwt_user_key(4)])
+
+    def test_expires(self):
+        TokenAuthentication().authenticate(self.token_request())
+        with mock.patch("core.auth_cache.time.monotonic", return_value=10 ** 9):
+            with self.assertNumQueries(1):
+                TokenAuthentication().authenticate(self.token_request())
+
+    @override_settings(AUTH_CACHE_ALIAS="default")
+    def test_shared(self):
+        """Test an entry stored by another process is used, and dropped there"""
+        JWTAuthentication().authenticate(self.jwt_request())
+        auth_cache.local.clear()
+        with self.assertNumQueries(0):
+            JWTAuthentication().authenticate(self.jwt_request())
+
+        self.user.save()
+        auth_cache.local.clear()
+        with self.assertNumQueries(1):
+            JWTAuthentication().authenticate(self.jwt_request())
+
+    @override_settings(AUTH_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        """Test nothing is cached with AUTH_CACHE_TIMEOUT=0"""
+        TokenAuthentication().authenticate(self.token_request())
+        with self.assertNumQueries(1):
+            TokenAuthentication().authenticate(self.token_request())
+        self.assertEqual(auth_cache.local.entries, {})
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from core.views import metrics
+
+urlpatterns = [
+    path('metrics', metrics, name='metrics'),
+]
@@ -0,0 +1,3 @@
+from .conditional import compute_etag, set_validators, has_validators, not_modified
+from .asynchronous import api_response, exception_response, async_read_view
+from .metrics import metrics
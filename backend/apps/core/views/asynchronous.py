@@ -0,0 +1,66 @@
+"""
+Async read endpoints next to the DRF views.
+
+With ASYNC_VIEWS set, the busiest GET endpoints are served by coroutines
+that authenticate, query and cache without blocking the event loop (see
+config/asgi.py). Their responses are the bytes the DRF views return; other
+methods on the same URL are still handled by the DRF view.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+
+from core.authentication import authenticate_header
+from core.renderers import get_json_renderer
+
+
+def api_response(data, status=status.HTTP_200_OK, headers=None):
+    """
+    Return ``data`` rendered like a DRF Response, which it keeps as ``data``.
+    """
+    response = HttpResponse(
+        get_json_renderer()().render(data), status=status, content_type="application/json", headers=headers
+    )
+    response.data = data
+    return response
+
+
+def exception_response(request, exc):
+    """
+    Return the response APIView gives for an APIException or Http404.
+    """
+    if isinstance(exc, Http404):
+        exc = exceptions.NotFound(*exc.args)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        # WWW-Authenticate header for 401 responses, else coerce to 403
+        auth_header = authenticate_header(request)
+        if auth_header:
+            exc.auth_header = auth_header
+        else:
+            exc.status_code = status.HTTP_403_FORBIDDEN
+
+    headers = {}
+    if getattr(exc, 'auth_header', None):
+        headers['WWW-Authenticate'] = exc.auth_header
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = '%d' % exc.wait
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return api_response(data, exc.status_code, headers)
+
+
+def async_read_view(read, fallback):
+    """
+    Return an async view answering GET and HEAD with the coroutine ``read``
+    and other methods with the sync view ``fallback``, run in a thread.
+    """
+    async def view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_to_async(fallback)(request, *args, **kwargs)
+        try:
+            return await read(request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            return exception_response(request, exc)
+
+    # DRF views enforce CSRF themselves, on session authenticated writes
+    return csrf_exempt(view)
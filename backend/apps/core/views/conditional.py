@@ -0,0 +1,53 @@
+"""
+Validators (ETag / Last-Modified) for API responses.
+"""
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def compute_etag(*parts, weak=False):
+    """
+    Return a quoted ETag derived from the given parts.
+    """
+    digest = md5(":".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    etag = quote_etag(digest)
+    return f"W/{etag}" if weak else etag
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """
+    Set the ETag and Last-Modified headers of a response.
+    """
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def has_validators(request):
+    """
+    Return True if the request carries conditional GET headers.
+    """
+    return "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """
+    Return a 304 response when the request validators match, None otherwise.
+
+    Call it before serializing anything: the validators must be computable
+    from cheap queries for this to pay off.
+    """
+    if request.method not in ("GET", "HEAD") or not has_validators(request):
+        return None
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
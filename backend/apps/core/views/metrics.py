@@ -0,0 +1,18 @@
+"""
+Prometheus scrape endpoint.
+"""
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+
+from core import metrics as registry
+
+
+@require_safe
+def metrics(request):
+    """
+    Return the request metrics in the Prometheus text format.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(registry.render(registry.collect()), content_type=registry.CONTENT_TYPE)
@@ -4,8 +4,8 @@ from .models import Organization
 
 @admin.register(Organization)
 class OrganizationAdmin(admin.ModelAdmin):
-    list_display = ('name', 'org_type', 'nation', 'founding_date', 'headcount')
+    list_display = ('name', 'org_type', 'nation', 'founding_date', 'headcount', 'follower_count')
     list_filter = ('org_type', 'nation', 'founding_date')
     search_fields = ("name", "slug")
     ordering = ("name",)
-    readonly_fields = ("slug",)
+    readonly_fields = ("slug", "follower_count")
@@ -0,0 +1,115 @@
+"""
+Response cache of the organization list, detail and facets endpoints.
+
+Keys embed a generation counter that is bumped whenever an organization is
+saved or deleted (see ``signals.py``), so a single write invalidates every
+cached page without tracking individual keys. The backend is whatever cache
+alias ORGANIZATION_CACHE_ALIAS points at (locmem, database or file cache).
+"""
+import json
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+
+GENERATION_KEY = "organization:generation"
+
+
+def get_cache():
+    return caches[settings.ORGANIZATION_CACHE_ALIAS]
+
+
+def is_enabled():
+    return settings.ORGANIZATION_CACHE_TIMEOUT > 0
+
+
+def get_generation():
+    """
+    Return the current generation, starting from a timestamp so that a lost
+    counter never falls back onto the keys of an earlier generation.
+    """
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = int(time.time() * 1000)
+        if not cache.add(GENERATION_KEY, generation, None):
+            generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+async def aget_generation():
+    """
+    Async get_generation().
+    """
+    cache = get_cache()
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        generation = int(time.time() * 1000)
+        if not await cache.aadd(GENERATION_KEY, generation, None):
+            generation = await cache.aget(GENERATION_KEY, generation)
+    return generation
+
+
+def bump_generation():
+    """
+    Invalidate every cached organization response. A no-op when the cache
+    is disabled, so that writes do not pay a cache round trip for nothing.
+    """
+    if not is_enabled():
+        return
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, int(time.time() * 1000), None)
+
+
+def _key(kind, request, parts, generation=None):
+    raw = json.dumps([request.scheme, request.get_host(), parts], sort_keys=True, default=str)
+    digest = md5(raw.encode(), usedforsecurity=False).hexdigest()
+    if generation is None:
+        generation = get_generation()
+    return f"organization:{kind}:{generation}:{digest}"
+
+
+def list_key(request, filters, fields=None, generation=None):
+    """
+    Return the cache key of a list page: normalized filters plus pagination
+    and the selected fields. Async callers pass the ``generation``.
+    """
+    params = request.GET
+    pagination = {
+        param: params[param] for param in ("page", "pagination", "cursor") if params.get(param)
+    }
+    return _key("list", request, [filters, pagination, fields], generation)
+
+
+def detail_key(request, slug, filters, fields=None, generation=None):
+    """
+    Return the cache key of a detail response.
+    """
+    return _key("detail", request, [slug, filters, fields], generation)
+
+
+def facets_key(request, filters):
+    """
+    Return the cache key of the facet counts of a filter combination.
+    """
+    return _key("facets", request, [filters])
+
+
+def load(key):
+    return get_cache().get(key)
+
+
+def store(key, value):
+    get_cache().set(key, value, settings.ORGANIZATION_CACHE_TIMEOUT)
+
+
+async def aload(key):
+    return await get_cache().aget(key)
+
+
+async def astore(key, value):
+    await get_cache().aset(key, value, settings.ORGANIZATION_CACHE_TIMEOUT)
@@ -0,0 +1,118 @@
+"""
+Streaming export of filtered organizations.
+
+Rows are read with ``values_list().iterator()``, which uses a server-side
+cursor where the backend supports one, and encoded a chunk at a time, so
+neither the queryset nor the output is ever held in memory as a whole.
+Under ASGI the chunks are handed out by astream(): Django would otherwise
+collect a sync iterator in a list before sending anything.
+"""
+import csv
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+
+from organization.logos import variant_urls
+from organization.serializers import OrganizationSerializer
+
+EXPORT_FIELDS = list(OrganizationSerializer.Meta.fields)
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+CHUNK_SIZE = 2000
+
+
+class _Lines:
+    """
+    File-like object handing back what csv.writer writes.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, request=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield the export fields of every organization as a dict, logo and its
+    variants as the URLs the API would return.
+    """
+    build_url = request.build_absolute_uri if request is not None else None
+    for values in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size):
+        row = dict(zip(EXPORT_FIELDS, values))
+        if "logo_variants" in row:
+            row["logo_variants"] = variant_urls(row["logo"], row["logo_variants"], build_url)
+        if row["logo"]:
+            url = default_storage.url(row["logo"])
+            row["logo"] = build_url(url) if build_url else url
+        else:
+            row["logo"] = None
+        if row["founding_date"] is not None:
+            row["founding_date"] = row["founding_date"].isoformat()
+        yield row
+
+
+def iter_csv(rows, chunk_size=CHUNK_SIZE):
+    """
+    Encode rows as CSV, a header line first, ``chunk_size`` rows per chunk.
+    """
+    writer = csv.writer(_Lines())
+    chunk = [writer.writerow(EXPORT_FIELDS)]
+    for row in rows:
+        chunk.append(writer.writerow([
+            "" if value is None else json.dumps(value) if isinstance(value, dict) else value
+            for value in row.values()
+        ]))
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk).encode()
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+def iter_ndjson(rows, chunk_size=CHUNK_SIZE):
+    """
+    Encode rows as newline delimited JSON, ``chunk_size`` rows per chunk.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(row, ensure_ascii=False))
+        if len(chunk) >= chunk_size:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+def gzip_stream(chunks, level=6):
+    """
+    Compress a stream of byte chunks into a gzip stream on the fly.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def astream(chunks):
+    """
+    Async iterator over a sync iterator of chunks, each one produced in a
+    thread with sync_to_async().
+    """
+    done = object()
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
+
+
+def export_organizations(queryset, file_format, request=None, compress=False):
+    """
+    Return an iterator over the encoded export of a queryset.
+    """
+    rows = iter_rows(queryset, request)
+    chunks = iter_csv(rows) if file_format == "csv" else iter_ndjson(rows)
+    return gzip_stream(chunks) if compress else chunks
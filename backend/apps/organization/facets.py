@@ -0,0 +1,94 @@
+"""
+Facet counts of the organization list filters.
+
+Every facet is counted over the list filtered by all *other* filters, the
+way faceted search works: picking a country does not hide the other
+countries from the country facet. The four grouped queries are sent as one
+UNION ALL statement.
+"""
+from django.db.models import Case, CharField, Count, IntegerField, Value, When
+from django.db.models.functions import Cast, ExtractYear
+from django_countries import countries
+
+from organization.filters import filter_organizations
+from organization.models import Organization
+
+# (label, lowest headcount), the last bucket is open-ended
+HEADCOUNT_BUCKETS = [
+    ("0-9", 0),
+    ("10-49", 10),
+    ("50-249", 50),
+    ("250-999", 250),
+    ("1000-4999", 1000),
+    ("5000+", 5000),
+]
+UNKNOWN = "unknown"
+
+
+def headcount_bucket():
+    """
+    Return the expression of the headcount bucket label of a row.
+    """
+    whens = [When(headcount__isnull=True, then=Value(UNKNOWN))]
+    for (label, _), (_, upper) in zip(HEADCOUNT_BUCKETS, HEADCOUNT_BUCKETS[1:]):
+        whens.append(When(headcount__lt=upper, then=Value(label)))
+    return Case(*whens, default=Value(HEADCOUNT_BUCKETS[-1][0]), output_field=CharField())
+
+
+def founding_decade():
+    """
+    Return the expression of the founding decade of a row, e.g. 1990.
+    """
+    return Cast(Cast(ExtractYear("founding_date"), IntegerField()) / 10 * 10, CharField())
+
+
+# facet name -> (filter group it ignores, value expression)
+FACETS = {
+    "org_type": ("org_type", lambda: Cast("org_type", CharField())),
+    "nation": ("country", lambda: Cast("nation", CharField())),
+    "headcount": ("headcount", headcount_bucket),
+    "founding_decade": ("founding_date", founding_decade),
+}
+
+
+def facet_queryset(filters, facet):
+    """
+    Return the (facet, value, count) rows of one facet.
+    """
+    skip, value = FACETS[facet]
+    queryset = filter_organizations(Organization.objects.all(), filters, skip=(skip,))
+    return queryset.annotate(
+        facet=Value(facet, output_field=CharField()), value=value()
+    ).values("facet", "value").annotate(count=Count("pk")).order_by()
+
+
+def facet_label(facet, value):
+    """
+    Return the display label of a facet value.
+    """
+    if facet == "org_type":
+        return str(Organization.OrgType(value).label)
+    if facet == "nation":
+        return countries.name(value) or value
+    if facet == "founding_decade":
+        return f"{value}s"
+    return value
+
+
+def compute_facets(filters):
+    """
+    Return the counts of every facet as
+    ``{facet: [{"value", "label", "count"}]}``, largest count first.
+    """
+    querysets = [facet_queryset(filters, facet) for facet in FACETS]
+    rows = querysets[0].union(*querysets[1:], all=True)
+
+    facets = {facet: [] for facet in FACETS}
+    for row in rows:
+        facet, value = row["facet"], row["value"]
+        if facet in ("org_type", "founding_decade"):
+            value = int(value)
+        facets[facet].append({"value": value, "label": facet_label(facet, value), "count": row["count"]})
+    for counts in facets.values():
+        counts.sort(key=lambda item: (-item["count"], str(item["value"])))
+    return facets
@@ -0,0 +1,101 @@
+"""
+Query parameter filters of the organization list.
+
+parse_filters() normalizes the raw query parameters, so that equivalent
+requests (``org_type=3,2`` and ``org_type=2,3``) share one cache key, and
+filter_organizations() applies them to a queryset.
+"""
+from datetime import datetime
+
+from organization.search import search_organizations, search_terms
+
+
+def parse_filters(query_params):
+    """
+    Return the valid filters of a request as a dict of normalized values.
+
+    Invalid values are dropped, like the viewset always did.
+    """
+    filters = {}
+
+    # Full-text search, normalized to its terms
+    terms = search_terms(query_params.get('q') or '')
+    if terms:
+        filters['q'] = ' '.join(terms)
+
+    # Name filtering (case-insensitive contains)
+    name = query_params.get('name')
+    if name:
+        filters['name'] = name
+
+    # Organization type filtering (supports multiple types)
+    org_types = query_params.get('org_type')
+    if org_types:
+        # Handle comma-separated values: "2,3" -> [2, 3]
+        type_list = sorted({int(t.strip()) for t in org_types.split(',') if t.strip().isdigit()})
+        if type_list:
+            filters['org_type'] = type_list
+
+    # Country filtering
+    country = query_params.get('country')
+    if country:
+        filters['country'] = country.upper()
+
+    # Founding date range filtering
+    for param in ('founding_date_from', 'founding_date_to'):
+        value = query_params.get(param)
+        if value:
+            try:
+                filters[param] = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                pass  # Invalid date format, ignore filter
+
+    # Employee count range filtering
+    for param in ('headcount_min', 'headcount_max'):
+        value = query_params.get(param)
+        if value:
+            # If filtering by headcount, exclude organizations with no headcount data
+            filters['headcount_known'] = True
+            try:
+                filters[param] = int(value)
+            except ValueError:
+                pass  # Invalid number, ignore filter
+
+    return filters
+
+
+def filter_organizations(queryset, filters, skip=()):
+    """
+    Apply parsed filters to an Organization queryset.
+
+    ``skip`` names filter groups to leave out: q, name, org_type, country,
+    founding_date or headcount. With ``q`` the rows are annotated with
+    ``search_rank``.
+    """
+    if 'q' in filters and 'q' not in skip:
+        queryset = search_organizations(queryset, filters['q'])
+
+    if 'name' in filters and 'name' not in skip:
+        queryset = queryset.filter(name__icontains=filters['name'])
+
+    if 'org_type' in filters and 'org_type' not in skip:
+        queryset = queryset.filter(org_type__in=filters['org_type'])
+
+    if 'country' in filters and 'country' not in skip:
+        queryset = queryset.filter(nation=filters['country'])
+
+    if 'founding_date' not in skip:
+        if 'founding_date_from' in filters:
+            queryset = queryset.filter(founding_date__gte=filters['founding_date_from'])
+        if 'founding_date_to' in filters:
+            queryset = queryset.filter(founding_date__lte=filters['founding_date_to'])
+
+    if 'headcount' not in skip:
+        if 'headcount_min' in filters:
+            queryset = queryset.filter(headcount__gte=filters['headcount_min'])
+        if 'headcount_max' in filters:
+            queryset = queryset.filter(headcount__lte=filters['headcount_max'])
+        if filters.get('headcount_known'):
+            queryset = queryset.filter(headcount__isnull=False)
+
+    return queryset
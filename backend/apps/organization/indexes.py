@@ -0,0 +1,42 @@
+"""
+Database-specific indexes that cannot be declared in ``Organization.Meta``.
+
+The portable B-tree indexes live in ``Meta.indexes`` and are picked up by
+``makemigrations``. The trigram index backing ``name__icontains`` only exists
+on PostgreSQL, so it is installed after ``migrate`` (see ``signals.py``) and
+skipped on every other backend.
+"""
+from organization.models import Organization
+
+NAME_TRIGRAM_INDEX = "org_name_trgm_idx"
+
+
+def create_name_trigram_index(connection):
+    """
+    Create the pg_trgm GIN index used by case-insensitive name search.
+
+    Django compiles ``name__icontains`` to ``UPPER("name"::text) LIKE ...`` on
+    PostgreSQL, so the index is built on that exact expression.
+    Returns False when the backend does not support it.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    table = connection.ops.quote_name(Organization._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {NAME_TRIGRAM_INDEX} ON {table} "
+            f"USING gin ((UPPER(name::text)) gin_trgm_ops)"
+        )
+    return True
+
+
+def drop_name_trigram_index(connection):
+    """
+    Drop the trigram index, e.g. to measure queries without it.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX IF EXISTS {NAME_TRIGRAM_INDEX}")
+    return True
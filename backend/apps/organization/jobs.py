@@ -0,0 +1,33 @@
+"""
+Background jobs of the organization app, see core/jobs.py.
+"""
+import io
+import os
+
+from django.core.management import call_command
+
+from core import jobs
+from organization import logos
+
+
+@jobs.register("organization.process_logo")
+def process_logo(organization_id):
+    logos.process_logo(organization_id)
+
+
+@jobs.register("organization.import_file")
+def import_file(path, file_format=None, update=False, batch_size=1000):
+    """
+    Bulk load an organization file, like load_sample_organizations --bulk.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    call_command(
+        'load_sample_organizations', file=path, format=file_format, bulk=True,
+        update=update, batch_size=batch_size, stdout=io.StringIO()
+    )
+
+
+@jobs.register("organization.reconcile_follower_counts")
+def reconcile_follower_counts():
+    call_command('reconcile_follower_counts', stdout=io.StringIO())
@@ -0,0 +1,135 @@
+"""
+Size-bounded derivatives of organization logos.
+
+Uploaded logos are validated (see ``validators.py``) and kept as is; a
+background job then renders every size in LOGO_SIZES as WebP plus a PNG fallback,
+with EXIF orientation applied and metadata stripped. The result is recorded in
+``Organization.logo_variants``:
+
+    {"source": "organization/logos/<name>.png", "width": 2400, "height": 1200,
+     "thumbnail": {"width": 128, "height": 64, "webp": "...", "png": "..."},
+     "medium": {...}}
+
+Variants whose ``source`` is not the current logo are stale and ignored.
+render_logo() works on bytes only, so it can run in a process pool.
+"""
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core import jobs
+from organization import cache
+from organization.models import Organization
+
+# name -> longest side in pixels
+LOGO_SIZES = {
+    "thumbnail": 128,
+    "medium": 512,
+}
+
+
+def render_logo(data):
+    """
+    Render every size of a logo. Return its dimensions and, per size, the
+    dimensions and the encoded WebP and PNG bytes.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P", "PA") else "RGB")
+        rendered = {"width": image.width, "height": image.height}
+        for name, longest in LOGO_SIZES.items():
+            variant = image.copy()
+            variant.thumbnail((longest, longest), Image.LANCZOS)
+            variant.info = {}  # no EXIF, ICC profile or text chunks
+            webp, png = io.BytesIO(), io.BytesIO()
+            variant.save(webp, "WEBP", quality=85, method=4)
+            variant.save(png, "PNG", optimize=True)
+            rendered[name] = {
+                "width": variant.width,
+                "height": variant.height,
+                "webp": webp.getvalue(),
+                "png": png.getvalue(),
+            }
+    return rendered
+
+
+def save_logo_variants(organization_id, source, previous, rendered):
+    """
+    Store rendered derivatives of ``source`` and record them on the
+    organization, unless its logo changed in the meantime. Files of the
+    previous derivatives are deleted. The response cache is left to the
+    caller.
+    """
+    stem = os.path.splitext(source)[0]
+    variants = {"source": source, "width": rendered["width"], "height": rendered["height"]}
+    for name in LOGO_SIZES:
+        variant = dict(rendered[name])
+        for extension in ("webp", "png"):
+            variant[extension] = default_storage.save(
+                f"{stem}_{name}.{extension}", ContentFile(variant[extension])
+            )
+        variants[name] = variant
+
+    with transaction.atomic():
+        updated = Organization.objects.filter(pk=organization_id, logo=source).update(
+            logo_variants=variants, updated_at=timezone.now()
+        )
+    stale = previous if updated else variants
+    for name in LOGO_SIZES:
+        for extension in ("webp", "png"):
+            path = (stale or {}).get(name, {}).get(extension)
+            if path:
+                default_storage.delete(path)
+    return bool(updated)
+
+
+def process_logo(organization_id):
+    """
+    Render and store the derivatives of an organization's current logo.
+    Return False when there is nothing to do.
+    """
+    row = Organization.objects.filter(pk=organization_id).values_list("logo", "logo_variants").first()
+    if row is None or not row[0]:
+        return False
+    source, previous = row
+    if (previous or {}).get("source") == source:
+        return False
+    with default_storage.open(source, "rb") as file:
+        rendered = render_logo(file.read())
+    if not save_logo_variants(organization_id, source, previous, rendered):
+        return False
+    # update() sends no post_save, drop cached responses explicitly
+    cache.bump_generation()
+    return True
+
+
+def schedule_logo_processing(organization_id):
+    """
+    Queue the rendering of an organization's logo as a background job.
+    """
+    jobs.enqueue("organization.process_logo", {"organization_id": organization_id}, priority=10)
+
+
+def variant_urls(logo, variants, build_url=None):
+    """
+    Return the public representation of the derivatives of ``logo``, or
+    None while they are not rendered yet.
+    """
+    if not logo or (variants or {}).get("source") != logo:
+        return None
+    build_url = build_url or (lambda url: url)
+    result = {}
+    for name in LOGO_SIZES:
+        variant = variants[name]
+        result[name] = {
+            "width": variant["width"],
+            "height": variant["height"],
+            "webp": build_url(default_storage.url(variant["webp"])),
+            "png": build_url(default_storage.url(variant["png"])),
+        }
+    return result
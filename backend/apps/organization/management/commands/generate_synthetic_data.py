@@ -0,0 +1,145 @@
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from organization import cache, synthetic
+from organization.models import Organization
+from userbase.models import User
+from userbase.passwords import encode_password, fast_hasher
+
+
+class Command(BaseCommand):
+    """
+    Generate organizations, users and a follow graph with realistic
+    distributions (see organization/synthetic.py).
+
+    The data set is determined by the seed and the counts; running the
+    command again only adds missing rows. Chunks are generated and written
+    by a pool of worker processes with COPY on PostgreSQL. SQLite takes one
+    writer at a time, there the chunks are written by the command itself.
+
+    Usage:
+        python manage.py generate_synthetic_data --organizations 5000000 --users 500000
+        python manage.py generate_synthetic_data --seed 7 --follows 50 --workers 8
+    """
+    help = 'Generate synthetic organizations, users and follows for performance work'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organizations',
+            type=int,
+            default=100_000,
+            help='Organizations in the data set (default: 100000)'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10_000,
+            help='Users in the data set (default: 10000)'
+        )
+        parser.add_argument(
+            '--follows',
+            type=int,
+            default=20,
+            help='Average number of organizations followed per user (default: 20)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1,
+            help='Seed of the data set (default: 1)'
+        )
+        parser.add_argument(
+            '--password',
+            default='synthetic',
+            help='Password of the generated users, hashed with the fast hasher (default: synthetic)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=50_000,
+            help='Rows per chunk, generated and written in one transaction (default: 50000)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Generating and writing processes on PostgreSQL (default: all cores)'
+        )
+
+    def handle(self, *args, **options):
+        seed = options['seed']
+        chunk_size = max(1, options['chunk_size'])
+        workers = max(1, options['workers']) if connection.vendor == 'postgresql' else 1
+        started = time.perf_counter()
+
+        organizations = [
+            (chunk, (start, min(start + chunk_size, options['organizations'])))
+            for chunk, start in enumerate(range(0, options['organizations'], chunk_size))
+        ]
+        self.write('organizations', seed, organizations, workers, options)
+
+        password = encode_password(fast_hasher(), options['password'])
+        users = [
+            (chunk, (start, min(start + chunk_size, options['users']), password))
+            for chunk, start in enumerate(range(0, options['users'], chunk_size))
+        ]
+        self.write('users', seed, users, workers, options)
+
+        # Listed by unique keys, the order rows were inserted in depends on
+        # the workers
+        organization_ids = array('q', Organization.objects.order_by('slug').values_list('pk', flat=True))
+        user_ids = list(
+            User.objects.filter(username__startswith=synthetic.USERNAME_PREFIX)
+            .order_by('username').values_list('pk', flat=True)
+        )
+        users_per_chunk = max(1, chunk_size // max(1, options['follows']))
+        follows = [
+            (chunk, (user_ids[start:start + users_per_chunk], options['follows']))
+            for chunk, start in enumerate(range(0, len(user_ids), users_per_chunk))
+        ]
+        self.write('follows', seed, follows, workers, options, organization_ids)
+
+        # Rows were written with raw SQL: recount the follow counters and
+        # drop cached responses
+        call_command('reconcile_follower_counts', stdout=self.stdout)
+        cache.bump_generation()
+        self.stdout.write(f'Elapsed: {time.perf_counter() - started:.2f}s')
+
+    def write(self, kind, seed, chunks, workers, options, organization_ids=None):
+        """
+        Generate and write the chunks of one table.
+        """
+        write_chunk = partial(synthetic.write_chunk, kind, seed)
+        started = time.perf_counter()
+        inserted = 0
+        if workers > 1 and len(chunks) > 1:
+            # Forked workers must not share the connections (or the pool,
+            # with SQL_POOL) of this process
+            connections.close_all()
+            connection.close_pool()
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=synthetic.setup_worker, initargs=(organization_ids,)
+            ) as executor:
+                for count in executor.map(write_chunk, *zip(*chunks)):
+                    inserted += count
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'... {inserted} {kind} written')
+        else:
+            synthetic.setup_worker(organization_ids)
+            for chunk, args in chunks:
+                inserted += write_chunk(chunk, args)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'... {inserted} {kind} written')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{kind.capitalize()}: {inserted} inserted in {elapsed:.2f}s '
+            f'({inserted / elapsed if elapsed else 0:.0f} rows/s)'
+        )
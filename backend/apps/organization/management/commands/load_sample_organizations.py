@@ -1,18 +1,73 @@
 import os
-import json
+import time
+from datetime import datetime
 
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.db import DatabaseError, transaction
 
+from core import jobs
+from core.management.readers import iter_records
+from organization import cache
 from organization.models import Organization
 
 
+def clean_record(org_data):
+    """
+    Convert a raw record into Organization field values.
+    """
+    founding_date = org_data['founding_date']
+    if isinstance(founding_date, str):
+        founding_date = datetime.strptime(founding_date, '%Y-%m-%d').date()
+    headcount = org_data.get('headcount')
+    return {
+        'name': org_data['name'],
+        'org_type': int(org_data['org_type']),
+        'nation': org_data['nation'],
+        'founding_date': founding_date,
+        'headcount': int(headcount) if headcount not in (None, '') else None,
+    }
+
+
 class Command(BaseCommand):
     help = 'Load sample organization data using Django models'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=os.path.join(settings.BASE_DIR, 'sample_data', 'organizations.json'),
+            help='Input file (default: sample_data/organizations.json)'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['json', 'ndjson', 'csv'],
+            help='Input format, guessed from the file extension by default'
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Stream the input and insert it in batches with bulk_create'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Records per batch in bulk mode (default: 1000)'
+        )
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='In bulk mode, update organizations that already exist instead of skipping them'
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Queue a bulk load job for run_jobs instead of loading now'
+        )
+
     def handle(self, *args, **options):
-        # Path to JSON file
-        json_file_path = os.path.join(settings.BASE_DIR, 'sample_data', 'organizations.json')
+        # Path to input file
+        json_file_path = options['file']
 
         if not os.path.exists(json_file_path):
             self.stdout.write(
@@ -20,10 +75,26 @@ class Command(BaseCommand):
             )
             return
 
-        # Read JSON file
+        file_format = options['format'] or {
+            '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv'
+        }.get(os.path.splitext(json_file_path)[1].lower(), 'json')
+
+        if options['background']:
+            job = jobs.enqueue('organization.import_file', {
+                'path': os.path.abspath(json_file_path),
+                'file_format': file_format,
+                'update': options['update'],
+                'batch_size': options['batch_size'],
+            })
+            self.stdout.write(self.style.SUCCESS(f'Queued import job #{job.pk}'))
+            return
+
+        if options['bulk']:
+            return self.bulk_load(json_file_path, file_format, options)
+
+        # Read input file
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as file:
-                organizations_data = json.load(file)
+            organizations_data = list(iter_records(json_file_path, file_format))
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error reading JSON file: {str(e)}')
@@ -39,22 +110,12 @@ class Command(BaseCommand):
         # Create organizations using Django model
         for org_data in organizations_data:
             try:
-                # Convert string date to date object
-                from datetime import datetime
-                if isinstance(org_data['founding_date'], str):
-                    org_data['founding_date'] = datetime.strptime(
-                        org_data['founding_date'], '%Y-%m-%d'
-                    ).date()
+                values = clean_record(org_data)
 
                 # Use get_or_create to avoid duplicates
                 org, created = Organization.objects.get_or_create(
-                    name=org_data["name"],
-                    defaults={
-                        'org_type': org_data["org_type"],
-                        'nation': org_data["nation"],
-                        'founding_date': org_data["founding_date"],
-                        'headcount': org_data["headcount"],
-                    }
+                    name=values.pop("name"),
+                    defaults=values
                 )
 
                 if created:
@@ -71,7 +132,7 @@ class Command(BaseCommand):
             except Exception as e:
                 error_count += 1
                 self.stdout.write(
-                    self.style.ERROR(f'✗ Error creating {org_data["name"]}: {str(e)}')
+                    self.style.ERROR(f'✗ Error creating {org_data.get("name")}: {str(e)}')
                 )
 
         # Summary
@@ -96,3 +157,118 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.WARNING('No organizations were processed successfully.')
             )
+
+    def bulk_load(self, path, file_format, options):
+        """
+        Stream records into batched bulk_create calls.
+
+        Organizations are matched by name like the get_or_create path, against
+        a single prefetch of existing names and slugs. New slugs are reserved
+        in memory so no per-row uniqueness query is issued. Rows inserted
+        meanwhile by another writer are dropped by ignore_conflicts and
+        counted as existing; a batch that fails to write is reported as a
+        write error and the load goes on.
+        """
+        batch_size = options['batch_size']
+        update = options['update']
+        slug_field = Organization._meta.get_field('slug')
+
+        existing = dict(Organization.objects.values_list('name', 'slug'))
+        taken = set(existing.values())
+
+        created_count = 0
+        updated_count = 0
+        exists_count = 0
+        error_count = 0
+        write_error_count = 0
+        errors = []
+        started = time.perf_counter()
+
+        def flush(new, changed):
+            """
+            Write a batch and add it to the counters.
+            """
+            nonlocal created_count, updated_count, exists_count, write_error_count
+            slugs = [org.slug for org in new]
+            try:
+                with transaction.atomic():
+                    if new:
+                        # ignore_conflicts does not tell which rows it dropped
+                        before = Organization.objects.filter(slug__in=slugs).count()
+                        Organization.objects.bulk_create(new, ignore_conflicts=True)
+                        inserted = Organization.objects.filter(slug__in=slugs).count() - before
+                        created_count += inserted
+                        exists_count += len(new) - inserted
+                    if changed:
+                        Organization.objects.bulk_create(
+                            changed,
+                            update_conflicts=True,
+                            unique_fields=['slug'],
+                            update_fields=['org_type', 'nation', 'founding_date', 'headcount', 'updated_at'],
+                        )
+                        updated_count += len(changed)
+            except DatabaseError as e:
+                write_error_count += len(new) + len(changed)
+                errors.append(f'Batch of {len(new) + len(changed)} not written: {e}')
+                for org in new:
+                    existing.pop(org.name, None)
+
+        new, changed = [], []
+        try:
+            for org_data in iter_records(path, file_format):
+                try:
+                    values = clean_record(org_data)
+                except Exception as e:
+                    error_count += 1
+                    errors.append(f'{org_data.get("name")}: {e}')
+                    continue
+
+                org = Organization(**values)
+                org._slug_reserved = True
+                slug = existing.get(org.name)
+                if slug is None:
+                    org.slug = slug_field.reserve_slug(org.name, taken, Organization._meta.model_name)
+                    existing[org.name] = org.slug
+                    new.append(org)
+                elif update:
+                    org.slug = slug
+                    changed.append(org)
+                else:
+                    exists_count += 1
+                    continue
+
+                if len(new) + len(changed) >= batch_size:
+                    flush(new, changed)
+                    new, changed = [], []
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'... {created_count + updated_count} written')
+            flush(new, changed)
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'Error reading {path}: {str(e)}')
+            )
+
+        # bulk_create sends no post_save, drop cached responses explicitly
+        cache.bump_generation()
+        elapsed = time.perf_counter() - started
+        processed = created_count + updated_count + exists_count + error_count + write_error_count
+
+        # Summary
+        self.stdout.write('\n' + '=' * 50)
+        self.stdout.write('Summary:')
+        self.stdout.write(f'✓ Successfully created: {created_count}')
+        if updated_count > 0:
+            self.stdout.write(f'↻ Updated: {updated_count}')
+        if exists_count > 0:
+            self.stdout.write(f'⚠ Already existed: {exists_count}')
+        if error_count > 0:
+            self.stdout.write(f'✗ Errors: {error_count}')
+        if write_error_count > 0:
+            self.stdout.write(f'✗ Not written: {write_error_count}')
+        if errors:
+            for error in errors[:10]:
+                self.stdout.write(self.style.ERROR(f'  {error}'))
+        self.stdout.write(f'Total processed: {processed}')
+        self.stdout.write(
+            f'Elapsed: {elapsed:.2f}s ({processed / elapsed if elapsed else 0:.0f} records/s)'
+        )
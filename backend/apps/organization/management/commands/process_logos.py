@@ -0,0 +1,111 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from organization import cache
+from organization.logos import render_logo, save_logo_variants
+from organization.models import Organization
+
+
+def render_or_none(data):
+    """
+    Render a logo in a worker process, None when it cannot be decoded.
+    """
+    try:
+        return render_logo(data)
+    except Exception:
+        return None
+
+
+class Command(BaseCommand):
+    """
+    Render the logo derivatives of existing organizations.
+
+    Images are decoded and encoded across a process pool; files and rows are
+    written by the command itself, so workers need no database connection.
+
+    Usage:
+        python manage.py process_logos
+        python manage.py process_logos --force --workers 8
+    """
+    help = 'Render thumbnail and medium logo derivatives of existing organizations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Render logos whose derivatives are up to date as well'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Rendering processes (default: all cores)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Logos read into memory at once (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        batch_size = options['batch_size']
+        rows = Organization.objects.exclude(logo='').exclude(logo__isnull=True).values_list(
+            'pk', 'logo', 'logo_variants'
+        ).order_by('pk')
+
+        processed_count = 0
+        skipped_count = 0
+        error_count = 0
+        started = time.perf_counter()
+
+        def flush(batch, executor):
+            nonlocal processed_count, error_count
+            datas = []
+            for pk, logo, variants in batch:
+                with default_storage.open(logo, 'rb') as file:
+                    datas.append(file.read())
+            results = executor.map(render_or_none, datas) if executor else map(render_or_none, datas)
+            for (pk, logo, variants), rendered in zip(batch, results):
+                if rendered is None:
+                    error_count += 1
+                    self.stdout.write(self.style.ERROR(f'✗ Cannot decode logo of organization {pk}: {logo}'))
+                    continue
+                save_logo_variants(pk, logo, variants, rendered)
+                processed_count += 1
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            batch = []
+            for pk, logo, variants in rows.iterator():
+                if not options['force'] and (variants or {}).get('source') == logo:
+                    skipped_count += 1
+                    continue
+                if not default_storage.exists(logo):
+                    error_count += 1
+                    self.stdout.write(self.style.ERROR(f'✗ Missing file of organization {pk}: {logo}'))
+                    continue
+                batch.append((pk, logo, variants))
+                if len(batch) >= batch_size:
+                    flush(batch, executor)
+                    batch = []
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'... {processed_count} logos processed')
+            if batch:
+                flush(batch, executor)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        # Rows were written with update(), drop cached responses explicitly
+        cache.bump_generation()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Processed: {processed_count}, up to date: {skipped_count}, errors: {error_count}')
+        self.stdout.write(
+            f'Elapsed: {elapsed:.2f}s ({processed_count / elapsed if elapsed else 0:.1f} logos/s)'
+        )
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from organization.models import Organization
+from userbase.models import User
+
+
+def follow_count(field):
+    """
+    Return the number of follow rows whose ``field`` is the outer pk.
+    """
+    Follow = Organization.followers.through
+    return Coalesce(
+        Subquery(
+            Follow.objects.filter(**{field: OuterRef('pk')})
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    """
+    Recompute Organization.follower_count and User.followed_count from the
+    follow table.
+
+    The counters are maintained on every follow/unfollow; this repairs drift
+    caused by raw SQL or bulk writes that bypass them.
+
+    Usage:
+        python manage.py reconcile_follower_counts
+    """
+    help = 'Recompute organization follower counts and user followed counts from the follow table'
+
+    def handle(self, *args, **options):
+        actual = follow_count('organization_id')
+        updated = Organization.objects.annotate(actual=actual).exclude(
+            follower_count=F('actual')
+        ).update(follower_count=actual)
+        self.stdout.write(self.style.SUCCESS(f'Fixed follower counts of {updated} organizations'))
+
+        actual = follow_count('user_id')
+        updated = User.objects.annotate(actual=actual).exclude(
+            followed_count=F('actual')
+        ).update(followed_count=actual)
+        self.stdout.write(self.style.SUCCESS(f'Fixed followed counts of {updated} users'))
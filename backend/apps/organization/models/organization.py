@@ -1,10 +1,12 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.urls import reverse
 from os import path
 from uuid import uuid4
-from autoslug import AutoSlugField
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
+from core.models import BulkAutoSlugField
+from organization.validators import validate_logo
 
 
 def image_path(instance, filename):
@@ -28,8 +30,11 @@ class Organization(models.Model):
     logo = models.ImageField(
         upload_to=image_path,
         null=True,
-        blank=True
+        blank=True,
+        validators=[validate_logo]
     )
+    # Rendered sizes of the logo, see organization/logos.py
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
     org_type = models.IntegerField(
         choices=OrgType.choices,
         default=OrgType.SOLE_PROPRIETORSHIP
@@ -40,7 +45,11 @@ class Organization(models.Model):
         null=True,
         blank=True
     )
-    slug = AutoSlugField(populate_from="name", unique=True)
+    slug = BulkAutoSlugField(populate_from="name", unique=True)
+    # Maintained on follow/unfollow, see userbase/follows.py
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+    # Name and slug, filled by a database trigger on PostgreSQL, see organization/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -50,6 +59,22 @@ class Organization(models.Model):
         verbose_name = _("Organization")
         verbose_name_plural = _("Organizations")
         ordering = ["name"]
+        # Back the filters of OrganizationViewSet.get_queryset(). The trigram
+        # index for name search is PostgreSQL-only, see organization/indexes.py,
+        # the full-text search index is installed by organization/search.py
+        indexes = [
+            models.Index(fields=["name", "id"], name="org_name_id_idx"),
+            models.Index(
+                fields=["nation", "org_type", "headcount"],
+                name="org_nation_type_headcount_idx"
+            ),
+            models.Index(fields=["nation", "founding_date"], name="org_nation_founding_idx"),
+            models.Index(
+                fields=["headcount"],
+                name="org_headcount_notnull_idx",
+                condition=models.Q(headcount__isnull=False)
+            ),
+        ]
 
     def __str__(self):
         return self.name
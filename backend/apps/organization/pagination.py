@@ -0,0 +1,11 @@
+from core.pagination import AsyncCursorPagination
+
+
+class OrganizationCursorPagination(AsyncCursorPagination):
+    """
+    Keyset pagination over the (name, id) ordering of the organization list.
+
+    Pages are addressed by an opaque cursor instead of a page number, so no
+    COUNT(*) is issued and deep pages cost the same as the first one.
+    """
+    ordering = ("name", "id")
@@ -0,0 +1,146 @@
+"""
+Ranked full-text search over organization name and slug.
+
+On PostgreSQL ``Organization.search_vector`` is filled by a trigger and
+backed by a GIN index; on SQLite an FTS5 external-content table mirrors the
+organization table through triggers. Both are installed after ``migrate``
+(see ``signals.py``), so they also cover bulk_create and raw SQL writes.
+Any other backend falls back to ``name__icontains`` per term, unranked.
+
+Every term is matched as a prefix and all terms must match.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from organization.models import Organization
+
+SEARCH_VECTOR_INDEX = "org_search_vector_idx"
+SEARCH_VECTOR_TRIGGER = "org_search_vector_trg"
+SEARCH_VECTOR_FUNCTION = "org_search_vector_update"
+FTS_TABLE = "organization_fts"
+MAX_TERMS = 10
+
+
+def search_terms(query):
+    """
+    Return the lower-cased words of a search query, at most MAX_TERMS.
+    """
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def create_search_index(connection):
+    """
+    Install the search vector maintenance of the backend and index the
+    existing rows. Returns False when the backend has none. The SQLite FTS5
+    table is only filled when it is created, later calls recreate the
+    triggers alone.
+    """
+    table = connection.ops.quote_name(Organization._meta.db_table)
+    if connection.vendor == "postgresql":
+        vector = (
+            "setweight(to_tsvector('simple', coalesce({row}name, '')), 'A') || "
+            "setweight(to_tsvector('simple', replace(coalesce({row}slug, ''), '-', ' ')), 'B')"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE OR REPLACE FUNCTION {SEARCH_VECTOR_FUNCTION}() RETURNS trigger AS $$ "
+                f"BEGIN NEW.search_vector := {vector.format(row='NEW.')}; RETURN NEW; END "
+                f"$$ LANGUAGE plpgsql"
+            )
+            cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_VECTOR_TRIGGER} ON {table}")
+            cursor.execute(
+                f"CREATE TRIGGER {SEARCH_VECTOR_TRIGGER} BEFORE INSERT OR UPDATE ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION {SEARCH_VECTOR_FUNCTION}()"
+            )
+            cursor.execute(
+                f"UPDATE {table} SET search_vector = {vector.format(row='')} WHERE search_vector IS NULL"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {SEARCH_VECTOR_INDEX} ON {table} USING gin (search_vector)"
+            )
+        return True
+
+    if connection.vendor == "sqlite":
+        created = FTS_TABLE not in connection.introspection.table_names()
+        with connection.cursor() as cursor:
+            if created:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    f"name, slug, content={table}, content_rowid='id', "
+                    f"tokenize='unicode61 remove_diacritics 2')"
+                )
+            # Table rebuilds of later migrations drop the triggers, recreate them
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, name, slug) VALUES (new.id, new.name, new.slug); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, slug) "
+                f"VALUES ('delete', old.id, old.name, old.slug); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, slug ON {table} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, slug) "
+                f"VALUES ('delete', old.id, old.name, old.slug); "
+                f"INSERT INTO {FTS_TABLE}(rowid, name, slug) VALUES (new.id, new.name, new.slug); END"
+            )
+            if created:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        return True
+
+    return False
+
+
+def drop_search_index(connection):
+    """
+    Drop the GIN index of the search vector, e.g. to measure queries without
+    it. The SQLite FTS5 table is the search itself and is left alone.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX IF EXISTS {SEARCH_VECTOR_INDEX}")
+    return True
+
+
+def search_organizations(queryset, query):
+    """
+    Filter an Organization queryset to the rows matching ``query`` and
+    annotate them with ``search_rank``, higher is better.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "postgresql":
+        search = SearchQuery(" & ".join(f"{term}:*" for term in terms), search_type="raw", config="simple")
+        return queryset.filter(search_vector=search).annotate(
+            search_rank=SearchRank(F("search_vector"), search)
+        )
+
+    if vendor == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        table = connections[queryset.db].ops.quote_name(Organization._meta.db_table)
+        # bm25() is only available inside the MATCH query, looked up by rowid
+        # for each match. It is lower for better matches, name weighs twice the slug
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term)
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
@@ -1 +1,2 @@
-from .organization import OrganizationSerializer
+from .organization import OrganizationSerializer, LogoVariantsField
+from .rows import row_columns, build_rows
@@ -1,10 +1,33 @@
-
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
+from organization.logos import variant_urls
 from organization.models import Organization
 
 
-class OrganizationSerializer(serializers.ModelSerializer):
-    """Serializer for Organization model"""
+class LogoVariantsField(serializers.Field):
+    """
+    URLs and dimensions of the rendered logo sizes, null until they exist.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        request = self.context.get("request")
+        return variant_urls(
+            instance.logo.name, instance.logo_variants, request.build_absolute_uri if request else None
+        )
+
+
+class OrganizationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer for Organization model, with ?fields= / ?omit= selection"""
+    logo_variants = LogoVariantsField()
+
+    sparse_columns = {"logo_variants": ("logo", "logo_variants")}
+    # name is the cursor pagination key, updated_at feeds the validators
+    sparse_required_columns = ("id", "name", "updated_at")
 
     class Meta:
         model = Organization
@@ -13,6 +36,7 @@ class OrganizationSerializer(serializers.ModelSerializer):
             "name",
             "slug",
             "logo",
+            "logo_variants",
             "org_type",
             "nation",
             "founding_date",
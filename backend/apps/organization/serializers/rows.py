@@ -0,0 +1,79 @@
+"""
+Fast read path of the organization lists.
+
+Instead of instantiating models and running them through the serializer
+fields, list pages are read as ``values_list()`` tuples and turned into dicts
+by a function generated once per field selection:
+
+    columns = row_columns(fields)
+    page = queryset.values_list(*columns, named=True)[:20]
+    data = build_rows(page, fields, columns, request.build_absolute_uri)
+
+The dicts are equal to what OrganizationSerializer (or
+FollowedOrganizationSerializer, without a request) returns for the same rows,
+so both paths render to the same bytes. Used when ORGANIZATION_FAST_LIST is
+set.
+"""
+from functools import lru_cache
+
+from django.core.files.storage import default_storage
+
+from organization.logos import variant_urls
+from organization.serializers.organization import OrganizationSerializer
+
+
+def _logo_url(name, build_url):
+    if not name:
+        return None
+    url = default_storage.url(name)
+    return build_url(url) if build_url else url
+
+
+def _iso_date(value):
+    return value.isoformat() if value else None
+
+
+# field -> expression over the row, {column} is replaced by the index of a column
+FIELD_EXPRESSIONS = {
+    "id": "row[{id}]",
+    "name": "row[{name}]",
+    "slug": "row[{slug}]",
+    "logo": "_logo_url(row[{logo}], build_url)",
+    "logo_variants": "_variant_urls(row[{logo}], row[{logo_variants}], build_url)",
+    "org_type": "row[{org_type}]",
+    "nation": "row[{nation}]",
+    "founding_date": "_iso_date(row[{founding_date}])",
+    "headcount": "row[{headcount}]",
+}
+
+
+def row_columns(fields, prefix=""):
+    """
+    Return the columns to read with values_list() to build ``fields``,
+    prefixed with ``prefix`` (``organization__`` from a related model).
+    """
+    return [prefix + column for column in OrganizationSerializer.get_sparse_columns(fields)]
+
+
+@lru_cache(maxsize=64)
+def compile_row_builder(fields, columns, prefix=""):
+    """
+    Return a function ``(row, build_url)`` building the dict of ``fields``
+    from a values_list() row of ``columns``.
+    """
+    indexes = {
+        column[len(prefix):]: index for index, column in enumerate(columns) if column.startswith(prefix)
+    }
+    items = ", ".join(f"{field!r}: {FIELD_EXPRESSIONS[field].format(**indexes)}" for field in fields)
+    source = f"def build_row(row, build_url):\n    return {{{items}}}\n"
+    namespace = {"_logo_url": _logo_url, "_variant_urls": variant_urls, "_iso_date": _iso_date}
+    exec(compile(source, "<organization row builder>", "exec"), namespace)
+    return namespace["build_row"]
+
+
+def build_rows(rows, fields, columns, build_url=None, prefix=""):
+    """
+    Return the serialized dicts of values_list() ``rows``.
+    """
+    build_row = compile_row_builder(tuple(fields), tuple(columns), prefix)
+    return [build_row(row, build_url) for row in rows]
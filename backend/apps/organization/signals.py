@@ -0,0 +1,36 @@
+from django.db import connections
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from organization import cache
+from organization.indexes import create_name_trigram_index
+from organization.logos import schedule_logo_processing
+from organization.models import Organization
+from organization.search import create_search_index
+
+
+def install_database_indexes(sender, using="default", **kwargs):
+    """
+    Install backend-specific indexes once the schema is migrated.
+    """
+    create_name_trigram_index(connections[using])
+    create_search_index(connections[using])
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def invalidate_organization_cache(sender, **kwargs):
+    """
+    Drop every cached organization response after a write.
+    """
+    cache.bump_generation()
+
+
+@receiver(post_save, sender=Organization)
+def process_uploaded_logo(sender, instance, **kwargs):
+    """
+    Render the derivatives of a new logo in the background.
+    """
+    if "logo" in instance.get_deferred_fields() or not instance.logo:
+        return
+    if (instance.logo_variants or {}).get("source") != instance.logo.name:
+        schedule_logo_processing(instance.pk)
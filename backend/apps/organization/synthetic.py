@@ -0,0 +1,243 @@
+"""
+Synthetic organizations, users and follows for performance work.
+
+Rows are generated in chunks: chunk ``n`` of a table only depends on the
+seed and ``n``, so a data set is the same whatever the number of worker
+processes, and generating it again (or with larger counts) only adds the
+missing rows. Every row is written with ``ON CONFLICT DO NOTHING``, on
+PostgreSQL through COPY into a temporary table.
+
+Distributions, loosely after company registries:
+- nation: a few countries hold most organizations (NATIONS weights)
+- org_type: mostly sole proprietorships and SMEs, few holdings
+- founding_date: exponentially more recent foundations, back to 1850
+- headcount: log-normal per org_type, unknown for 5%
+- follows: users follow a Pareto distributed number of organizations,
+  picked with Zipf popularity (a few organizations get most followers)
+
+Kept free of model imports at module level so that the functions can run
+in worker processes.
+"""
+import csv
+import io
+import math
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from django.utils.text import slugify
+
+NATIONS = (
+    ("TR", 30), ("US", 20), ("DE", 8), ("GB", 7), ("FR", 5), ("NL", 4), ("JP", 4),
+    ("CN", 4), ("IN", 3), ("IT", 3), ("ES", 2), ("CH", 2), ("SE", 2), ("BR", 2),
+    ("CA", 1), ("KR", 1), ("AZ", 1), ("AE", 1),
+)
+# Sole proprietorship, holding, SME, NGO
+ORG_TYPES = ((0, 45), (1, 2), (2, 43), (3, 10))
+# Median and spread (log-normal sigma) of the headcount per org_type
+HEADCOUNTS = {0: (2, 0.8), 1: (2000, 1.5), 2: (25, 1.2), 3: (10, 1.3)}
+SUFFIXES = {
+    0: ("", "Studio", "Atelier", "Workshop"),
+    1: ("Holding", "Group", "Holding Inc."),
+    2: ("Ltd.", "Inc.", "Co.", "GmbH", "A.Ş."),
+    3: ("Foundation", "Association", "Initiative"),
+}
+PREFIXES = (
+    "Anadolu", "Atlas", "Aurora", "Boğaziçi", "Blue", "Bright", "Cedar", "Delta", "Ege",
+    "Evergreen", "Global", "Golden", "Harbor", "Kuzey", "Marmara", "Nova", "Orion",
+    "Pioneer", "Summit", "Toros", "United", "Vertex", "Yıldız", "Zenith",
+)
+CORES = (
+    "Tech", "Foods", "Energy", "Logistics", "Health", "Media", "Textile", "Systems", "Labs",
+    "Trade", "Construction", "Software", "Automotive", "Finance", "Agro", "Pharma",
+    "Robotics", "Tourism", "Education", "Design",
+)
+
+ORGANIZATION_COLUMNS = (
+    "name", "slug", "org_type", "nation", "founding_date", "headcount",
+    "logo_variants", "follower_count", "created_at", "updated_at",
+)
+USER_COLUMNS = (
+    "username", "email", "password", "first_name", "last_name",
+    "is_superuser", "is_staff", "is_active", "date_joined", "follow_version", "followed_count",
+)
+FOLLOW_COLUMNS = ("user_id", "organization_id")
+
+USERNAME_PREFIX = "synthetic-"
+MAX_FOLLOWS = 1000
+# Dates are relative to a fixed time, so rows do not depend on when they
+# are generated
+REFERENCE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def chunk_random(seed, table, chunk):
+    return random.Random(f"{seed}:{table}:{chunk}")
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def organization_rows(seed, chunk, start, stop):
+    """
+    Return the organizations ``start`` to ``stop`` (chunk ``chunk``) as
+    tuples of ORGANIZATION_COLUMNS.
+    """
+    rng = chunk_random(seed, "organizations", chunk)
+    today = REFERENCE_TIME.date()
+    rows = []
+    for index in range(start, stop):
+        org_type = weighted(rng, ORG_TYPES)
+        name = " ".join(filter(None, (
+            rng.choice(PREFIXES), rng.choice(CORES), rng.choice(SUFFIXES[org_type])
+        )))
+        # Unique by construction, no lookup needed
+        tail = f"-{index}"
+        slug = slugify(name)[:50 - len(tail)] + tail
+
+        age = min(rng.expovariate(1 / 15), today.year - 1850)
+        founding_date = max(today - timedelta(days=int(age * 365.25)), date(1850, 1, 1))
+        median, sigma = HEADCOUNTS[org_type]
+        headcount = None if rng.random() < 0.05 else max(1, int(rng.lognormvariate(math.log(median), sigma)))
+        created_at = REFERENCE_TIME - timedelta(seconds=rng.randint(0, 3 * 365 * 86400))
+        rows.append((
+            name, slug, org_type, weighted(rng, NATIONS), founding_date, headcount,
+            "{}", 0, created_at, created_at,
+        ))
+    return rows
+
+
+def user_rows(seed, chunk, start, stop, password):
+    """
+    Return the users ``start`` to ``stop`` as tuples of USER_COLUMNS, all
+    with the same (already hashed) ``password``.
+    """
+    rng = chunk_random(seed, "users", chunk)
+    rows = []
+    for index in range(start, stop):
+        username = f"{USERNAME_PREFIX}{index}"
+        date_joined = REFERENCE_TIME - timedelta(seconds=rng.randint(0, 3 * 365 * 86400))
+        rows.append((
+            username, f"{username}@example.com", password, "", "",
+            False, False, True, date_joined, 0, 0,
+        ))
+    return rows
+
+
+def follow_rows(seed, chunk, user_ids, organization_ids, mean):
+    """
+    Return the follows of ``user_ids`` (chunk ``chunk`` of the users) as
+    ``(user_id, organization_id)`` tuples, ``mean`` follows per user on
+    average.
+
+    Popularity ranks are spread over ``organization_ids`` by a fixed
+    stride, so the most followed organizations are not the oldest ones.
+    """
+    rng = chunk_random(seed, "follows", chunk)
+    total = len(organization_ids)
+    if not total:
+        return []
+    # Pareto with alpha 1.5 has a mean of 3 * scale
+    scale = mean / 3
+    stride = next(step for step in (7919, 104729, 1299709, 1) if math.gcd(step, total) == 1)
+    rows = []
+    for user_id in user_ids:
+        count = min(int(scale * rng.paretovariate(1.5)), MAX_FOLLOWS, total)
+        followed = set()
+        for _ in range(count * 2):
+            if len(followed) >= count:
+                break
+            # Zipf (s=1) rank: log-uniform over 1..total
+            rank = int(total ** rng.random()) - 1
+            followed.add(organization_ids[(rank * stride) % total])
+        rows.extend((user_id, organization_id) for organization_id in followed)
+    return rows
+
+
+def write_rows(connection, table, columns, rows, unique):
+    """
+    Insert ``rows`` into ``table``, skipping those that conflict with the
+    ``unique`` columns. Return the number of rows inserted.
+    """
+    if not rows:
+        return 0
+    quote = connection.ops.quote_name
+    names = ", ".join(quote(column) for column in columns)
+    conflict = f"ON CONFLICT ({', '.join(quote(column) for column in unique)}) DO NOTHING"
+
+    with connection.cursor() as cursor:
+        if connection.vendor != "postgresql":
+            adapt = {
+                datetime: connection.ops.adapt_datetimefield_value,
+                date: connection.ops.adapt_datefield_value,
+            }
+            rows = [[adapt[type(value)](value) if type(value) in adapt else value for value in row] for row in rows]
+            placeholders = ", ".join(["%s"] * len(columns))
+            cursor.executemany(f"INSERT INTO {quote(table)} ({names}) VALUES ({placeholders}) {conflict}", rows)
+            return cursor.rowcount
+
+        staging = quote(f"{table}_synthetic")
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging} AS SELECT {names} FROM {quote(table)} WITH NO DATA"
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["\\N" if value is None else value for value in row])
+        sql = f"COPY {staging} ({names}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            # psycopg2
+            buffer.seek(0)
+            raw.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        cursor.execute(f"INSERT INTO {quote(table)} ({names}) SELECT {names} FROM {staging} {conflict}")
+        inserted = cursor.rowcount
+        cursor.execute(f"TRUNCATE {staging}")
+        return inserted
+
+
+# Organization ids the follows point to, see setup_worker()
+organization_ids = None
+
+
+def setup_worker(ids=None):
+    """
+    ProcessPoolExecutor initializer: set Django up in spawned workers
+    (forked ones inherit it) and the organization ids of the follow phase.
+    Each worker opens its own database connection.
+    """
+    global organization_ids
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    organization_ids = ids
+
+
+def write_chunk(kind, seed, chunk, args):
+    """
+    Generate and write one chunk of ``kind`` (organizations, users or
+    follows) in the current process. Return the number of rows inserted.
+    """
+    from django.db import connection, transaction
+    from organization.models import Organization
+    from userbase.follows import Follow
+    from userbase.models import User
+
+    if kind == "organizations":
+        table, columns, unique = Organization._meta.db_table, ORGANIZATION_COLUMNS, ("slug",)
+        rows = organization_rows(seed, chunk, *args)
+    elif kind == "users":
+        table, columns, unique = User._meta.db_table, USER_COLUMNS, ("username",)
+        rows = user_rows(seed, chunk, *args)
+    else:
+        user_ids, mean = args
+        table, columns, unique = Follow._meta.db_table, FOLLOW_COLUMNS, FOLLOW_COLUMNS
+        rows = follow_rows(seed, chunk, user_ids, organization_ids, mean)
+    with transaction.atomic():
+        return write_rows(connection, table, columns, rows, unique)
@@ -1,10 +1,38 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.renderers import FastJSONRenderer
+from core.views import async_read_view
 from django.contrib.auth import get_user_model
+from django_countries import countries
+from organization import synthetic
+from organization.serializers import build_rows
 from organization.models import Organization
+from organization.views.asynchronous import organization_list, organization_detail
 from datetime import date
+from PIL import Image
 
 User = get_user_model()
 
@@ -277,3 +305,917 @@ class OrganizationPermissionTest(APITestCase):
         }
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class OrganizationCursorPaginationTest(APITestCase):
+    """Test opt-in keyset pagination of the organization list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(25):
+            Organization.objects.create(
+                name=f"Org {i:02d}",
+                org_type=Organization.OrgType.SME,
+                nation="TR",
+                founding_date=date(2020, 1, 1)
+            )
+
+    def test_page_number_pagination_is_default(self):
+        """Test that the list keeps page number pagination by default"""
+        url = reverse('organization-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+
+    def test_cursor_pagination_skips_count(self):
+        """Test that cursor mode returns opaque links and no count"""
+        url = reverse('organization-list')
+        response = self.client.get(url, {'pagination': 'cursor'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNone(response.data['previous'])
+        self.assertIn('cursor=', response.data['next'])
+
+    def test_cursor_pagination_walks_all_pages(self):
+        """Test that following next links visits every organization once"""
+        url = reverse('organization-list')
+        response = self.client.get(url, {'pagination': 'cursor'})
+        names = [org['name'] for org in response.data['results']]
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names += [org['name'] for org in response.data['results']]
+
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(names, [f"Org {i:02d}" for i in range(25)])
+
+    def test_cursor_pagination_across_duplicate_names(self):
+        """Test pages inside a run of equal names use the (name, id) keyset, not an OFFSET"""
+        for _ in range(30):
+            Organization.objects.create(
+                name="Org 10",
+                org_type=Organization.OrgType.SME,
+                nation="TR",
+                founding_date=date(2020, 1, 1)
+            )
+        expected = list(Organization.objects.order_by('name', 'id').values_list('slug', flat=True))
+
+        slugs, pages = [], []
+        url = f"{reverse('organization-list')}?pagination=cursor"
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertFalse([query['sql'] for query in queries if 'OFFSET' in query['sql']])
+            pages.append(response.data)
+            slugs += [org['slug'] for org in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(slugs, expected)
+
+        # Walking back from the last page gives the same pages
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(response.data['results'], pages[-2]['results'])
+
+    def test_cursor_pagination_keeps_filters(self):
+        """Test that filters apply in cursor mode"""
+        url = reverse('organization-list')
+        response = self.client.get(url, {'pagination': 'cursor', 'name': 'Org 1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIsNone(response.data['next'])
+
+
+class LoadSampleOrganizationsBulkTest(TestCase):
+    """Test the bulk mode of load_sample_organizations"""
+
+    records = [
+        {"name": "Alpha Corp", "org_type": 1, "nation": "US", "founding_date": "1990-01-01", "headcount": 500},
+        {"name": "Beta NGO", "org_type": 3, "nation": "TR", "founding_date": "2010-05-05", "headcount": None},
+        {"name": "Alpha Corp", "org_type": 2, "nation": "DE", "founding_date": "2001-01-01", "headcount": 5},
+    ]
+
+    def write(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            file.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def load(self, path, *args):
+        out = io.StringIO()
+        call_command("load_sample_organizations", "--bulk", "--file", path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_iter_json_array_streams_small_chunks(self):
+        """Test the JSON array reader across chunk boundaries"""
+        from core.management.readers import iter_json_array
+        document = json.dumps(self.records, indent=2)
+        items = list(iter_json_array(io.StringIO(document), chunk_size=7))
+        self.assertEqual(items, self.records)
+        self.assertEqual(list(iter_json_array(io.StringIO(" [ ] "))), [])
+
+    def test_bulk_json(self):
+        """Test bulk loading a JSON array matches records by name"""
+        output = self.load(self.write(".json", json.dumps(self.records)), "--batch-size", "1")
+        self.assertEqual(Organization.objects.count(), 2)
+        self.assertIn("records/s", output)
+        self.assertNotIn("Created:", output)
+
+    def test_bulk_is_idempotent(self):
+        """Test loading the same file twice creates nothing the second time"""
+        path = self.write(".ndjson", "\n".join(json.dumps(record) for record in self.records))
+        self.load(path)
+        output = self.load(path)
+        self.assertEqual(Organization.objects.count(), 2)
+        self.assertIn("Already existed: 3", output)
+
+    def test_bulk_update(self):
+        """Test --update overwrites existing organizations"""
+        Organization.objects.create(
+            name="Alpha Corp", org_type=Organization.OrgType.SME, nation="FR", founding_date=date(2000, 1, 1)
+        )
+        path = self.write(".ndjson", json.dumps(self.records[0]))
+        self.load(path, "--update")
+        org = Organization.objects.get(name="Alpha Corp")
+        self.assertEqual(org.nation, "US")
+        self.assertEqual(org.headcount, 500)
+        self.assertEqual(org.slug, "alpha-corp")
+
+    def test_bulk_csv_reserves_unique_slugs(self):
+        """Test slugs reserved in memory do not collide with existing ones"""
+        Organization.objects.create(
+            name="Gamma", org_type=Organization.OrgType.SME, nation="FR", founding_date=date(2000, 1, 1)
+        )
+        Organization.objects.create(
+            name="gamma!", org_type=Organization.OrgType.SME, nation="FR", founding_date=date(2000, 1, 1)
+        )
+        path = self.write(
+            ".csv",
+            "name,org_type,nation,founding_date,headcount\n"
+            "GAMMA,2,TR,2015-01-01,\n"
+            "Delta,0,US,2016-01-01,12\n"
+        )
+        self.load(path)
+        self.assertEqual(Organization.objects.get(name="GAMMA").slug, "gamma-3")
+        self.assertEqual(Organization.objects.get(name="Delta").headcount, 12)
+        self.assertIsNone(Organization.objects.get(name="GAMMA").headcount)
+
+    def test_bulk_counts_inserted_rows(self):
+        """Test rows dropped by ignore_conflicts are not counted as created"""
+        from organization.management.commands import load_sample_organizations
+
+        def concurrent_insert(path, file_format):
+            # Another writer inserts Beta NGO after the existing names were read
+            Organization.objects.create(
+                name="Beta NGO", org_type=Organization.OrgType.SME, nation="FR", founding_date=date(2000, 1, 1)
+            )
+            yield from self.records[:2]
+
+        with mock.patch.object(load_sample_organizations, "iter_records", concurrent_insert):
+            output = self.load(self.write(".json", "[]"))
+        self.assertIn("Successfully created: 1", output)
+        self.assertIn("Already existed: 1", output)
+        self.assertEqual(Organization.objects.get(name="Beta NGO").nation, "FR")
+
+    def test_bulk_write_error(self):
+        """Test a failed batch is reported as a write error and the load goes on"""
+        bulk_create = Organization.objects.bulk_create
+        calls = []
+
+        def fail_first(objs, **kwargs):
+            calls.append(len(objs))
+            if len(calls) == 1:
+                raise IntegrityError("boom")
+            return bulk_create(objs, **kwargs)
+
+        path = self.write(".json", json.dumps(self.records[:2]))
+        with mock.patch.object(Organization.objects, "bulk_create", side_effect=fail_first):
+            output = self.load(path, "--batch-size", "1")
+        self.assertNotIn("Error reading", output)
+        self.assertIn("Not written: 1", output)
+        self.assertIn("Successfully created: 1", output)
+        self.assertEqual(list(Organization.objects.values_list("name", flat=True)), ["Beta NGO"])
+
+    def test_background_import(self):
+        """Test --background queues a job that loads the file"""
+        path = self.write(".json", json.dumps(self.records))
+        output = self.load(path, "--background")
+        self.assertIn("Queued import job", output)
+        self.assertEqual(Organization.objects.count(), 0)
+
+        call_command("run_jobs", burst=True, stdout=io.StringIO())
+        self.assertEqual(Organization.objects.count(), 2)
+
+
+class GenerateSyntheticDataTest(TestCase):
+    """Test generate_synthetic_data"""
+
+    def generate(self, **options):
+        options = {"organizations": 300, "users": 40, "follows": 5, "chunk_size": 100, "workers": 1, **options}
+        call_command("generate_synthetic_data", stdout=io.StringIO(), **options)
+
+    def test_deterministic(self):
+        """Test a chunk only depends on the seed and its position"""
+        rows = synthetic.organization_rows(1, 3, 300, 400)
+        self.assertEqual(rows, synthetic.organization_rows(1, 3, 300, 400))
+        self.assertNotEqual(rows, synthetic.organization_rows(2, 3, 300, 400))
+        self.assertEqual(len({row[1] for row in rows}), 100)
+
+        follows = synthetic.follow_rows(1, 0, [1, 2, 3], list(range(100, 200)), 10)
+        self.assertEqual(follows, synthetic.follow_rows(1, 0, [1, 2, 3], list(range(100, 200)), 10))
+        self.assertTrue(all(100 <= organization_id < 200 for _, organization_id in follows))
+
+    def test_distributions(self):
+        rows = synthetic.organization_rows(1, 0, 0, 5000)
+        nations = [row[3] for row in rows]
+        self.assertEqual(max(set(nations), key=nations.count), "TR")
+        org_types = [row[2] for row in rows]
+        self.assertLess(org_types.count(Organization.OrgType.HOLDING), org_types.count(Organization.OrgType.SME) / 5)
+        self.assertTrue(any(row[5] is None for row in rows))
+
+    def test_generate(self):
+        self.generate()
+        Follow = User.followed_organizations.through
+        self.assertEqual(Organization.objects.count(), 300)
+        self.assertEqual(User.objects.filter(username__startswith=synthetic.USERNAME_PREFIX).count(), 40)
+        follows = Follow.objects.count()
+        self.assertGreater(follows, 0)
+
+        # Counters match the follow rows
+        org = Organization.objects.order_by("-follower_count").first()
+        self.assertEqual(org.follower_count, Follow.objects.filter(organization=org).count())
+        self.assertEqual(sum(User.objects.values_list("followed_count", flat=True)), follows)
+        # Synthetic rows are served like any other
+        response = self.client.get(f"/api/organizations/{org.slug}/")
+        self.assertEqual(response.status_code, 200)
+
+        # Same data set again: nothing added; larger: only the missing rows
+        snapshot = list(Organization.objects.order_by("slug").values_list("slug", "nation", "headcount"))
+        self.generate()
+        self.assertEqual(Follow.objects.count(), follows)
+        self.generate(organizations=350)
+        self.assertEqual(Organization.objects.count(), 350)
+        self.assertEqual(
+            list(Organization.objects.filter(slug__in=[row[0] for row in snapshot])
+                 .order_by("slug").values_list("slug", "nation", "headcount")),
+            snapshot,
+        )
+
+
+@override_settings(ORGANIZATION_CACHE_TIMEOUT=300)
+class OrganizationResponseCacheTest(APITestCase):
+    """Test the response cache of the list and detail endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.org = Organization.objects.create(
+            name="Cached Org",
+            org_type=Organization.OrgType.SME,
+            nation="TR",
+            founding_date=date(2020, 1, 1)
+        )
+        Organization.objects.create(
+            name="Other Org",
+            org_type=Organization.OrgType.NGO,
+            nation="US",
+            founding_date=date(2010, 1, 1)
+        )
+
+    def test_locmem_cache_is_refused(self):
+        """Test enabling the cache on the per-process locmem backend fails at startup"""
+        def load_settings(backend):
+            env = {**os.environ, "CACHE_BACKEND": backend, "ORGANIZATION_CACHE_TIMEOUT": "300"}
+            return subprocess.run(
+                [sys.executable, "-c", "import config.settings"],
+                env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+            )
+
+        result = load_settings("locmem")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("ImproperlyConfigured: ORGANIZATION_CACHE_TIMEOUT needs a cache shared", result.stderr)
+        self.assertEqual(load_settings("db").returncode, 0)
+
+    def test_list_is_cached(self):
+        """Test a repeated list request runs no query"""
+        url = reverse('organization-list')
+        first = self.client.get(url, {'org_type': '3,2'})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'org_type': '2,3'})
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertIn('Last-Modified', second)
+
+    def test_detail_is_cached(self):
+        """Test a repeated detail request runs no query"""
+        url = reverse('organization-detail', kwargs={'slug': self.org.slug})
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data['name'], 'Cached Org')
+        self.assertTrue(response['ETag'])
+
+    def test_write_invalidates_cache(self):
+        """Test saving and deleting organizations invalidates cached responses"""
+        list_url = reverse('organization-list')
+        detail_url = reverse('organization-detail', kwargs={'slug': self.org.slug})
+        etag = self.client.get(list_url)['ETag']
+        self.client.get(detail_url)
+
+        self.org.name = "Renamed Org"
+        self.org.save()
+        response = self.client.get(list_url)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Renamed Org', [org['name'] for org in response.data['results']])
+        self.assertEqual(self.client.get(detail_url).data['name'], 'Renamed Org')
+
+        self.org.delete()
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(list_url).data['count'], 1)
+
+    @override_settings(ORGANIZATION_CACHE_TIMEOUT=0)
+    def test_disabled_cache_is_not_written(self):
+        """Test writes do not bump the generation when the cache is off"""
+        with mock.patch("organization.cache.get_cache") as get_cache:
+            self.org.headcount = 10
+            self.org.save()
+            self.org.delete()
+            call_command("process_logos", stdout=io.StringIO())
+        self.assertFalse(get_cache.called)
+
+
+class OrganizationConditionalGetTest(APITestCase):
+    """Test ETag / Last-Modified handling of the detail endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.org = Organization.objects.create(
+            name="Polled Org",
+            org_type=Organization.OrgType.SME,
+            nation="TR",
+            founding_date=date(2020, 1, 1)
+        )
+        self.url = reverse('organization-detail', kwargs={'slug': self.org.slug})
+
+    def test_if_none_match_returns_304(self):
+        """Test an unchanged organization is answered with 304"""
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+    def test_if_modified_since_returns_304(self):
+        """Test Last-Modified round trips through If-Modified-Since"""
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(ORGANIZATION_CACHE_TIMEOUT=0)
+    def test_304_without_cache_skips_serializer(self):
+        """Test validators are checked with a single query when the cache is off"""
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changed_organization_returns_200(self):
+        """Test a modified organization returns a fresh body"""
+        etag = self.client.get(self.url)['ETag']
+        self.org.headcount = 10
+        self.org.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class OrganizationExportTest(APITestCase):
+    """Test the streaming export action"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('organization-export')
+        Organization.objects.create(
+            name="Export One",
+            org_type=Organization.OrgType.SME,
+            nation="TR",
+            founding_date=date(2020, 1, 1),
+            headcount=12
+        )
+        Organization.objects.create(
+            name="Export Two",
+            org_type=Organization.OrgType.HOLDING,
+            nation="US",
+            founding_date=date(1990, 5, 17)
+        )
+
+    def content(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_csv_export(self):
+        """Test the default CSV export with the list filters applied"""
+        response = self.client.get(self.url, {'country': 'TR'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.content(response).decode())))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['name'], "Export One")
+        self.assertEqual(rows[0]['founding_date'], "2020-01-01")
+        self.assertEqual(rows[0]['headcount'], "12")
+
+    def test_ndjson_export_matches_api(self):
+        """Test NDJSON rows carry the same values as the list endpoint"""
+        response = self.client.get(self.url, {'output': 'ndjson'})
+        rows = [json.loads(line) for line in self.content(response).decode().splitlines()]
+        listed = self.client.get(reverse('organization-list')).data['results']
+        self.assertEqual(rows, [dict(org) for org in listed])
+
+    def test_gzip_export(self):
+        """Test the stream is gzip compressed on request"""
+        response = self.client.get(self.url, {'output': 'ndjson', 'compress': 'gzip'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('organizations.ndjson.gz', response['Content-Disposition'])
+        lines = gzip.decompress(self.content(response)).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+
+    async def test_asgi_export(self):
+        """Test the export is streamed from an async iterator under ASGI"""
+        response = await self.async_client.get(self.url, {'output': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        expected = await sync_to_async(lambda: self.content(self.client.get(self.url, {'output': 'ndjson'})))()
+        self.assertEqual(content, expected)
+
+    def test_unknown_output(self):
+        """Test an unsupported output is rejected"""
+        response = self.client.get(self.url, {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OrganizationSearchTest(APITestCase):
+    """Test the q= full-text search"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('organization-list')
+        for name, nation in [
+            ("Acme Robotics", "US"),
+            ("Acme", "TR"),
+            ("Robotic Foods", "TR"),
+            ("Global Media", "US"),
+        ]:
+            Organization.objects.create(
+                name=name,
+                org_type=Organization.OrgType.SME,
+                nation=nation,
+                founding_date=date(2020, 1, 1)
+            )
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [org['name'] for org in response.data['results']]
+
+    def test_prefix_match(self):
+        """Test terms match as prefixes and all terms must match"""
+        self.assertEqual(sorted(self.search(q="robot")), ["Acme Robotics", "Robotic Foods"])
+        self.assertEqual(self.search(q="acm rob"), ["Acme Robotics"])
+        self.assertEqual(self.search(q="nothing"), [])
+
+    def test_ranking(self):
+        """Test closer matches are ranked first"""
+        self.assertEqual(self.search(q="acme"), ["Acme", "Acme Robotics"])
+
+    def test_combined_with_filters(self):
+        """Test q combines with the structured filters"""
+        self.assertEqual(self.search(q="acme", country="US"), ["Acme Robotics"])
+
+    def test_export_and_cursor_pages(self):
+        """Test q applies to the export and to keyset pages"""
+        response = self.client.get(reverse('organization-export'), {'q': 'acme', 'output': 'ndjson'})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], ["Acme", "Acme Robotics"])
+        self.assertEqual(self.search(q="robot", pagination="cursor"), ["Acme Robotics", "Robotic Foods"])
+
+    def test_index_follows_writes(self):
+        """Test renames and deletes are reflected in the results"""
+        org = Organization.objects.get(name="Global Media")
+        org.name = "Global Robotics"
+        org.save()
+        self.assertIn("Global Robotics", self.search(q="robotics"))
+        self.assertEqual(self.search(q="global robo"), ["Global Robotics"])
+        org.delete()
+        self.assertNotIn("Global Robotics", self.search(q="robotics"))
+
+    def test_slug_is_searched(self):
+        """Test the slug is part of the search document"""
+        org = Organization.objects.get(name="Acme")
+        Organization.objects.filter(pk=org.pk).update(slug="zenith-acme")
+        self.assertEqual(self.search(q="zenith"), ["Acme"])
+
+    def test_reinstall_keeps_index(self):
+        """Test installing the search again after a migrate does not reindex"""
+        from organization.search import create_search_index
+        with CaptureQueriesContext(connection) as queries:
+            create_search_index(connection)
+        self.assertFalse([query for query in queries if "rebuild" in query["sql"]])
+        self.assertEqual(sorted(self.search(q="robot")), ["Acme Robotics", "Robotic Foods"])
+
+
+class OrganizationFacetsTest(APITestCase):
+    """Test the facet counts action"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('organization-facets')
+        for name, org_type, nation, founded, headcount in [
+            ("Facet One", Organization.OrgType.SME, "TR", date(1995, 3, 1), 12),
+            ("Facet Two", Organization.OrgType.SME, "US", date(1999, 3, 1), 300),
+            ("Facet Three", Organization.OrgType.NGO, "TR", date(2004, 3, 1), None),
+            ("Facet Four", Organization.OrgType.HOLDING, "DE", date(2010, 3, 1), 8000),
+        ]:
+            Organization.objects.create(
+                name=name, org_type=org_type, nation=nation, founding_date=founded, headcount=headcount
+            )
+
+    def counts(self, data, facet):
+        return {item['value']: item['count'] for item in data[facet]}
+
+    def test_unfiltered_counts(self):
+        """Test every facet counts the whole table"""
+        data = self.client.get(self.url).data
+        self.assertEqual(self.counts(data, 'org_type'), {2: 2, 3: 1, 1: 1})
+        self.assertEqual(self.counts(data, 'nation'), {"TR": 2, "US": 1, "DE": 1})
+        self.assertEqual(
+            self.counts(data, 'headcount'), {"10-49": 1, "250-999": 1, "5000+": 1, "unknown": 1}
+        )
+        self.assertEqual(self.counts(data, 'founding_decade'), {1990: 2, 2000: 1, 2010: 1})
+        self.assertEqual(data['nation'][0]["label"], countries.name("TR"))
+        self.assertEqual(data['org_type'][0]["label"], Organization.OrgType.SME.label)
+
+    def test_own_filter_is_excluded(self):
+        """Test a facet ignores its own filter but applies the others"""
+        data = self.client.get(self.url, {'country': 'TR'}).data
+        self.assertEqual(self.counts(data, 'nation'), {"TR": 2, "US": 1, "DE": 1})
+        self.assertEqual(self.counts(data, 'org_type'), {2: 1, 3: 1})
+        self.assertEqual(self.counts(data, 'founding_decade'), {1990: 1, 2000: 1})
+
+    @override_settings(ORGANIZATION_CACHE_TIMEOUT=300)
+    def test_single_query_and_cache(self):
+        """Test the facets come from one query and are cached per filter key"""
+        with self.assertNumQueries(1):
+            first = self.client.get(self.url, {'org_type': '3,2'}).data
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {'org_type': '2,3'}).data
+        self.assertEqual(first, second)
+        Organization.objects.create(
+            name="Facet Five", org_type=Organization.OrgType.SME, nation="TR", founding_date=date(2001, 1, 1)
+        )
+        self.assertEqual(self.counts(self.client.get(self.url).data, 'org_type')[2], 3)
+
+    def test_combined_with_search(self):
+        """Test the facets honour q"""
+        data = self.client.get(self.url, {'q': 'facet one'}).data
+        self.assertEqual(self.counts(data, 'nation'), {"TR": 1})
+
+
+def image_upload(name="logo.png", size=(1200, 600), image_format="PNG", exif=False):
+    """Return an uploaded image file for the logo tests"""
+    buffer = io.BytesIO()
+    image = Image.new("RGB", size, (200, 30, 30))
+    kwargs = {}
+    if exif:
+        data = Image.Exif()
+        data[0x010F] = "Camera Maker"
+        kwargs["exif"] = data.tobytes()
+    image.save(buffer, image_format, **kwargs)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{image_format.lower()}")
+
+
+@override_settings(JOBS_EAGER=True)
+class OrganizationLogoTest(APITestCase):
+    """Test logo validation and derivative rendering"""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.media = override_settings(MEDIA_ROOT=self.media_root)
+        self.media.enable()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="logos", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+        self.org = Organization.objects.create(
+            name="Logo Org",
+            org_type=Organization.OrgType.SME,
+            nation="TR",
+            founding_date=date(2020, 1, 1)
+        )
+        self.url = reverse('organization-detail', kwargs={'slug': self.org.slug})
+
+    def tearDown(self):
+        self.media.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def upload(self, file):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(self.url, {'logo': file}, format='multipart')
+
+    def test_upload_renders_derivatives(self):
+        """Test an upload gets WebP and PNG derivatives without metadata"""
+        response = self.upload(image_upload(exif=True))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.org.refresh_from_db()
+        variants = self.org.logo_variants
+        self.assertEqual(variants['source'], self.org.logo.name)
+        self.assertEqual((variants['width'], variants['height']), (1200, 600))
+        self.assertEqual((variants['thumbnail']['width'], variants['thumbnail']['height']), (128, 64))
+        self.assertEqual(variants['medium']['width'], 512)
+        for extension, image_format in (('webp', 'WEBP'), ('png', 'PNG')):
+            with Image.open(os.path.join(self.media_root, variants['medium'][extension])) as image:
+                self.assertEqual(image.format, image_format)
+                self.assertFalse(image.getexif())
+
+        data = self.client.get(self.url).data
+        self.assertTrue(data['logo_variants']['thumbnail']['webp'].startswith('http://testserver/media/'))
+        self.assertEqual(data['logo_variants']['thumbnail']['height'], 64)
+
+    def test_variants_hidden_until_rendered(self):
+        """Test logo_variants is null while the derivatives are pending"""
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.patch(self.url, {'logo': image_upload()}, format='multipart')
+        self.assertIsNone(self.client.get(self.url).data['logo_variants'])
+
+    def test_replacing_logo_deletes_old_derivatives(self):
+        """Test derivatives of a replaced logo are removed"""
+        self.upload(image_upload())
+        self.org.refresh_from_db()
+        old = self.org.logo_variants['thumbnail']['webp']
+        self.upload(image_upload(name="new.png", size=(300, 300)))
+        self.org.refresh_from_db()
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, old)))
+        self.assertEqual(self.org.logo_variants['thumbnail']['width'], 128)
+
+    def test_upload_validation(self):
+        """Test invalid and oversized uploads are rejected"""
+        response = self.upload(SimpleUploadedFile("logo.png", b"not an image", content_type="image/png"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(ORGANIZATION_LOGO_MAX_BYTES=1024):
+            response = self.upload(image_upload(size=(800, 800), image_format="BMP", name="logo.bmp"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('logo', response.data)
+
+    def test_stored_logo_is_not_validated_again(self):
+        """Test full_clean() does not open the stored logo, which may be missing"""
+        Organization.objects.filter(pk=self.org.pk).update(logo="organization/logos/missing.png")
+        self.org.refresh_from_db()
+        self.org.full_clean()
+
+        self.org.logo = SimpleUploadedFile("logo.png", b"not an image", content_type="image/png")
+        with self.assertRaises(ValidationError):
+            self.org.full_clean()
+
+    def test_backfill_command(self):
+        """Test process_logos renders logos stored without derivatives"""
+        upload = image_upload()
+        path = os.path.join(self.media_root, "organization", "logos", "existing.png")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as file:
+            file.write(upload.read())
+        Organization.objects.filter(pk=self.org.pk).update(logo="organization/logos/existing.png")
+
+        out = io.StringIO()
+        call_command('process_logos', workers=1, stdout=out)
+        self.assertIn('Processed: 1', out.getvalue())
+        self.org.refresh_from_db()
+        self.assertEqual(self.org.logo_variants['source'], "organization/logos/existing.png")
+
+        out = io.StringIO()
+        call_command('process_logos', workers=1, stdout=out)
+        self.assertIn('Processed: 0, up to date: 1', out.getvalue())
+
+
+class OrganizationSparseFieldsetTest(APITestCase):
+    """Test ?fields= and ?omit= selection of serialized fields"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.org = Organization.objects.create(
+            name="Sparse Org",
+            org_type=Organization.OrgType.SME,
+            nation="TR",
+            founding_date=date(2020, 1, 1),
+            headcount=10
+        )
+        self.list_url = reverse('organization-list')
+        self.detail_url = reverse('organization-detail', kwargs={'slug': self.org.slug})
+
+    def test_fields(self):
+        """Test only the listed fields are returned, in the usual order"""
+        response = self.client.get(self.list_url, {'fields': 'slug,name'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data['results'][0]), ['name', 'slug'])
+        response = self.client.get(self.detail_url, {'fields': 'logo,nation'})
+        self.assertEqual(response.data, {'logo': None, 'nation': 'TR'})
+
+    def test_omit(self):
+        """Test omitted fields are left out"""
+        response = self.client.get(self.detail_url, {'omit': 'logo_variants,headcount'})
+        self.assertEqual(
+            list(response.data), ['id', 'name', 'slug', 'logo', 'org_type', 'nation', 'founding_date']
+        )
+
+    def test_unknown_field(self):
+        """Test unknown names are rejected"""
+        response = self.client.get(self.list_url, {'fields': 'name,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', response.data['fields'][0])
+        response = self.client.get(self.detail_url, {'omit': 'id,name,slug,logo,logo_variants,'
+                                                             'org_type,nation,founding_date,headcount'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_only_selected_columns_are_read(self):
+        """Test the list query selects the columns of the picked fields only"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {'fields': 'name,slug', 'pagination': 'cursor'})
+        self.assertEqual(response.data['results'], [{'name': 'Sparse Org', 'slug': self.org.slug}])
+        sql = queries[-1]['sql']
+        self.assertIn('"slug"', sql)
+        self.assertNotIn('"headcount"', sql)
+        self.assertNotIn('"logo_variants"', sql)
+
+    def test_selections_are_cached_apart(self):
+        """Test cached responses and validators differ per field selection"""
+        full = self.client.get(self.detail_url)
+        sparse = self.client.get(self.detail_url, {'fields': 'name'})
+        self.assertEqual(sparse.data, {'name': 'Sparse Org'})
+        self.assertIn('headcount', self.client.get(self.detail_url).data)
+        self.assertNotEqual(full['ETag'], sparse['ETag'])
+        response = self.client.get(self.detail_url, {'omit': 'headcount'}, HTTP_IF_NONE_MATCH=full['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class OrganizationFastListTest(APITestCase):
+    """Test the values_list() list path renders the serializer's bytes"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        # Non-ASCII and U+2028, which JSONRenderer escapes
+        names = [("Tech Labs", "TR"), ("Ünal Gıda\u2028", "DE"), ("Tech Foods", "US")]
+        for i, (name, nation) in enumerate(names):
+            Organization.objects.create(
+                name=name,
+                org_type=Organization.OrgType.SME,
+                nation=nation,
+                founding_date=date(2000 + i, 1, 1),
+                headcount=None if i == 1 else i * 10
+            )
+        variants = {
+            "source": "organization/logos/tech.png", "width": 600, "height": 300,
+            "thumbnail": {"width": 128, "height": 64, "webp": "t.webp", "png": "t.png"},
+            "medium": {"width": 512, "height": 256, "webp": "m.webp", "png": "m.png"},
+        }
+        Organization.objects.filter(name="Tech Labs").update(
+            logo="organization/logos/tech.png", logo_variants=variants
+        )
+
+    def assertSameBytes(self, url, params):
+        with override_settings(ORGANIZATION_FAST_LIST=False):
+            cache.clear()
+            slow = self.client.get(url, params)
+        with override_settings(ORGANIZATION_FAST_LIST=True):
+            cache.clear()
+            fast = self.client.get(url, params)
+        self.assertEqual(slow.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_same_output(self):
+        """Test both paths give identical pages"""
+        url = reverse('organization-list')
+        response = self.assertSameBytes(url, {})
+        self.assertEqual(response.data['count'], 3)
+        self.assertIn(b'\\u2028', response.content)
+        self.assertSameBytes(url, {'pagination': 'cursor'})
+        self.assertSameBytes(url, {'q': 'tech', 'omit': 'headcount'})
+        self.assertSameBytes(url, {'fields': 'logo_variants,name', 'country': 'TR'})
+
+    def test_renderer_follows_setting(self):
+        """Test orjson renders only with ORGANIZATION_FAST_LIST"""
+        url = reverse('organization-list')
+        for fast, renderer in ((False, JSONRenderer), (True, FastJSONRenderer)):
+            with override_settings(ORGANIZATION_FAST_LIST=fast):
+                response = self.client.get(url)
+            self.assertIs(type(response.accepted_renderer), renderer)
+
+    def test_cursor_pages(self):
+        """Test keyset pages of the fast path link to each other"""
+        for i in range(20):
+            Organization.objects.create(
+                name=f"Org {i:02d}",
+                org_type=Organization.OrgType.NGO,
+                nation="TR",
+                founding_date=date(2020, 1, 1)
+            )
+        with override_settings(ORGANIZATION_FAST_LIST=True):
+            response = self.client.get(reverse('organization-list'), {'pagination': 'cursor'})
+            names = [org['name'] for org in response.data['results']]
+            response = self.client.get(response.data['next'])
+        names += [org['name'] for org in response.data['results']]
+        self.assertEqual(names, [f"Org {i:02d}" for i in range(20)] + ["Tech Foods", "Tech Labs", "Ünal Gıda\u2028"])
+
+    def test_followed_organizations(self):
+        """Test the followed list gives identical pages on both paths"""
+        user = User.objects.create_user(username="fast", password="testpass123")
+        user.followed_organizations.set(Organization.objects.all())
+        self.client.force_authenticate(user=user)
+        url = '/api/userbase/followed-organizations/'
+        self.assertSameBytes(url, {})
+        self.assertSameBytes(url, {'ordering': 'name', 'page_size': 2, 'fields': 'name,logo_variants'})
+        self.assertSameBytes(url, {'omit': 'logo'})
+
+
+class OrganizationAsyncViewTest(TestCase):
+    """Test the async list and detail views answer like the viewset"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="async", password="testpass123")
+        for i, nation in enumerate(["TR", "US", "TR"]):
+            Organization.objects.create(
+                name=f"Async Org {i}",
+                org_type=Organization.OrgType.SME,
+                nation=nation,
+                founding_date=date(2000 + i, 1, 1),
+                headcount=i * 10
+            )
+        self.slug = Organization.objects.get(name="Async Org 1").slug
+        self.list_view = async_read_view(organization_list, None)
+        self.detail_view = async_read_view(organization_detail, None)
+
+    async def assertSameResponse(self, view, path, params=None, headers=None, view_kwargs=None):
+        expected = await sync_to_async(self.client.get)(path, params, headers=headers)
+        response = await view(AsyncRequestFactory().get(path, params, headers=headers), **(view_kwargs or {}))
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    async def test_list(self):
+        """Test list pages are the bytes of the viewset"""
+        url = reverse('organization-list')
+        await self.assertSameResponse(self.list_view, url)
+        await self.assertSameResponse(self.list_view, url, {'country': 'TR', 'fields': 'name,slug'})
+        await self.assertSameResponse(self.list_view, url, {'pagination': 'cursor', 'q': 'async'})
+        await self.assertSameResponse(self.list_view, url, {'page': 5})
+        await self.assertSameResponse(self.list_view, url, {'fields': 'secret'})
+
+    async def test_detail(self):
+        """Test detail responses, 404s and validators match the viewset"""
+        url = reverse('organization-detail', kwargs={'slug': self.slug})
+        kwargs = {'view_kwargs': {'slug': self.slug}}
+        response = await self.assertSameResponse(self.detail_view, url, **kwargs)
+        await self.assertSameResponse(self.detail_view, url, {'omit': 'logo'}, **kwargs)
+        await self.assertSameResponse(self.detail_view, url, {'country': 'TR'}, **kwargs)
+
+        response = await self.detail_view(
+            AsyncRequestFactory().get(url, headers={'If-None-Match': response['ETag']}), slug=self.slug
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_fast_list_setting(self):
+        """Test the async views build rows only with ORGANIZATION_FAST_LIST, like the viewset"""
+        url = reverse('organization-list')
+        detail_url = reverse('organization-detail', kwargs={'slug': self.slug})
+        for fast in (False, True):
+            with override_settings(ORGANIZATION_FAST_LIST=fast), \
+                    mock.patch("organization.views.organization.build_rows", wraps=build_rows) as rows:
+                await self.assertSameResponse(self.list_view, url, {'fields': 'name,logo_variants'})
+                await self.assertSameResponse(self.detail_view, detail_url, view_kwargs={'slug': self.slug})
+            self.assertEqual(rows.called, fast)
+
+    @override_settings(ORGANIZATION_CACHE_TIMEOUT=300)
+    async def test_list_is_cached(self):
+        """Test the async list shares the response cache of the viewset"""
+        url = reverse('organization-list')
+        await self.list_view(AsyncRequestFactory().get(url))
+        await Organization.objects.filter(name="Async Org 0").aupdate(name="Renamed")
+        response = await self.list_view(AsyncRequestFactory().get(url))
+        self.assertIn(b'Async Org 0', response.content)
+
+    async def test_authentication(self):
+        """Test credentials are checked without a thread per request"""
+        token = await Token.objects.acreate(user=self.user)
+        url = reverse('organization-list')
+        await self.assertSameResponse(self.list_view, url, headers={'Authorization': f'Token {token.key}'})
+        response = await self.assertSameResponse(self.list_view, url, headers={'Authorization': 'Token wrong'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+        access = str(RefreshToken.for_user(self.user).access_token)
+        await self.assertSameResponse(self.list_view, url, headers={'Authorization': f'Bearer {access}'})
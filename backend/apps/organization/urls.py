@@ -1,7 +1,28 @@
+from django.conf import settings
+from django.urls import URLPattern
 from rest_framework.routers import DefaultRouter
+from core.views import async_read_view
 from .views import OrganizationViewSet
+from .views.asynchronous import organization_list, organization_detail
 
 router = DefaultRouter()
 router.register(r'organizations', OrganizationViewSet, basename='organization')
 
 urlpatterns = router.urls
+
+if settings.ASYNC_VIEWS:
+    # GET on the list and detail is served by async views, other methods
+    # still by the viewset
+    async_reads = {
+        'organization-list': organization_list,
+        'organization-detail': organization_detail,
+    }
+    urlpatterns = [
+        URLPattern(
+            pattern.pattern,
+            async_read_view(async_reads[pattern.name], pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        ) if getattr(pattern, 'name', None) in async_reads else pattern
+        for pattern in urlpatterns
+    ]
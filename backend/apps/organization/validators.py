@@ -0,0 +1,34 @@
+"""
+Validators of uploaded organization logos.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from PIL import Image
+
+LOGO_FORMATS = {"PNG", "JPEG", "WEBP", "GIF"}
+MAX_LOGO_PIXELS = 40_000_000
+
+
+def validate_logo(file):
+    """
+    Reject uploads that are too large, have too many pixels or are of an
+    unexpected format. Files already stored (a committed FieldFile, as seen
+    by full_clean()) are not opened again, they may be missing.
+    """
+    if getattr(file, "_committed", False):
+        return
+    max_bytes = settings.ORGANIZATION_LOGO_MAX_BYTES
+    if file.size > max_bytes:
+        raise ValidationError(f"Logo must be at most {max_bytes // (1024 * 1024)} MB.")
+    position = file.tell() if not file.closed else 0
+    try:
+        with Image.open(file) as image:
+            image_format, (width, height) = image.format, image.size
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError("Upload a valid image.")
+    finally:
+        file.seek(position)
+    if image_format not in LOGO_FORMATS:
+        raise ValidationError(f"Logo must be one of: {', '.join(sorted(LOGO_FORMATS))}.")
+    if width * height > MAX_LOGO_PIXELS:
+        raise ValidationError("Logo has too many pixels.")
@@ -0,0 +1,84 @@
+"""
+Async GET of the organization list and detail (see core/views/asynchronous.py).
+
+They answer like OrganizationViewSet.list and retrieve, whose queryset,
+pagination and serialization helpers they share: same filters, field
+selection, ORGANIZATION_FAST_LIST rows, response cache and validators, with
+every query run through the async ORM.
+"""
+from django.http import Http404
+from rest_framework.request import Request
+
+from core.authentication import aauthenticate
+from core.views import api_response, has_validators, not_modified, set_validators
+from organization import cache
+from organization.filters import parse_filters
+from organization.models import Organization
+from organization.serializers import OrganizationSerializer
+from organization.views.organization import OrganizationViewSet
+
+
+async def organization_list(request, **kwargs):
+    """
+    List organizations, served from the response cache when possible.
+    """
+    await aauthenticate(request)
+    filters = parse_filters(request.GET)
+    fields = OrganizationSerializer.parse_sparse_fields(request.GET)
+
+    key = None
+    if cache.is_enabled():
+        key = cache.list_key(request, filters, fields, await cache.aget_generation())
+        cached = await cache.aload(key)
+        if cached is not None:
+            data, etag, last_modified = cached
+            return not_modified(request, etag, last_modified) or set_validators(
+                api_response(data), etag, last_modified
+            )
+
+    paginator = OrganizationViewSet.get_paginator_class(request.GET)()
+    queryset, columns = OrganizationViewSet.read_rows(OrganizationViewSet.build_queryset(filters, fields), fields)
+    page = await paginator.apaginate_queryset(queryset, Request(request))
+    rows = OrganizationViewSet.serialize_rows(page, fields, columns, request)
+    data = paginator.get_paginated_response(rows).data
+    if key is None:
+        return api_response(data)
+
+    etag, last_modified = OrganizationViewSet.get_page_validators(key, page)
+    await cache.astore(key, (data, etag, last_modified))
+    return not_modified(request, etag, last_modified) or set_validators(api_response(data), etag, last_modified)
+
+
+async def organization_detail(request, slug, **kwargs):
+    """
+    Return one organization, served from the response cache when possible.
+    """
+    await aauthenticate(request)
+    filters = parse_filters(request.GET)
+    fields = OrganizationSerializer.parse_sparse_fields(request.GET)
+
+    key = None
+    cached = None
+    if cache.is_enabled():
+        key = cache.detail_key(request, slug, filters, fields, await cache.aget_generation())
+        cached = await cache.aload(key)
+
+    if cached is None:
+        queryset = OrganizationViewSet.build_queryset(filters, fields).filter(slug=slug)
+        if has_validators(request):
+            row = await queryset.values_list('pk', 'updated_at').afirst()
+            if row is not None:
+                response = not_modified(request, OrganizationViewSet.get_etag(*row, fields), row[1])
+                if response is not None:
+                    return response
+        queryset, columns = OrganizationViewSet.read_rows(queryset, fields)
+        try:
+            row = await queryset.aget()
+        except Organization.DoesNotExist:
+            raise Http404(f"No {Organization._meta.object_name} matches the given query.")
+        data = OrganizationViewSet.serialize_rows([row], fields, columns, request)[0]
+        cached = (data, OrganizationViewSet.get_etag(row.id, row.updated_at, fields), row.updated_at)
+        if key:
+            await cache.astore(key, cached)
+    data, etag, last_modified = cached
+    return not_modified(request, etag, last_modified) or set_validators(api_response(data), etag, last_modified)
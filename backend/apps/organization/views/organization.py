@@ -1,26 +1,210 @@
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, SAFE_METHODS
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.response import Response
+from core.renderers import FastJSONRendererMixin
+from core.views import compute_etag, set_validators, has_validators, not_modified
+from organization import cache
 from organization.models import Organization
-from organization.serializers import OrganizationSerializer
+from organization.serializers import OrganizationSerializer, row_columns, build_rows
+from organization.pagination import OrganizationCursorPagination
+from organization.filters import parse_filters, filter_organizations
+from organization.export import EXPORT_FORMATS, astream, export_organizations
+from organization.facets import compute_facets
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Q
-from datetime import datetime
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class OrganizationViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(FastJSONRendererMixin, viewsets.ModelViewSet):
     """CRUD for Organization with advanced filtering"""
 
     serializer_class = OrganizationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = [JSONRenderer, BrowsableAPIRenderer]
     lookup_field = "slug"  # detail page with slug
 
+    @property
+    def paginator(self):
+        """
+        Use keyset pagination when the client opts in with ?pagination=cursor
+        (or follows a cursor link), page numbers otherwise.
+        """
+        if not hasattr(self, '_paginator'):
+            self._paginator = self.get_paginator_class(self.request.query_params)()
+        return self._paginator
+
+    @classmethod
+    def get_paginator_class(cls, params):
+        if params.get('pagination') == 'cursor' or 'cursor' in params:
+            return OrganizationCursorPagination
+        return cls.pagination_class
+
+    def get_sparse_fields(self):
+        """
+        Return the fields picked with ?fields= / ?omit= on reads, None for
+        every field.
+        """
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = None
+            if self.request.method in SAFE_METHODS:
+                self._sparse_fields = self.get_serializer_class().parse_sparse_fields(self.request.query_params)
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self.page_objects = page
+        return page
+
+    def list(self, request, *args, **kwargs):
+        """
+        List organizations, served from the response cache when possible.
+        """
+        if not cache.is_enabled():
+            return self.list_page(request, *args, **kwargs)
+
+        key = cache.list_key(request, parse_filters(request.query_params), self.get_sparse_fields())
+        cached = cache.load(key)
+        if cached is None:
+            response = self.list_page(request, *args, **kwargs)
+            cached = (response.data, *self.get_page_validators(key, getattr(self, 'page_objects', None)))
+            cache.store(key, cached)
+        data, etag, last_modified = cached
+        return not_modified(request, etag, last_modified) or set_validators(Response(data), etag, last_modified)
+
+    def list_page(self, request, *args, **kwargs):
+        """
+        Return a serialized list page, see read_rows().
+        """
+        fields = self.get_sparse_fields()
+        queryset, columns = self.read_rows(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(queryset)
+        rows = self.serialize_rows(queryset if page is None else page, fields, columns, request)
+        return Response(rows) if page is None else self.get_paginated_response(rows)
+
+    @staticmethod
+    def read_rows(queryset, fields=None):
+        """
+        Return ``(queryset, columns)`` to read organizations for
+        serialize_rows(). With ORGANIZATION_FAST_LIST the queryset gives
+        values_list() tuples of ``columns``, built into the same dicts without
+        instantiating models or serializers; otherwise model instances and
+        ``columns`` is None.
+        """
+        if not settings.ORGANIZATION_FAST_LIST:
+            return queryset, None
+        columns = row_columns(fields or OrganizationSerializer.Meta.fields)
+        return queryset.values_list(*columns, named=True), columns
+
+    @staticmethod
+    def serialize_rows(rows, fields, columns, request):
+        """
+        Return the serialized dicts of organizations read with read_rows().
+        """
+        if columns is None:
+            return OrganizationSerializer(rows, many=True, context={'request': request, 'fields': fields}).data
+        return build_rows(rows, fields or OrganizationSerializer.Meta.fields, columns, request.build_absolute_uri)
+
+    @staticmethod
+    def get_page_validators(key, page):
+        """
+        Return the (etag, last_modified) of a cached list page.
+        """
+        page = page or []
+        last_modified = max((org.updated_at for org in page), default=None)
+        return compute_etag(key, *((org.id, org.updated_at.timestamp()) for org in page), weak=True), last_modified
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return one organization, served from the response cache when possible.
+
+        Conditional requests are answered with 304 from the cached validators,
+        or from a query on updated_at alone, before anything is serialized.
+        """
+        slug = kwargs[self.lookup_field]
+        fields = self.get_sparse_fields()
+        key = cache.detail_key(request, slug, parse_filters(request.query_params), fields) if cache.is_enabled() else None
+        cached = cache.load(key) if key else None
+        if cached is None:
+            if has_validators(request):
+                row = self.get_queryset().filter(slug=slug).values_list('pk', 'updated_at').first()
+                if row is not None:
+                    response = not_modified(request, self.get_etag(*row, fields), row[1])
+                    if response is not None:
+                        return response
+            instance = self.get_object()
+            data = self.get_serializer(instance).data
+            cached = (data, self.get_etag(instance.pk, instance.updated_at, fields), instance.updated_at)
+            if key:
+                cache.store(key, cached)
+        data, etag, last_modified = cached
+        return not_modified(request, etag, last_modified) or set_validators(Response(data), etag, last_modified)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every organization matching the list filters as CSV or NDJSON.
+
+        Query parameters on top of the list filters:
+        - output: csv (default) or ndjson
+        - compress: gzip to compress the stream on the fly
+        """
+        file_format = request.query_params.get('output', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"Unsupported output, use one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        compress = request.query_params.get('compress') == 'gzip'
+
+        filename = f"organizations.{file_format}" + (".gz" if compress else "")
+        content = export_organizations(self.get_queryset(), file_format, request, compress)
+        if isinstance(request._request, ASGIRequest):
+            # Sent as it is produced instead of collected first
+            content = astream(content)
+        response = StreamingHttpResponse(
+            content,
+            content_type="application/gzip" if compress else EXPORT_FORMATS[file_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Count organizations per org_type, nation, headcount bucket and
+        founding decade under the list filters. Each facet ignores its own
+        filter, so the counts show what picking another value would give.
+        """
+        filters = parse_filters(request.query_params)
+        key = cache.facets_key(request, filters) if cache.is_enabled() else None
+        data = cache.load(key) if key else None
+        if data is None:
+            data = compute_facets(filters)
+            if key:
+                cache.store(key, data)
+        return Response(data)
+
+    @staticmethod
+    def get_etag(pk, updated_at, fields=None):
+        # Each field selection is a representation of its own
+        return compute_etag(pk, updated_at.timestamp(), *(fields or ()))
+
     def get_queryset(self):
         """
         Filter organizations based on query parameters
 
         Supported filters:
+        - q: Full-text search on name and slug (prefix match, ranked)
         - name: Organization name (contains, case-insensitive)
         - org_type: Organization type(s) - comma separated for multiple
         - country: Country code (e.g., 'TR', 'US')
@@ -30,66 +214,26 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         - headcount_max: Maximum employee count
 
         Example: /api/organizations/?country=TR&org_type=2,3&headcount_max=10
+
+        Sparse fieldsets: ?fields=name,slug,logo or ?omit=headcount return
+        and read from the database only the selected fields
+
+        Pagination: page numbers by default, ?pagination=cursor for keyset pages
+        (which keep the name order, also with q)
+        """
+        return self.build_queryset(parse_filters(self.request.query_params), self.get_sparse_fields())
+
+    @staticmethod
+    def build_queryset(filters, fields=None):
+        """
+        Return the organizations matching parsed filters in list order, with
+        only the columns of the selected ``fields`` read.
         """
-        queryset = Organization.objects.all()
-
-        # Name filtering (case-insensitive contains)
-        name = self.request.query_params.get('name')
-        if name:
-            queryset = queryset.filter(name__icontains=name)
-
-        # Organization type filtering (supports multiple types)
-        org_types = self.request.query_params.get('org_type')
-        if org_types:
-            # Handle comma-separated values: "2,3" -> [2, 3]
-            type_list = [int(t.strip()) for t in org_types.split(',') if t.strip().isdigit()]
-            if type_list:
-                queryset = queryset.filter(org_type__in=type_list)
-
-        # Country filtering
-        country = self.request.query_params.get('country')
-        if country:
-            queryset = queryset.filter(nation=country.upper())
-
-        # Founding date range filtering
-        date_from = self.request.query_params.get('founding_date_from')
-        date_to = self.request.query_params.get('founding_date_to')
-
-        if date_from:
-            try:
-                start_date = datetime.strptime(date_from, '%Y-%m-%d').date()
-                queryset = queryset.filter(founding_date__gte=start_date)
-            except ValueError:
-                pass  # Invalid date format, ignore filter
-
-        if date_to:
-            try:
-                end_date = datetime.strptime(date_to, '%Y-%m-%d').date()
-                queryset = queryset.filter(founding_date__lte=end_date)
-            except ValueError:
-                pass  # Invalid date format, ignore filter
-
-        # Employee count range filtering
-        headcount_min = self.request.query_params.get('headcount_min')
-        headcount_max = self.request.query_params.get('headcount_max')
-
-        if headcount_min:
-            try:
-                min_count = int(headcount_min)
-                queryset = queryset.filter(headcount__gte=min_count)
-            except ValueError:
-                pass  # Invalid number, ignore filter
-
-        if headcount_max:
-            try:
-                max_count = int(headcount_max)
-                queryset = queryset.filter(headcount__lte=max_count)
-            except ValueError:
-                pass  # Invalid number, ignore filter
-
-        # Handle None values in headcount filtering
-        # If filtering by headcount, exclude organizations with no headcount data
-        if headcount_min or headcount_max:
-            queryset = queryset.filter(headcount__isnull=False)
-
-        return queryset.order_by('name')
+        queryset = filter_organizations(Organization.objects.all(), filters)
+
+        if fields:
+            queryset = queryset.only(*OrganizationSerializer.get_sparse_columns(fields))
+
+        if 'q' in filters:
+            return queryset.order_by('-search_rank', 'name', 'id')
+        return queryset.order_by('name', 'id')
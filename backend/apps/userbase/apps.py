@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UserbaseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'userbase'  # python path
+
+    def ready(self):
+        from . import signals
+        post_migrate.connect(signals.install_database_indexes, sender=self)
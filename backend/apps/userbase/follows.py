@@ -0,0 +1,119 @@
+"""
+Follow / unfollow writes on the User.followed_organizations through table.
+
+Each operation is a single conditional INSERT or DELETE whose affected-row
+count, or RETURNING rows for batches, tells what changed; the denormalized counters
+(Organization.follower_count, User.followed_count and User.follow_version)
+are then adjusted with
+F-expressions in the same transaction. Everything works on ids, so callers
+need neither the User nor the Organization row; a user id without a row
+(a stateless JWT of a deleted user) raises User.DoesNotExist and the
+transaction is rolled back.
+"""
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from organization.models import Organization
+from userbase.models import User
+
+Follow = User.followed_organizations.through
+
+
+def record_follow_change(user_ids, organization_ids, delta):
+    """
+    Adjust the counters after the follow rows between every given user and
+    every given organization were added (delta=1) or removed (delta=-1).
+    Raise User.DoesNotExist when a user row is missing.
+    """
+    user_ids, organization_ids = list(user_ids), list(organization_ids)
+    if not user_ids or not organization_ids:
+        return
+    Organization.objects.filter(pk__in=organization_ids).update(
+        follower_count=Greatest(F("follower_count") + delta * len(user_ids), 0)
+    )
+    updated = User.objects.filter(pk__in=user_ids).update(
+        followed_count=Greatest(F("followed_count") + delta * len(organization_ids), 0),
+        follow_version=F("follow_version") + 1,
+    )
+    if updated != len(set(user_ids)):
+        raise User.DoesNotExist("User matching query does not exist.")
+
+
+def _columns(connection):
+    quote = connection.ops.quote_name
+    return (
+        quote(Follow._meta.db_table),
+        quote(Follow._meta.get_field("user").column),
+        quote(Follow._meta.get_field("organization").column),
+    )
+
+
+def follow(user_id, organization_id):
+    """
+    Follow an organization. Return False if it was already followed.
+    """
+    using = router.db_for_write(Follow)
+    connection = connections[using]
+    table, user_column, organization_column = _columns(connection)
+    sql = (
+        f"INSERT INTO {table} ({user_column}, {organization_column}) "
+        f"VALUES (%s, %s) ON CONFLICT DO NOTHING"
+    )
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, organization_id])
+            created = cursor.rowcount == 1
+        if created:
+            record_follow_change([user_id], [organization_id], 1)
+    return created
+
+
+def unfollow(user_id, organization_id):
+    """
+    Unfollow an organization. Return False if it was not followed.
+    """
+    with transaction.atomic(using=router.db_for_write(Follow)):
+        deleted, _ = Follow.objects.filter(user_id=user_id, organization_id=organization_id).delete()
+        if deleted:
+            record_follow_change([user_id], [organization_id], -1)
+    return bool(deleted)
+
+
+def follow_batch(user_id, follow_ids=(), unfollow_ids=()):
+    """
+    Follow and unfollow many organizations at once.
+
+    The missing follow rows are written with one INSERT ... ON CONFLICT DO
+    NOTHING and the present ones removed with one DELETE, both RETURNING the
+    organization ids they changed, so that batches running concurrently
+    count every row once. Return the (followed, unfollowed) organization ids.
+    """
+    follow_ids, unfollow_ids = list(set(follow_ids)), list(set(unfollow_ids))
+    using = router.db_for_write(Follow)
+    connection = connections[using]
+    table, user_column, organization_column = _columns(connection)
+    followed = unfollowed = set()
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            if follow_ids:
+                values = ", ".join(["(%s, %s)"] * len(follow_ids))
+                cursor.execute(
+                    f"INSERT INTO {table} ({user_column}, {organization_column}) VALUES {values} "
+                    f"ON CONFLICT DO NOTHING RETURNING {organization_column}",
+                    [param for pk in follow_ids for param in (user_id, pk)],
+                )
+                followed = {row[0] for row in cursor.fetchall()}
+            if unfollow_ids:
+                placeholders = ", ".join(["%s"] * len(unfollow_ids))
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {user_column} = %s AND {organization_column} IN ({placeholders}) "
+                    f"RETURNING {organization_column}",
+                    [user_id, *unfollow_ids],
+                )
+                unfollowed = {row[0] for row in cursor.fetchall()}
+        if followed:
+            record_follow_change([user_id], followed, 1)
+        if unfollowed:
+            record_follow_change([user_id], unfollowed, -1)
+    return followed, unfollowed
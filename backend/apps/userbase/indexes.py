@@ -0,0 +1,26 @@
+"""
+Indexes on the auto-created follow table.
+
+``User.followed_organizations`` has no explicit through model, so there is
+no ``Meta.indexes`` to declare them in; they are installed after ``migrate``
+(see ``apps.py``) instead.
+"""
+from django.db import models
+
+from userbase.follows import Follow
+
+FOLLOW_ORDER_INDEX = models.Index(fields=["user", "id"], name="follow_user_id_idx")
+
+
+def create_follow_order_index(connection):
+    """
+    Create the (user_id, id) index backing the keyset pages of the followed
+    list. Returns False when it already exists.
+    """
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Follow._meta.db_table)
+    if FOLLOW_ORDER_INDEX.name in constraints:
+        return False
+    with connection.schema_editor() as editor:
+        editor.add_index(Follow, FOLLOW_ORDER_INDEX)
+    return True
@@ -1,10 +1,17 @@
 import os
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.db import transaction
 
+from core.management.readers import iter_records
 from userbase.models import User
+from userbase.passwords import encode_password, fast_hasher
 
 
 class Command(BaseCommand):
@@ -13,15 +20,52 @@ class Command(BaseCommand):
 
     Usage:
         python manage.py add_users
+        python manage.py add_users --bulk --file users.json --workers 8
     """
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=os.path.join(settings.BASE_DIR, 'sample_data', 'users.json'),
+            help='Input file (default: sample_data/users.json)'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['json', 'ndjson', 'csv'],
+            help='Input format, guessed from the file extension by default'
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Hash passwords in a process pool and insert users with bulk_create'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Users per batch in bulk mode (default: 1000)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Password hashing processes in bulk mode (default: all cores)'
+        )
+        parser.add_argument(
+            '--fast-hasher',
+            action='store_true',
+            help='Hash with a low iteration count. For test and staging seeds only'
+        )
+
     def handle(self, *args, **options):
         """
         This method is called when the management command is run.
         """
+        if options['bulk']:
+            return self.bulk_create_users(options)
 
         # Open the file which info is stored
-        with open("sample_data/users.json", 'r') as file:
+        with open(options['file'], 'r') as file:
             data = json.load(file)
 
         # Iterate info list to create instances
@@ -36,4 +80,79 @@ class Command(BaseCommand):
             user.is_staff = item["is_staff"]
             user.is_superuser = item["is_superuser"]
             user.save()
-        print("Info:", "Users are created.")
\ No newline at end of file
+        print("Info:", "Users are created.")
+
+    def bulk_create_users(self, options):
+        """
+        Create users in batches.
+
+        Raw passwords are hashed across a process pool; records that carry a
+        ``password_hash`` are stored as is. Existing usernames are skipped, so
+        the command can be re-run on the same file; only rows actually
+        inserted are counted as created.
+        """
+        path = options['file']
+        file_format = options['format'] or {
+            '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv'
+        }.get(os.path.splitext(path)[1].lower(), 'json')
+        batch_size = options['batch_size']
+        workers = max(1, options['workers'])
+        hasher = fast_hasher() if options['fast_hasher'] else get_hasher()
+        encode = partial(encode_password, hasher)
+
+        existing = set(User.objects.values_list('username', flat=True))
+        created_count = 0
+        skipped_count = 0
+        started = time.perf_counter()
+
+        def flush(items, executor):
+            raw = [item for item in items if not item.get('password_hash')]
+            chunksize = max(1, len(raw) // (workers * 4))
+            hashes = iter(
+                executor.map(encode, [item.get('password') for item in raw], chunksize=chunksize)
+                if executor else map(encode, [item.get('password') for item in raw])
+            )
+            users = [
+                User(
+                    username=item['username'],
+                    email=item.get('email', ''),
+                    password=item.get('password_hash') or next(hashes),
+                    first_name=item.get('first_name', ''),
+                    last_name=item.get('last_name', ''),
+                    is_staff=item.get('is_staff') in (True, 'true', 'True', '1', 1),
+                    is_superuser=item.get('is_superuser') in (True, 'true', 'True', '1', 1),
+                )
+                for item in items
+            ]
+            usernames = [user.username for user in users]
+            with transaction.atomic():
+                # ignore_conflicts does not tell which rows it dropped
+                before = User.objects.filter(username__in=usernames).count()
+                User.objects.bulk_create(users, ignore_conflicts=True)
+                return User.objects.filter(username__in=usernames).count() - before
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            batch = []
+            for item in iter_records(path, file_format):
+                if item['username'] in existing:
+                    skipped_count += 1
+                    continue
+                existing.add(item['username'])
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    created_count += flush(batch, executor)
+                    batch = []
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'... {created_count} users created')
+            if batch:
+                created_count += flush(batch, executor)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Created: {created_count}, already existed: {skipped_count}')
+        self.stdout.write(
+            f'Elapsed: {elapsed:.2f}s ({created_count / elapsed if elapsed else 0:.0f} users/s)'
+        )
@@ -12,6 +12,10 @@ class User(AbstractUser):
         blank=True,
         related_name="followers"
     )
+    # Bumped whenever the followed set changes, see userbase/signals.py
+    follow_version = models.PositiveIntegerField(default=0, editable=False)
+    # Number of followed organizations, maintained like Organization.follower_count
+    followed_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.username
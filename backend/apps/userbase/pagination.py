@@ -0,0 +1,21 @@
+from core.pagination import AsyncCursorPagination
+
+
+class FollowedOrganizationsPagination(AsyncCursorPagination):
+    """
+    Keyset pagination over the follow rows of a user.
+
+    ``?ordering=name`` pages by organization name, anything else by follow
+    time, newest first. Every page is one indexed range query, however many
+    organizations the user follows.
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    orderings = {
+        "followed": ("-id",),
+        "name": ("name", "id"),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        return self.orderings.get(request.query_params.get("ordering"), self.orderings["followed"])
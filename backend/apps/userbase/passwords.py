@@ -0,0 +1,28 @@
+"""
+Password hashing helpers for bulk user provisioning.
+
+Kept free of model imports so that the functions can run in worker processes.
+"""
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+
+# Iterations used by the fast hasher. Only meant for test and staging seeds:
+# the hashes stay valid for check_password() and are upgraded on first login.
+FAST_HASHER_ITERATIONS = 1000
+
+
+def fast_hasher():
+    """
+    Return a PBKDF2 hasher with a reduced iteration count.
+    """
+    hasher = PBKDF2PasswordHasher()
+    hasher.iterations = FAST_HASHER_ITERATIONS
+    return hasher
+
+
+def encode_password(hasher, password):
+    """
+    Hash one raw password with the given hasher, or mark it unusable.
+    """
+    if not password:
+        return make_password(None)
+    return hasher.encode(password, hasher.salt())
@@ -1,2 +1,3 @@
 from .user import CustomRegisterSerializer
-from .follow import FollowedOrganizationSerializer
+from .follow import FollowedOrganizationSerializer, FollowBatchSerializer
+from .jwt import TokenObtainPairSerializer, TokenRefreshSerializer
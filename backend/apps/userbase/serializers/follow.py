@@ -1,10 +1,40 @@
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from organization.models import Organization
+from organization.serializers import LogoVariantsField
 
 
-class FollowedOrganizationSerializer(serializers.ModelSerializer):
-    """Serializer for followed organizations"""
+class FollowedOrganizationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer for followed organizations, with ?fields= / ?omit= selection"""
+    logo_variants = LogoVariantsField()
+
+    sparse_columns = {"logo_variants": ("logo", "logo_variants")}
+    # updated_at feeds the validators
+    sparse_required_columns = ("id", "updated_at")
 
     class Meta:
         model = Organization
-        fields = ["id", "name", "slug", "logo", "org_type", "nation", "founding_date", "headcount"]
+        fields = [
+            "id", "name", "slug", "logo", "logo_variants", "org_type", "nation", "founding_date", "headcount"
+        ]
+
+
+class FollowBatchSerializer(serializers.Serializer):
+    """Slugs to follow and unfollow in one request"""
+    MAX_SLUGS = 500
+
+    follow = serializers.ListField(child=serializers.SlugField(), required=False, default=list)
+    unfollow = serializers.ListField(child=serializers.SlugField(), required=False, default=list)
+
+    def validate(self, attrs):
+        follow, unfollow = set(attrs["follow"]), set(attrs["unfollow"])
+        if not follow and not unfollow:
+            raise serializers.ValidationError("Provide slugs to follow or unfollow.")
+        if len(follow) + len(unfollow) > self.MAX_SLUGS:
+            raise serializers.ValidationError(f"At most {self.MAX_SLUGS} slugs per request.")
+        both = follow & unfollow
+        if both:
+            raise serializers.ValidationError(
+                f"Slugs cannot be both followed and unfollowed: {', '.join(sorted(both))}"
+            )
+        return attrs
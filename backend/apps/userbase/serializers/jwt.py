@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+# Claims read by core.authentication.TokenUser instead of the user row. The
+# follow_version is that of the login or last refresh, views needing the
+# current one still read the counters
+USER_CLAIMS = ("username", "is_staff", "follow_version")
+
+
+def add_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class TokenObtainPairSerializer(serializers.TokenObtainPairSerializer):
+    """
+    simplejwt login, the tokens carrying USER_CLAIMS.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    """
+    simplejwt refresh, USER_CLAIMS updated from the user row. A token of a
+    deleted user is rejected with 401.
+    """
+
+    def validate(self, attrs):
+        model = get_user_model()
+        try:
+            data = super().validate(attrs)
+            access = self.token_class.access_token_class(data["access"])
+            user = model.objects.get(**{api_settings.USER_ID_FIELD: access.get(api_settings.USER_ID_CLAIM)})
+        except model.DoesNotExist:
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        data["access"] = str(add_user_claims(access, user))
+        if "refresh" in data:
+            data["refresh"] = str(add_user_claims(self.token_class(data["refresh"]), user))
+        return data
@@ -0,0 +1,66 @@
+from django.db import connections
+from django.db.models.signals import m2m_changed, pre_delete
+from django.dispatch import receiver
+
+from organization.models import Organization
+from userbase.follows import Follow, record_follow_change
+from userbase.indexes import create_follow_order_index
+from userbase.models import User
+
+
+def install_database_indexes(sender, using="default", **kwargs):
+    """
+    Install the indexes of the follow table once the schema is migrated.
+    """
+    create_follow_order_index(connections[using])
+
+
+@receiver(m2m_changed, sender=Follow)
+def update_follow_counters(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep the follow counters in sync with ORM changes to
+    followed_organizations (add/remove/clear, from either side).
+    """
+    own_field, other_field = ("organization_id", "user_id") if reverse else ("user_id", "organization_id")
+
+    if action in ("pre_remove", "pre_clear"):
+        # Record the rows that actually exist, they are gone after the delete
+        rows = Follow.objects.filter(**{own_field: instance.pk})
+        if action == "pre_remove":
+            rows = rows.filter(**{f"{other_field}__in": pk_set})
+        instance._removed_follow_ids = list(rows.values_list(other_field, flat=True))
+        return
+    if action == "post_add":
+        changed, delta = pk_set, 1
+    elif action in ("post_remove", "post_clear"):
+        changed, delta = instance.__dict__.pop("_removed_follow_ids", []), -1
+    else:
+        return
+
+    if not changed:
+        return
+    if reverse:
+        record_follow_change(changed, [instance.pk], delta)
+    else:
+        record_follow_change([instance.pk], changed, delta)
+        instance.followed_count = max(instance.followed_count + delta * len(changed), 0)
+        instance.follow_version += 1
+
+
+@receiver(pre_delete, sender=User)
+def release_followed_organizations(sender, instance, **kwargs):
+    """
+    Decrement follower_count of the organizations a deleted user followed.
+    """
+    organization_ids = Follow.objects.filter(user_id=instance.pk).values_list("organization_id", flat=True)
+    record_follow_change([instance.pk], list(organization_ids), -1)
+
+
+@receiver(pre_delete, sender=Organization)
+def release_followers(sender, instance, **kwargs):
+    """
+    Decrement followed_count and bump follow_version of the users that
+    followed a deleted organization.
+    """
+    user_ids = Follow.objects.filter(organization_id=instance.pk).values_list("user_id", flat=True)
+    record_follow_change(list(user_ids), [instance.pk], -1)
@@ -1,2 +1,7 @@
 from .user import UserRegistrationTest, UserLoginTest, UserAuthenticationTest, UserModelTest
-from .follow import FollowSystemTest, UserModelFollowTest
+from .follow import (
+    FollowSystemTest, FollowerCountTest, FollowBatchTest,
+    FollowedOrganizationsPaginationTest, FollowedOrganizationsAsyncTest, UserModelFollowTest
+)
+from .commands import AddUsersBulkTest
+from .jwt import JWTClaimsTest, StatelessJWTTest
@@ -0,0 +1,70 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class AddUsersBulkTest(TestCase):
+    """Test the bulk mode of add_users"""
+
+    def setUp(self):
+        records = [
+            {"username": f"seed{i}", "email": f"seed{i}@example.com", "password": "Seed123456",
+             "first_name": "", "last_name": "", "is_staff": False, "is_superuser": False}
+            for i in range(5)
+        ]
+        records.append({"username": "hashed", "password_hash": make_password("Hashed123456")})
+        handle, self.path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(handle, "w") as file:
+            json.dump(records, file)
+        self.addCleanup(os.remove, self.path)
+
+    def add_users(self, *args):
+        out = io.StringIO()
+        call_command("add_users", "--bulk", "--file", self.path, "--fast-hasher", *args, stdout=out)
+        return out.getvalue()
+
+    def test_bulk_create_users(self):
+        """Test users are created with usable passwords"""
+        output = self.add_users("--workers", "1", "--batch-size", "2")
+        self.assertEqual(User.objects.count(), 6)
+        self.assertIn("users/s", output)
+        self.assertTrue(User.objects.get(username="seed3").check_password("Seed123456"))
+
+    def test_bulk_create_users_with_process_pool(self):
+        """Test passwords hashed in worker processes verify"""
+        self.add_users("--workers", "2")
+        self.assertTrue(User.objects.get(username="seed0").check_password("Seed123456"))
+
+    def test_pre_hashed_password_is_kept(self):
+        """Test password_hash records are stored without rehashing"""
+        self.add_users("--workers", "1")
+        self.assertTrue(User.objects.get(username="hashed").check_password("Hashed123456"))
+
+    def test_bulk_is_idempotent(self):
+        """Test existing usernames are skipped"""
+        self.add_users("--workers", "1")
+        output = self.add_users("--workers", "1")
+        self.assertEqual(User.objects.count(), 6)
+        self.assertIn("Created: 0, already existed: 6", output)
+
+    def test_bulk_counts_inserted_rows(self):
+        """Test users inserted meanwhile by another writer are not counted"""
+        from userbase.management.commands import add_users
+        iter_records = add_users.iter_records
+
+        def concurrent_insert(path, file_format):
+            User.objects.create_user("seed0", password="Other123456")
+            yield from iter_records(path, file_format)
+
+        with mock.patch.object(add_users, "iter_records", concurrent_insert):
+            output = self.add_users("--workers", "1")
+        self.assertIn("Created: 5, already existed: 0", output)
+        self.assertTrue(User.objects.get(username="seed0").check_password("Other123456"))
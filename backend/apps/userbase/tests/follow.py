@@ -1,8 +1,19 @@
-from django.test import TestCase
+import io
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.views import async_read_view
 from organization.models import Organization
+from organization.serializers import build_rows
+from userbase.follows import Follow, follow_batch
+from userbase.views.asynchronous import followed_organizations
 from datetime import date
 
 User = get_user_model()
@@ -146,6 +157,269 @@ class FollowSystemTest(APITestCase):
         # Verify organization has 2 followers
         self.assertEqual(self.org1.followers.count(), 2)
 
+    def test_followed_organizations_conditional_get(self):
+        """Test the followed list answers 304 until the follow set changes"""
+        self.user.followed_organizations.add(self.org1)
+        url = '/api/userbase/followed-organizations/'
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(f'/api/userbase/follow/{self.org2.slug}/')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_follow_version_bumped(self):
+        """Test follow_version changes with the followed set"""
+        self.user.followed_organizations.add(self.org1)
+        self.org2.followers.add(self.user)
+        self.user.followed_organizations.remove(self.org1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.follow_version, 3)
+
+
+class FollowerCountTest(APITestCase):
+    """Test the denormalized Organization.follower_count"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="counter", password="testpass123")
+        self.other = User.objects.create_user(username="counter2", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+        self.org = Organization.objects.create(
+            name="Counted Org",
+            org_type=Organization.OrgType.SME,
+            nation="TR",
+            founding_date=date(2020, 1, 1)
+        )
+
+    def follower_count(self):
+        self.org.refresh_from_db()
+        return self.org.follower_count
+
+    def test_follow_unfollow_endpoints(self):
+        """Test the endpoints maintain the count"""
+        self.client.post(f'/api/userbase/follow/{self.org.slug}/')
+        self.client.post(f'/api/userbase/follow/{self.org.slug}/')
+        self.assertEqual(self.follower_count(), 1)
+        self.client.post(f'/api/userbase/unfollow/{self.org.slug}/')
+        self.client.post(f'/api/userbase/unfollow/{self.org.slug}/')
+        self.assertEqual(self.follower_count(), 0)
+
+    def test_orm_changes(self):
+        """Test add/remove/clear from both sides maintain the count"""
+        self.user.followed_organizations.add(self.org)
+        self.org.followers.add(self.other)
+        self.assertEqual(self.follower_count(), 2)
+        self.user.followed_organizations.remove(self.org)
+        self.user.followed_organizations.remove(self.org)
+        self.assertEqual(self.follower_count(), 1)
+        self.user.followed_organizations.add(self.org)
+        self.org.followers.clear()
+        self.assertEqual(self.follower_count(), 0)
+
+    def test_user_deletion(self):
+        """Test deleting a follower decrements the count"""
+        self.user.followed_organizations.add(self.org)
+        self.other.followed_organizations.add(self.org)
+        self.other.delete()
+        self.assertEqual(self.follower_count(), 1)
+
+    def test_organization_deletion(self):
+        """Test deleting a followed organization updates its followers"""
+        other_org = Organization.objects.create(
+            name="Other Org", org_type=Organization.OrgType.NGO, nation="US", founding_date=date(2010, 1, 1)
+        )
+        self.user.followed_organizations.add(self.org, other_org)
+        self.other.followed_organizations.add(self.org)
+        versions = dict(User.objects.values_list("pk", "follow_version"))
+        Organization.objects.filter(pk=self.org.pk).delete()
+        for user, followed_count in ((self.user, 1), (self.other, 0)):
+            user.refresh_from_db()
+            self.assertEqual(user.followed_count, followed_count)
+            self.assertEqual(user.follow_version, versions[user.pk] + 1)
+        self.assertEqual(list(self.user.followed_organizations.all()), [other_org])
+
+    def test_reconcile_command(self):
+        """Test reconcile_follower_counts repairs drift"""
+        self.user.followed_organizations.add(self.org)
+        Organization.objects.filter(pk=self.org.pk).update(follower_count=7)
+        call_command('reconcile_follower_counts', stdout=io.StringIO())
+        self.assertEqual(self.follower_count(), 1)
+
+
+class FollowBatchTest(APITestCase):
+    """Test the batch follow/unfollow endpoint"""
+    url = '/api/userbase/follow-batch/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="batcher", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+        self.orgs = [
+            Organization.objects.create(
+                name=f"Batch Org {i}",
+                org_type=Organization.OrgType.SME,
+                nation="TR",
+                founding_date=date(2020, 1, 1)
+            )
+            for i in range(4)
+        ]
+
+    def test_follow_and_unfollow(self):
+        """Test per-slug results of a mixed batch"""
+        self.user.followed_organizations.add(self.orgs[0], self.orgs[1])
+        response = self.client.post(self.url, {
+            "follow": [self.orgs[1].slug, self.orgs[2].slug, "missing-org"],
+            "unfollow": [self.orgs[0].slug, self.orgs[3].slug],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['followed'], 1)
+        self.assertEqual(response.data['unfollowed'], 1)
+        self.assertEqual(response.data['results'], {
+            self.orgs[1].slug: "already_following",
+            self.orgs[2].slug: "followed",
+            "missing-org": "not_found",
+            self.orgs[0].slug: "unfollowed",
+            self.orgs[3].slug: "not_following",
+        })
+        self.assertEqual(
+            set(self.user.followed_organizations.values_list('pk', flat=True)),
+            {self.orgs[1].pk, self.orgs[2].pk}
+        )
+        counts = dict(Organization.objects.values_list('pk', 'follower_count'))
+        self.assertEqual(
+            [counts[org.pk] for org in self.orgs], [0, 1, 1, 0]
+        )
+
+    def test_overlapping_batches(self):
+        """Test rows written by a concurrent batch are not counted twice"""
+        table = Follow._meta.db_table
+        concurrent = []
+
+        def concurrent_batch(execute, sql, params, many, context):
+            # Another batch following orgs[1] commits just before this INSERT
+            if sql.startswith("INSERT") and table in sql and not concurrent:
+                concurrent.append(None)
+                concurrent[0] = follow_batch(self.user.pk, follow_ids=[self.orgs[1].pk])
+            return execute(sql, params, many, context)
+
+        self.user.followed_organizations.add(self.orgs[0])
+        with connection.execute_wrapper(concurrent_batch):
+            response = self.client.post(self.url, {
+                "follow": [self.orgs[1].slug, self.orgs[2].slug],
+                "unfollow": [self.orgs[0].slug],
+            }, format='json')
+        self.assertEqual(concurrent, [({self.orgs[1].pk}, set())])
+        self.assertEqual(response.data['results'][self.orgs[1].slug], "already_following")
+        self.assertEqual((response.data['followed'], response.data['unfollowed']), (1, 1))
+
+        # A batch repeating the unfollow changes nothing
+        followed, unfollowed = follow_batch(self.user.pk, unfollow_ids=[self.orgs[0].pk])
+        self.assertEqual((followed, unfollowed), (set(), set()))
+        counts = dict(Organization.objects.values_list('pk', 'follower_count'))
+        self.assertEqual([counts[org.pk] for org in self.orgs], [0, 1, 1, 0])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.followed_count, 2)
+
+    def test_query_count_is_constant(self):
+        """Test the number of queries does not grow with the batch"""
+        slugs = [org.slug for org in self.orgs]
+        with self.assertNumQueries(6):
+            self.client.post(self.url, {"follow": slugs[:1]}, format='json')
+        with self.assertNumQueries(6):
+            self.client.post(self.url, {"follow": slugs[1:]}, format='json')
+        self.assertEqual(self.user.followed_organizations.count(), 4)
+
+    def test_invalid_payloads(self):
+        """Test empty and conflicting batches are rejected"""
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        slug = self.orgs[0].slug
+        response = self.client.post(self.url, {"follow": [slug], "unfollow": [slug]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        """Test that the batch endpoint requires authentication"""
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, {"follow": [self.orgs[0].slug]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class FollowedOrganizationsPaginationTest(APITestCase):
+    """Test keyset pagination of the followed organizations list"""
+    url = '/api/userbase/followed-organizations/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="pager", password="testpass123")
+        self.client.force_authenticate(user=self.user)
+        # Followed out of name order, so the two orderings differ
+        for name in ["Charlie", "Alpha", "Echo", "Bravo", "Delta"]:
+            org = Organization.objects.create(
+                name=f"{name} Org",
+                org_type=Organization.OrgType.SME,
+                nation="TR",
+                founding_date=date(2020, 1, 1)
+            )
+            self.user.followed_organizations.add(org)
+
+    def collect(self, params):
+        names, url, counts = [], self.url, set()
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names += [org['name'] for org in response.data['results']]
+            counts.add(response.data['count'])
+            url, params = response.data['next'], None
+        return names, counts
+
+    def test_follow_time_ordering(self):
+        """Test pages are ordered by follow time, newest first"""
+        names, counts = self.collect({'page_size': 2})
+        self.assertEqual(names, ["Delta Org", "Bravo Org", "Echo Org", "Alpha Org", "Charlie Org"])
+        self.assertEqual(counts, {5})
+
+    def test_name_ordering(self):
+        """Test pages can be ordered by organization name"""
+        names, _ = self.collect({'page_size': 2, 'ordering': 'name'})
+        self.assertEqual(names, ["Alpha Org", "Bravo Org", "Charlie Org", "Delta Org", "Echo Org"])
+
+    def test_query_count_is_flat(self):
+        """Test a page costs the same queries however many orgs are followed"""
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'page_size': 2})
+        for i in range(20):
+            self.user.followed_organizations.add(Organization.objects.create(
+                name=f"Extra {i}",
+                org_type=Organization.OrgType.SME,
+                nation="TR",
+                founding_date=date(2020, 1, 1)
+            ))
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.data['count'], 25)
+
+    def test_sparse_fields(self):
+        """Test ?fields= trims the serialized organizations"""
+        response = self.client.get(self.url, {'ordering': 'name', 'fields': 'name,slug'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data['results'][0]), ['name', 'slug'])
+        self.assertEqual(response.data['results'][0]['name'], "Alpha Org")
+        response = self.client.get(self.url, {'omit': 'unknown'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_followed_count_maintained(self):
+        """Test User.followed_count follows the follow set"""
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.followed_count, 5)
+        self.user.followed_organizations.clear()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.followed_count, 0)
+
 
 class UserModelFollowTest(TestCase):
     """Test User model's follow relationship"""
@@ -191,3 +465,57 @@ class UserModelFollowTest(TestCase):
         self.assertIn(self.user, self.org.followers.all())
         self.assertIn(user2, self.org.followers.all())
         self.assertIn(user3, self.org.followers.all())
+
+
+class FollowedOrganizationsAsyncTest(TestCase):
+    """Test the async followed organizations view answers like the sync one"""
+    url = '/api/userbase/followed-organizations/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="async", password="testpass123")
+        for name in ["Charlie", "Alpha", "Bravo"]:
+            org = Organization.objects.create(
+                name=f"{name} Org",
+                org_type=Organization.OrgType.SME,
+                nation="TR",
+                founding_date=date(2020, 1, 1)
+            )
+            self.user.followed_organizations.add(org)
+        self.access = str(RefreshToken.for_user(self.user).access_token)
+        self.view = async_read_view(followed_organizations, None)
+
+    async def get(self, params=None, headers=None, url=None):
+        headers = {'Authorization': f'Bearer {self.access}', **(headers or {})}
+        expected = await sync_to_async(self.client.get)(url or self.url, params, headers=headers)
+        response = await self.view(AsyncRequestFactory().get(url or self.url, params, headers=headers))
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    async def test_pages(self):
+        """Test pages, links and field selection match"""
+        response = await self.get({'page_size': 2, 'ordering': 'name'})
+        response = await self.get(url=json.loads(response.content)['next'])
+        self.assertEqual([org['name'] for org in json.loads(response.content)['results']], ["Charlie Org"])
+        await self.get({'fields': 'name,slug'})
+
+    async def test_fast_list_setting(self):
+        """Test rows are built only with ORGANIZATION_FAST_LIST, like the sync view"""
+        for fast in (False, True):
+            with override_settings(ORGANIZATION_FAST_LIST=fast), \
+                    mock.patch("userbase.views.follow.build_rows", wraps=build_rows) as rows:
+                await self.get({'fields': 'name,slug'})
+            self.assertEqual(rows.called, fast)
+
+    async def test_validators(self):
+        """Test an unchanged page is answered with 304"""
+        response = await self.get()
+        response = await self.get(headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_authentication_required(self):
+        """Test anonymous and invalid credentials are rejected"""
+        response = await self.view(AsyncRequestFactory().get(self.url))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.get(headers={'Authorization': 'Bearer invalid'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
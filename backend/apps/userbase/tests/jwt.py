@@ -0,0 +1,144 @@
+from datetime import date
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from core import auth_cache
+from core.authentication import TokenUser, aauthenticate
+from core.views import async_read_view
+from organization.models import Organization
+from userbase.follows import Follow
+from userbase.views.asynchronous import followed_organizations
+
+User = get_user_model()
+
+
+class JWTClaimsTest(APITestCase):
+    """Test the JWT endpoints issue tokens with the user claims"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="claims", password="testpass123", is_staff=True)
+        self.org = Organization.objects.create(
+            name="Claims Org", org_type=Organization.OrgType.SME, nation="TR", founding_date=date(2020, 1, 1)
+        )
+
+    def obtain(self):
+        response = self.client.post(
+            '/api/userbase/auth/jwt/', {'username': 'claims', 'password': 'testpass123'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_obtain(self):
+        access = AccessToken(self.obtain()['access'])
+        self.assertEqual(access['username'], "claims")
+        self.assertTrue(access['is_staff'])
+        self.assertEqual(access['follow_version'], 0)
+
+    def test_refresh(self):
+        """Test a refresh carries the claims of the current user row"""
+        refresh = self.obtain()['refresh']
+        self.user.followed_organizations.add(self.org)
+        response = self.client.post('/api/userbase/auth/jwt/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['follow_version'], 1)
+
+    def test_refresh_of_deleted_user(self):
+        """Test refreshing the token of a deleted user is a 401"""
+        refresh = self.obtain()['refresh']
+        self.user.delete()
+        response = self.client.post('/api/userbase/auth/jwt/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_wrong_password(self):
+        response = self.client.post('/api/userbase/auth/jwt/', {'username': 'claims', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(JWT_STATELESS=1)
+class StatelessJWTTest(APITestCase):
+    """Test the follow endpoints do not load the user row with JWT_STATELESS"""
+
+    def setUp(self):
+        auth_cache.local.clear()
+        self.user = User.objects.create_user(username="stateless", password="testpass123", email="s@example.com")
+        self.org = Organization.objects.create(
+            name="Stateless Org", org_type=Organization.OrgType.SME, nation="TR", founding_date=date(2020, 1, 1)
+        )
+        response = self.client.post(
+            '/api/userbase/auth/jwt/', {'username': 'stateless', 'password': 'testpass123'}
+        )
+        self.access = response.data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def assertNoUserLoad(self, queries):
+        user_table = connection.ops.quote_name(User._meta.db_table)
+        password = f'{user_table}.{connection.ops.quote_name("password")}'
+        self.assertFalse([query['sql'] for query in queries if password in query['sql']])
+
+    def test_follow(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/userbase/follow/{self.org.slug}/')
+            self.client.post('/api/userbase/follow-batch/', {'unfollow': [self.org.slug]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNoUserLoad(queries)
+        self.assertFalse(self.user.followed_organizations.exists())
+
+    def test_followed_organizations(self):
+        """Test the list is the same as with the user loaded"""
+        self.user.followed_organizations.add(self.org)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/userbase/followed-organizations/')
+        self.assertNoUserLoad(queries)
+        with self.settings(JWT_STATELESS=0):
+            expected = self.client.get('/api/userbase/followed-organizations/')
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response.data['results'][0]['slug'], self.org.slug)
+
+    def test_deleted_user(self):
+        """Test the token of a deleted user is a 401 and writes nothing"""
+        self.user.delete()
+        response = self.client.get('/api/userbase/followed-organizations/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        view = async_read_view(followed_organizations, None)
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self.assertEqual(async_to_sync(view)(request).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(f'/api/userbase/follow/{self.org.slug}/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/api/userbase/follow-batch/', {'follow': [self.org.slug]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Follow.objects.exists())
+        self.org.refresh_from_db()
+        self.assertEqual(self.org.follower_count, 0)
+
+    def test_async(self):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        with self.assertNumQueries(0):
+            user, _ = async_to_sync(aauthenticate)(request, stateless=True)
+        self.assertIsInstance(user, TokenUser)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_token_user(self):
+        """Test claims are read from the token and other fields from the row"""
+        user = TokenUser(AccessToken(self.access))
+        with self.assertNumQueries(0):
+            self.assertEqual((user.pk, user.username, user.is_staff, user.follow_version), (self.user.pk, "stateless", False, 0))
+        with self.assertNumQueries(1):
+            self.assertEqual((user.email, user.date_joined), (self.user.email, self.user.date_joined))
+        # Tokens without the claims
+        user = TokenUser(AccessToken.for_user(self.user))
+        self.assertEqual(user.username, "stateless")
+        # Attributes that are neither claims nor row_fields
+        with self.assertNumQueries(0):
+            self.assertFalse(hasattr(user, "password"))
+            self.assertFalse(hasattr(user, "missing"))
+
+    def test_other_views_load_user(self):
+        response = self.client.get('/api/userbase/auth/user/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], "s@example.com")
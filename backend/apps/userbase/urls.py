@@ -1,18 +1,31 @@
+from django.conf import settings
 from django.urls import path, include
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from core.views import async_read_view
 from .views import (
     CustomRegisterView,
     FollowOrganizationView,
     UnfollowOrganizationView,
+    FollowBatchView,
     FollowedOrganizationsListView
 )
+from .views.asynchronous import followed_organizations
+
+followed_organizations_view = FollowedOrganizationsListView.as_view()
+if settings.ASYNC_VIEWS:
+    followed_organizations_view = async_read_view(followed_organizations, followed_organizations_view)
 
 urlpatterns = [
     # Registration
     path("auth/registration/", CustomRegisterView.as_view(), name="custom_register"),
+    # JWT pair with the user claims, and its refresh
+    path("auth/jwt/", TokenObtainPairView.as_view(), name="jwt_obtain_pair"),
+    path("auth/jwt/refresh/", TokenRefreshView.as_view(), name="jwt_refresh"),
     # Login/logout etc.
     path("auth/", include("dj_rest_auth.urls")),
     # Follow / Unfollow
+    path("follow-batch/", FollowBatchView.as_view(), name="follow_batch"),
     path("follow/<slug:slug>/", FollowOrganizationView.as_view(), name="follow_organization"),
     path("unfollow/<slug:slug>/", UnfollowOrganizationView.as_view(), name="unfollow_organization"),
-    path("followed-organizations/", FollowedOrganizationsListView.as_view(), name="followed_organizations"),
+    path("followed-organizations/", followed_organizations_view, name="followed_organizations"),
 ]
@@ -1,2 +1,4 @@
 from .user import CustomRegisterView
-from .follow import FollowOrganizationView, UnfollowOrganizationView, FollowedOrganizationsListView
+from .follow import (
+    FollowOrganizationView, UnfollowOrganizationView, FollowBatchView, FollowedOrganizationsListView
+)
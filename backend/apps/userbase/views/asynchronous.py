@@ -0,0 +1,47 @@
+"""
+Async GET of the followed organizations list (see core/views/asynchronous.py).
+
+It answers like FollowedOrganizationsListView, whose queryset, validator and
+serialization helpers it shares, with the user, the counters and the page
+read through the async ORM.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework.request import Request
+
+from core.authentication import aauthenticate
+from core.views import api_response, not_modified, set_validators
+from userbase.models import User
+from userbase.serializers import FollowedOrganizationSerializer
+from userbase.views.follow import FollowedOrganizationsListView
+
+
+async def followed_organizations(request, **kwargs):
+    """
+    List organizations followed by the user, one keyset page at a time.
+    """
+    user, auth = await aauthenticate(request, stateless=True)
+    if not user.is_authenticated:
+        raise NotAuthenticated()
+    view = FollowedOrganizationsListView
+    fields = FollowedOrganizationSerializer.parse_sparse_fields(request.GET)
+    queryset, columns = view.read_rows(user.pk, fields)
+
+    try:
+        version, count = await User.objects.filter(pk=user.pk).values_list(
+            "follow_version", "followed_count"
+        ).aget()
+    except User.DoesNotExist as e:
+        # A stateless JWT of a deleted user
+        raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+    paginator = view.pagination_class()
+    page = await paginator.apaginate_queryset(queryset, Request(request))
+
+    etag, last_modified = view.get_page_validators(request, user.pk, version, page, columns)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    data = view.get_page_data(paginator, count, view.serialize_rows(page, fields, columns))
+    return set_validators(api_response(data), etag, last_modified)
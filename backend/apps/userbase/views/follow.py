@@ -1,60 +1,202 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 from organization.models import Organization
-from userbase.serializers import FollowedOrganizationSerializer
+from organization.serializers import row_columns, build_rows
+from userbase.serializers import FollowedOrganizationSerializer, FollowBatchSerializer
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from django.db.models import F
+from core.authentication import StatelessUserMixin
+from core.renderers import FastJSONRendererMixin
+from core.views import compute_etag, set_validators, not_modified
+from userbase.models import User
+from userbase.follows import Follow, follow, unfollow, follow_batch
+from userbase.pagination import FollowedOrganizationsPagination
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class FollowOrganizationView(APIView):
+class FollowOrganizationView(StatelessUserMixin, APIView):
     """Add organization to user's followed list"""
     permission_classes = [IsAuthenticated]
 
     def post(self, request, slug):
-        user = request.user
-        org = get_object_or_404(Organization, slug=slug)
-        # Check if already following
-        if user.followed_organizations.filter(slug=slug).exists():
+        org_id, org_name = get_object_or_404(Organization.objects.values_list("pk", "name"), slug=slug)
+        # The conditional insert tells whether the user was already following
+        if not follow(request.user.pk, org_id):
             return Response(
-                {"detail": f"You are already following {org.name}"},
+                {"detail": f"You are already following {org_name}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        user.followed_organizations.add(org)
-        return Response({"detail": f"Followed {org.name}"}, status=status.HTTP_200_OK)
+        return Response({"detail": f"Followed {org_name}"}, status=status.HTTP_200_OK)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class UnfollowOrganizationView(APIView):
+class UnfollowOrganizationView(StatelessUserMixin, APIView):
     """Remove organization from user's followed list"""
     permission_classes = [IsAuthenticated]
 
     def post(self, request, slug):
-        user = request.user
-        org = get_object_or_404(Organization, slug=slug)
-        # Check if not following
-        if not user.followed_organizations.filter(slug=slug).exists():
+        org_id, org_name = get_object_or_404(Organization.objects.values_list("pk", "name"), slug=slug)
+        # The conditional delete tells whether the user was following
+        if not unfollow(request.user.pk, org_id):
             return Response(
-                {"detail": f"You are not following {org.name}"},
+                {"detail": f"You are not following {org_name}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        user.followed_organizations.remove(org)
-        return Response({"detail": f"Unfollowed {org.name}"}, status=status.HTTP_200_OK)
+        return Response({"detail": f"Unfollowed {org_name}"}, status=status.HTTP_200_OK)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class FollowedOrganizationsListView(APIView):
-    """List all organizations followed by the user"""
+class FollowBatchView(StatelessUserMixin, APIView):
+    """Follow and unfollow several organizations in one request"""
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        user = request.user
-        followed_orgs = user.followed_organizations.all()
-        serializer = FollowedOrganizationSerializer(followed_orgs, many=True)
+    def post(self, request):
+        serializer = FollowBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        follow_slugs = serializer.validated_data["follow"]
+        unfollow_slugs = serializer.validated_data["unfollow"]
+
+        # Resolve every slug with a single query
+        ids = dict(
+            Organization.objects.filter(slug__in={*follow_slugs, *unfollow_slugs}).values_list("slug", "pk")
+        )
+        followed, unfollowed = follow_batch(
+            request.user.pk,
+            follow_ids=[ids[slug] for slug in follow_slugs if slug in ids],
+            unfollow_ids=[ids[slug] for slug in unfollow_slugs if slug in ids],
+        )
+
+        results = {}
+        for slug in follow_slugs:
+            if slug not in ids:
+                results[slug] = "not_found"
+            else:
+                results[slug] = "followed" if ids[slug] in followed else "already_following"
+        for slug in unfollow_slugs:
+            if slug not in ids:
+                results[slug] = "not_found"
+            else:
+                results[slug] = "unfollowed" if ids[slug] in unfollowed else "not_following"
         return Response({
-            "count": followed_orgs.count(),
-            "results": serializer.data
-        })
+            "followed": len(followed),
+            "unfollowed": len(unfollowed),
+            "results": results
+        }, status=status.HTTP_200_OK)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class FollowedOrganizationsListView(StatelessUserMixin, FastJSONRendererMixin, APIView):
+    """List organizations followed by the user, one keyset page at a time"""
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, BrowsableAPIRenderer]
+    pagination_class = FollowedOrganizationsPagination
+
+    def get_queryset(self, fields=None):
+        """
+        Return the follow rows of the user with only the organization
+        columns ``fields`` (every serialized field by default) read, and the
+        name to page on.
+        """
+        return self.get_follows_queryset(self.request.user.pk, fields)
+
+    @staticmethod
+    def get_follows_queryset(user_id, fields=None):
+        """
+        get_queryset() of the user ``user_id``.
+        """
+        columns = FollowedOrganizationSerializer.get_sparse_columns(
+            fields or FollowedOrganizationSerializer.Meta.fields
+        )
+        return Follow.objects.filter(user_id=user_id).select_related(
+            "organization"
+        ).only(
+            "id", "organization", *(f"organization__{column}" for column in columns)
+        ).annotate(name=F("organization__name"))
+
+    @staticmethod
+    def get_rows_queryset(user_id, columns):
+        """
+        Return the follow rows of a user as values_list() tuples of the
+        organization ``columns``, with the follow id and the name to page on.
+        """
+        return Follow.objects.filter(user_id=user_id).annotate(
+            name=F("organization__name")
+        ).values_list("id", "name", *columns, named=True)
+
+    @classmethod
+    def read_rows(cls, user_id, fields=None):
+        """
+        Return ``(queryset, columns)`` to read the follow rows of a page for
+        serialize_rows(). With ORGANIZATION_FAST_LIST the queryset gives
+        values_list() tuples of the organization ``columns``, see
+        organization/serializers/rows.py; otherwise model instances and
+        ``columns`` is None.
+        """
+        if not settings.ORGANIZATION_FAST_LIST:
+            return cls.get_follows_queryset(user_id, fields), None
+        columns = row_columns(fields or FollowedOrganizationSerializer.Meta.fields, prefix="organization__")
+        return cls.get_rows_queryset(user_id, columns), columns
+
+    @staticmethod
+    def get_page_validators(request, user_id, version, page, columns):
+        """
+        Return the (etag, last_modified) of a page: they cover the follow set
+        and the organizations of the page.
+        """
+        if columns is None:
+            versions = [(row.organization.pk, row.organization.updated_at) for row in page]
+        else:
+            versions = [(row.organization__id, row.organization__updated_at) for row in page]
+        last_modified = max((updated_at for _, updated_at in versions), default=None)
+        etag = compute_etag(
+            user_id, version, request.get_full_path(),
+            *((pk, updated_at.timestamp()) for pk, updated_at in versions), weak=True
+        )
+        return etag, last_modified
+
+    @staticmethod
+    def serialize_rows(page, fields, columns):
+        """
+        Return the serialized organizations of follow rows read with read_rows().
+        """
+        if columns is None:
+            organizations = [row.organization for row in page]
+            return FollowedOrganizationSerializer(organizations, many=True, context={"fields": fields}).data
+        fields = fields or FollowedOrganizationSerializer.Meta.fields
+        return build_rows(page, fields, ("id", "name", *columns), prefix="organization__")
+
+    @staticmethod
+    def get_page_data(paginator, count, results):
+        return {
+            "count": count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": results
+        }
+
+    def get(self, request):
+        fields = FollowedOrganizationSerializer.parse_sparse_fields(request.query_params)
+        queryset, columns = self.read_rows(request.user.pk, fields)
+
+        # The counters are maintained on the user row, no COUNT(*) is needed
+        version, count = User.objects.filter(pk=request.user.pk).values_list(
+            "follow_version", "followed_count"
+        ).get()
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+
+        # An unchanged page is answered with 304 before serializing
+        etag, last_modified = self.get_page_validators(request, request.user.pk, version, page, columns)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        data = self.get_page_data(paginator, count, self.serialize_rows(page, fields, columns))
+        return set_validators(Response(data), etag, last_modified)
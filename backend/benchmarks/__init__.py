@@ -0,0 +1,19 @@
+"""
+Benchmarks for the OrgTracker backend.
+
+Each module is a standalone script that runs against the database configured
+in ``config.settings`` (use a disposable database, they insert rows):
+
+    cd backend
+    python -m benchmarks.organization_filters --rows 1000000
+"""
+import os
+
+
+def setup():
+    """
+    Configure Django for a benchmark script run outside manage.py.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    django.setup()
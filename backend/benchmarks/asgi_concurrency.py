@@ -0,0 +1,227 @@
+"""
+Throughput and latency of the organization list under concurrent
+connections, served by the WSGI application (sync views, a fixed pool of
+worker threads) and by the ASGI application (async views, ASYNC_VIEWS=1).
+
+    python -m benchmarks.asgi_concurrency --rows 10000 --concurrency 1 16 64 256
+
+Requests are fed to ``config.wsgi.application`` / ``config.asgi.application``
+in-process, without a server or sockets, so the numbers compare the request
+handling paths only. Each mode runs in its own process, since ASYNC_VIEWS is
+read when the URLconf is loaded; both build the list from values_list() rows
+(ORGANIZATION_FAST_LIST=1), as the async views always do.
+
+With a local SQLite database the requests are CPU bound and the WSGI threads
+come out ahead; ``--query-latency`` adds a round trip to every query, as a
+database over the network does, which is where connections waiting on I/O
+stop holding a worker thread.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import setup
+
+PATH = "/api/organizations/"
+QUERY = "country=TR&pagination=cursor"
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def run_wsgi(concurrency, duration, threads):
+    """
+    Keep ``concurrency`` requests in flight against the WSGI application,
+    handled by ``threads`` worker threads.
+    """
+    from config.wsgi import application
+
+    def request():
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": PATH,
+            "QUERY_STRING": QUERY,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "8000",
+            "HTTP_HOST": "localhost",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+        }
+        statuses = []
+        body = application(environ, lambda status, headers: statuses.append(status))
+        try:
+            b"".join(body)
+        finally:
+            body.close()
+        assert statuses[0].startswith("200"), statuses[0]
+
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    executor = ThreadPoolExecutor(max_workers=threads)
+
+    def client():
+        # One connection: a request is queued, then waited for
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            executor.submit(request).result()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+    return summarize(latencies, elapsed)
+
+
+def run_asgi(concurrency, duration):
+    """
+    Keep ``concurrency`` requests in flight against the ASGI application,
+    all on one event loop.
+    """
+    from config.asgi import application
+
+    async def request():
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": PATH,
+            "raw_path": PATH.encode(),
+            "query_string": QUERY.encode(),
+            "headers": [(b"host", b"localhost")],
+            "server": ("localhost", 8000),
+            "client": ("127.0.0.1", 50000),
+        }
+        messages = []
+        body = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            # The body, then nothing until the connection closes, like a server
+            if body:
+                return body.pop()
+            await asyncio.Event().wait()
+
+        async def send(message):
+            messages.append(message)
+
+        await application(scope, receive, send)
+        assert messages[0]["status"] == 200, messages[0]["status"]
+
+    async def main():
+        latencies = []
+        deadline = time.perf_counter() + duration
+
+        async def client():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await request()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return summarize(latencies, time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+
+def worker(args):
+    """
+    Run one mode in this process and print its results as JSON.
+    """
+    setup()
+    from django.db.backends.signals import connection_created
+    from organization import cache
+
+    if args.query_latency:
+        def delay(execute, sql, params, many, context):
+            time.sleep(args.query_latency / 1000)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            # Sent on every reconnect of a thread's connection
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        connection_created.connect(add_delay, weak=False)
+
+    results = {}
+    for concurrency in args.concurrency:
+        cache.bump_generation()
+        if args.mode == "wsgi":
+            results[concurrency] = run_wsgi(concurrency, args.duration, args.threads)
+        else:
+            results[concurrency] = run_asgi(concurrency, args.duration)
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per concurrency level")
+    parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads (default: 8)")
+    parser.add_argument("--query-latency", type=float, default=0, help="Milliseconds added to every query")
+    parser.add_argument("--mode", choices=["wsgi", "asgi"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        return worker(args)
+
+    setup()
+    from django.db import connection
+    from benchmarks.organization_filters import seed
+
+    print(f"Backend: {connection.vendor}")
+    print(f"Seeded {seed(args.rows)} organizations")
+    connection.close()
+
+    results = {}
+    for mode, async_views in (("wsgi", "0"), ("asgi", "1")):
+        command = [
+            sys.executable, "-m", "benchmarks.asgi_concurrency", "--mode", mode,
+            "--duration", str(args.duration), "--threads", str(args.threads),
+            "--query-latency", str(args.query_latency),
+            "--concurrency", *map(str, args.concurrency),
+        ]
+        output = subprocess.run(
+            command, env={**os.environ, "ASYNC_VIEWS": async_views, "ORGANIZATION_FAST_LIST": "1"},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"\nGET {PATH}?{QUERY} (WSGI: {args.threads} threads, query latency: {args.query_latency:g} ms)")
+    print(f"{'connections':>12} {'WSGI req/s':>11} {'p50 ms':>8} {'p99 ms':>8} {'ASGI req/s':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in map(str, args.concurrency):
+        wsgi, asgi = results["wsgi"][concurrency], results["asgi"][concurrency]
+        print(
+            f"{concurrency:>12} {wsgi['rps']:>11,.0f} {wsgi['p50']:>8.1f} {wsgi['p99']:>8.1f}"
+            f" {asgi['rps']:>11,.0f} {asgi['p50']:>8.1f} {asgi['p99']:>8.1f}"
+        )
+    print("\nThe ORGANIZATION_CACHE_TIMEOUT response cache (off by default) serves repeated pages when enabled.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Per-request cost of opening database connections: a connection per request
+(the default), persistent connections (SQL_CONN_MAX_AGE), with health checks
+(SQL_CONN_HEALTH_CHECKS) and, on PostgreSQL, the psycopg pool (SQL_POOL),
+with its own check of each connection it hands out (SQL_CONN_HEALTH_CHECKS
+sets the pool's ``check`` callback, Django's health check skips pools).
+
+    python -m benchmarks.db_connections --rows 1000 --threads 8 --duration 5
+
+Requests are fed to ``config.wsgi.application`` in-process from ``--threads``
+threads, each one sending requests back to back, so the connection handling
+of the request cycle (close_old_connections()) runs as under a threaded
+server. Each mode runs in its own process, since DATABASES is read at
+startup. The response cache is off (ORGANIZATION_CACHE_TIMEOUT=0) so every
+request queries, and the page is built from values_list() rows
+(ORGANIZATION_FAST_LIST=1) so that connecting is a visible share of it.
+
+Connecting to a local SQLite file is nearly free; ``--connect-latency`` adds
+a delay to every new connection, like the TCP, TLS and authentication round
+trips of a remote server. It is not applied to the pool, which only exists on
+PostgreSQL, where the latency is real.
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks import setup
+
+PATH = "/api/organizations/"
+QUERY = "page_size=5"
+
+MODES = {
+    "per-request": {"SQL_CONN_MAX_AGE": "0"},
+    "persistent": {"SQL_CONN_MAX_AGE": "60"},
+    "persistent+checks": {"SQL_CONN_MAX_AGE": "60", "SQL_CONN_HEALTH_CHECKS": "1"},
+    "pool": {"SQL_POOL": "1"},
+    "pool+check": {"SQL_POOL": "1", "SQL_CONN_HEALTH_CHECKS": "1"},
+}
+
+
+def request(application):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": PATH,
+        "QUERY_STRING": QUERY,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "8000",
+        "HTTP_HOST": "localhost",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+    statuses = []
+    body = application(environ, lambda status, headers: statuses.append(status))
+    try:
+        b"".join(body)
+    finally:
+        body.close()
+    assert statuses[0].startswith("200"), statuses[0]
+
+
+def worker(args):
+    """
+    Run one mode in this process and print its results as JSON.
+    """
+    setup()
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from config.wsgi import application
+
+    pooled = connection.vendor == "postgresql" and connection.pool is not None
+    created = []
+
+    def count(sender, connection, **kwargs):
+        # Also sent for every connection taken from the pool
+        created.append(1)
+        if args.connect_latency and not pooled:
+            time.sleep(args.connect_latency / 1000)
+
+    connection_created.connect(count, weak=False)
+
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            request(application)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(args.threads)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    connects = connection.pool.get_stats()["connections_num"] if pooled else len(created)
+    print(json.dumps({
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "mean": sum(latencies) / len(latencies) * 1000,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "connects": connects,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--threads", type=int, default=8, help="Request threads (default: 8)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode (default: 5)")
+    parser.add_argument(
+        "--connect-latency", type=float, default=0,
+        help="Milliseconds added to every new connection, not pooled ones (default: 0)",
+    )
+    parser.add_argument("--modes", nargs="+", choices=MODES, help="Modes to run (default: all available)")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        return worker(args)
+
+    setup()
+    from django.db import connection
+    from benchmarks.organization_filters import seed
+
+    print(f"Backend: {connection.vendor}")
+    print(f"Seeded {seed(args.rows)} organizations")
+    connection.close()
+
+    modes = args.modes or [
+        mode for mode in MODES if connection.vendor == "postgresql" or not mode.startswith("pool")
+    ]
+    results = {}
+    for mode in modes:
+        command = [
+            sys.executable, "-m", "benchmarks.db_connections", "--mode", mode,
+            "--threads", str(args.threads), "--duration", str(args.duration),
+            "--connect-latency", str(args.connect_latency),
+        ]
+        env = {
+            **os.environ, "SQL_CONN_HEALTH_CHECKS": "0", "SQL_POOL": "0",
+            "ORGANIZATION_CACHE_TIMEOUT": "0", "ORGANIZATION_FAST_LIST": "1", **MODES[mode],
+        }
+        output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    baseline = results.get("per-request")
+    print(f"\nGET {PATH}?{QUERY} ({args.threads} threads, connect latency: {args.connect_latency:g} ms)")
+    print(
+        f"{'mode':<18} {'requests':>9} {'req/s':>9} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8}"
+        f" {'connects':>9} {'per request':>11} {'saved ms':>9}"
+    )
+    for mode, result in results.items():
+        saved = f"{baseline['mean'] - result['mean']:.3f}" if baseline else "-"
+        print(
+            f"{mode:<18} {result['requests']:>9} {result['rps']:>9,.0f} {result['mean']:>8.3f}"
+            f" {result['p50']:>8.3f} {result['p99']:>8.3f} {result['connects']:>9}"
+            f" {result['connects'] / result['requests']:>11.3f} {saved:>9}"
+        )
+    print("\n'saved ms' is the mean latency gained over a connection per request.")
+
+
+if __name__ == "__main__":
+    main()
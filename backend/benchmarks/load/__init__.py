@@ -0,0 +1,25 @@
+"""
+Load scenarios against the real URL routes of the API, at production data
+sizes.
+
+    python -m benchmarks.load run --orgs 1000000 --users 100000 --output before.json
+    python -m benchmarks.load run --transport http --concurrency 64 --output after.json
+    python -m benchmarks.load compare before.json after.json
+
+``run`` tops the database up to ``--orgs`` organizations and ``--users``
+users following ``--follows`` organizations each, then sends ``--requests``
+requests of every scenario (scenarios.py) from ``--concurrency`` threads. The
+requests go through the WSGI application in-process (``--transport
+inprocess``), to a threaded server started in a subprocess (``--transport
+http``) or to a running server sharing the database and SECRET_KEY
+(``--url``). Each scenario reports latency percentiles, throughput, errors
+and database queries per request; ``--output`` stores them with the data
+set size, commit and settings of the run.
+
+``compare`` prints the changes between two stored runs and exits with status
+1 on a regression: p95 latency or throughput worse by more than
+``--threshold`` percent, more queries per request, or more errors.
+
+Settings come from the environment as usual, e.g. CACHE_BACKEND=db and
+ORGANIZATION_CACHE_TIMEOUT=300 to measure with the response cache.
+"""
@@ -0,0 +1,135 @@
+import argparse
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks import setup
+from benchmarks.load import __doc__ as description
+from benchmarks.load.scenarios import SCENARIOS
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    setup()
+    import django
+    from django.conf import settings
+    from django.db import connection
+    from benchmarks.load import data, results
+    from benchmarks.load.runner import HTTPTransport, InProcessTransport, LocalServerTransport, run_scenario
+    from benchmarks.organization_filters import seed
+
+    print(f"Backend: {connection.vendor}")
+    print(f"Seeded {seed(args.orgs)} organizations, {data.seed_users(args.users, args.follows, args.seed)} users")
+    fixtures = data.load_fixtures(args.seed)
+    dataset = data.describe()
+    print(", ".join(f"{count} {name}" for name, count in dataset.items()))
+    connection.close()
+
+    if args.url:
+        transport = HTTPTransport(args.url)
+    elif args.transport == "http":
+        transport = LocalServerTransport()
+    else:
+        transport = InProcessTransport()
+
+    scenarios = {}
+    try:
+        for name in args.scenarios:
+            latencies, statuses, elapsed, served = run_scenario(
+                transport, name, fixtures, args.requests, args.concurrency, args.seed, args.warmup
+            )
+            scenarios[name] = results.summarize(latencies, statuses, SCENARIOS[name][1], elapsed, served)
+            print(f"{name}: {scenarios[name]['throughput']} req/s")
+    finally:
+        transport.close()
+
+    print()
+    print(results.format_table(scenarios))
+    if args.output:
+        results.save(args.output, {
+            "meta": {
+                "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "transport": args.url or transport.name,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "warmup": args.warmup,
+                "seed": args.seed,
+                "database": connection.vendor,
+                "dataset": dataset,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "settings": {
+                    "ORGANIZATION_FAST_LIST": settings.ORGANIZATION_FAST_LIST,
+                    "ORGANIZATION_CACHE_TIMEOUT": settings.ORGANIZATION_CACHE_TIMEOUT,
+                    "ASYNC_VIEWS": settings.ASYNC_VIEWS,
+                    "CACHE_BACKEND": settings.CACHES["default"]["BACKEND"],
+                },
+            },
+            "scenarios": scenarios,
+        })
+        print(f"\nResults written to {args.output}")
+
+
+def compare(args):
+    from benchmarks.load import results
+
+    table, regressions = results.compare(results.load(args.baseline), results.load(args.current), args.threshold)
+    print(table)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {'; '.join(regressions)}")
+        sys.exit(1)
+
+
+def serve(args):
+    setup()
+    from benchmarks.load.runner import serve
+
+    serve(args.port)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=description.strip().splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_run = commands.add_parser("run", help="Run scenarios")
+    parser_run.add_argument("--orgs", type=int, default=10_000, help="Organizations to top up to")
+    parser_run.add_argument("--users", type=int, default=1_000, help="Benchmark users to top up to")
+    parser_run.add_argument("--follows", type=int, default=20, help="Organizations followed per new user")
+    parser_run.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser_run.add_argument("--requests", type=int, default=1_000, help="Recorded requests per scenario")
+    parser_run.add_argument("--warmup", type=int, default=50, help="Unrecorded requests per scenario")
+    parser_run.add_argument("--concurrency", type=int, default=8, help="Client threads")
+    parser_run.add_argument("--transport", choices=["inprocess", "http"], default="inprocess")
+    parser_run.add_argument("--url", help="Base URL of a running server, instead of --transport")
+    parser_run.add_argument("--seed", type=int, default=1)
+    parser_run.add_argument("--output", help="JSON file to store the results in")
+    parser_run.set_defaults(handler=run)
+
+    parser_compare = commands.add_parser("compare", help="Compare two stored runs")
+    parser_compare.add_argument("baseline")
+    parser_compare.add_argument("current")
+    parser_compare.add_argument("--threshold", type=float, default=10.0, help="Percent (default: 10)")
+    parser_compare.set_defaults(handler=compare)
+
+    parser_serve = commands.add_parser("serve", help=argparse.SUPPRESS)
+    parser_serve.add_argument("--port", type=int, required=True)
+    parser_serve.set_defaults(handler=serve)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Data set of the load scenarios: organizations, users and their follows,
+topped up to the requested sizes, and the fixtures (slugs, user tokens) the
+scenarios pick from.
+"""
+import random
+from datetime import timedelta
+
+USER_PREFIX = "bench-user-"
+
+
+def seed_users(users, follows, seed, batch_size=10000):
+    """
+    Insert benchmark users until there are ``users`` of them, each following
+    up to ``follows`` organizations, popular ones more often. Return the
+    number of users inserted.
+    """
+    from django.db import transaction
+    from django.db.models import Count, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+    from django.utils import timezone
+    from organization.models import Organization
+    from userbase.follows import Follow
+    from userbase.models import User
+    from userbase.passwords import encode_password, fast_hasher
+
+    existing = User.objects.filter(username__startswith=USER_PREFIX).count()
+    if existing >= users:
+        return 0
+
+    organization_ids = list(Organization.objects.order_by("pk").values_list("pk", flat=True))
+    # Same password for everyone, hashed once
+    password = encode_password(fast_hasher(), "bench-password")
+    now = timezone.now()
+    for start in range(existing, users, batch_size):
+        stop = min(start + batch_size, users)
+        with transaction.atomic():
+            created = User.objects.bulk_create(
+                User(
+                    username=f"{USER_PREFIX}{i}",
+                    email=f"{USER_PREFIX}{i}@example.com",
+                    password=password,
+                    date_joined=now,
+                )
+                for i in range(start, stop)
+            )
+            rows = []
+            for i, user in enumerate(created, start):
+                rng = random.Random(f"{seed}-{i}")
+                # Skewed towards the first organizations
+                followed = {
+                    organization_ids[int(len(organization_ids) * rng.random() ** 3)]
+                    for _ in range(min(follows, len(organization_ids)))
+                }
+                rows.extend(Follow(user_id=user.pk, organization_id=pk) for pk in followed)
+            Follow.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+
+    # Recount the maintained counters once, instead of per follow
+    def count(field):
+        return Coalesce(
+            Subquery(
+                Follow.objects.filter(**{field: OuterRef("pk")})
+                .order_by().values(field).annotate(total=Count("*")).values("total")
+            ),
+            0,
+        )
+
+    with transaction.atomic():
+        User.objects.filter(username__startswith=USER_PREFIX).update(followed_count=count("user"))
+        Organization.objects.update(follower_count=count("organization"))
+    return users - existing
+
+
+def load_fixtures(seed, size=500):
+    """
+    Return the organization slugs and bearer tokens of benchmark users the
+    scenarios pick from, the same for a given seed and data set.
+    """
+    from organization.models import Organization
+    from rest_framework_simplejwt.tokens import AccessToken
+    from userbase.models import User
+
+    rng = random.Random(seed)
+    organization_ids = list(Organization.objects.order_by("pk").values_list("pk", flat=True))
+    sample = rng.sample(organization_ids, min(size, len(organization_ids)))
+    slugs = sorted(Organization.objects.filter(pk__in=sample).values_list("slug", flat=True))
+
+    users = User.objects.filter(username__startswith=USER_PREFIX, followed_count__gt=0).order_by("pk")
+    user_ids = list(users.values_list("pk", flat=True))
+    tokens = []
+    for user in User.objects.filter(pk__in=rng.sample(user_ids, min(size, len(user_ids)))).order_by("pk"):
+        token = AccessToken.for_user(user)
+        # Outlive long runs
+        token.set_exp(lifetime=timedelta(days=1))
+        tokens.append(str(token))
+    return {"slugs": slugs, "tokens": tokens}
+
+
+def describe():
+    """
+    Return the size of the data set.
+    """
+    from organization.models import Organization
+    from userbase.follows import Follow
+    from userbase.models import User
+
+    return {
+        "organizations": Organization.objects.count(),
+        "users": User.objects.count(),
+        "follows": Follow.objects.count(),
+    }
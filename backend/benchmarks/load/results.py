@@ -0,0 +1,119 @@
+"""
+Summaries of load runs, their JSON files and the comparison of two runs.
+"""
+import json
+import statistics
+from collections import Counter
+
+
+def percentiles(latencies):
+    """
+    Return the mean, p50, p95, p99 and max of ``latencies`` in milliseconds.
+    """
+    values = sorted(latency * 1000 for latency in latencies)
+    if not values:
+        return None
+    if len(values) == 1:
+        cuts = values * 99
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "mean": round(statistics.fmean(values), 3),
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "max": round(values[-1], 3),
+    }
+
+
+def summarize(latencies, statuses, expected, elapsed, served):
+    """
+    Return the result of one scenario, as stored in the JSON file.
+    """
+    counts = Counter("error" if status is None else str(status) for status in statuses)
+    errors = sum(count for status, count in counts.items() if status == "error" or int(status) not in expected)
+    queries = None
+    if served and served[1]:
+        queries = round(served[0] / served[1], 2)
+    return {
+        "requests": len(statuses),
+        "errors": errors,
+        "statuses": dict(sorted(counts.items())),
+        "throughput": round(len(statuses) / elapsed, 1) if elapsed else None,
+        "latency_ms": percentiles(latencies),
+        "queries_per_request": queries,
+    }
+
+
+def format_table(scenarios):
+    lines = [
+        f"{'scenario':<24} {'requests':>8} {'errors':>6} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>7}"
+    ]
+    for name, result in scenarios.items():
+        latency = result["latency_ms"] or {}
+        queries = result["queries_per_request"]
+        lines.append(
+            f"{name:<24} {result['requests']:>8} {result['errors']:>6} {result['throughput'] or 0:>9,.1f} "
+            f"{latency.get('p50', 0):>8.2f} {latency.get('p95', 0):>8.2f} {latency.get('p99', 0):>8.2f} "
+            f"{'-' if queries is None else f'{queries:g}':>7}"
+        )
+    return "\n".join(lines)
+
+
+def save(path, run):
+    with open(path, "w") as file:
+        json.dump(run, file, indent=2)
+        file.write("\n")
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(baseline, current, threshold):
+    """
+    Return the comparison table of two runs and the regressions found: p95
+    latency up or throughput down by more than ``threshold`` percent, more
+    queries per request, or new errors.
+    """
+    def change(before, after):
+        return (after - before) / before * 100 if before else 0.0
+
+    lines = []
+    differences = [
+        key for key in ("transport", "concurrency", "requests", "database", "dataset", "settings")
+        if baseline["meta"].get(key) != current["meta"].get(key)
+    ]
+    if differences:
+        lines.append(f"Runs differ in {', '.join(differences)}, the numbers are not like for like\n")
+    lines.append(f"{'scenario':<24} {'p95 ms':>21} {'':>8} {'req/s':>21} {'':>8} {'queries':>13}")
+    regressions = []
+    for name, after in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None or not before["latency_ms"] or not after["latency_ms"]:
+            lines.append(f"{name:<24} (not in both runs)")
+            continue
+        p95 = (before["latency_ms"]["p95"], after["latency_ms"]["p95"])
+        rps = (before["throughput"] or 0, after["throughput"] or 0)
+        queries = (before["queries_per_request"], after["queries_per_request"])
+
+        flags = []
+        if change(*p95) > threshold:
+            flags.append("p95")
+        if -change(*rps) > threshold:
+            flags.append("throughput")
+        if None not in queries and queries[1] > queries[0]:
+            flags.append("queries")
+        if after["errors"] > before["errors"]:
+            flags.append("errors")
+        regressions.extend(f"{name}: {flag}" for flag in flags)
+
+        shown = "-" if None in queries else f"{queries[0]:g} -> {queries[1]:g}"
+        lines.append(
+            f"{name:<24} {p95[0]:>9.2f} -> {p95[1]:>8.2f} {change(*p95):>+7.1f}% "
+            f"{rps[0]:>9,.1f} -> {rps[1]:>8,.1f} {change(*rps):>+7.1f}% {shown:>13}"
+            + (f"  REGRESSION ({', '.join(flags)})" if flags else "")
+        )
+    return "\n".join(lines), regressions
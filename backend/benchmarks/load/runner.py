@@ -0,0 +1,228 @@
+"""
+Transports and the scenario loop of the load runner.
+
+A transport sends one request and returns its status, and reports the
+database queries served so far as ``(queries, requests)`` from the request
+metrics (core/metrics.py): read in-process, or scraped from ``/metrics``
+over HTTP (None when the server has no metrics).
+"""
+import http.client
+import io
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks.load.scenarios import build_request
+
+
+def parse_query_totals(text):
+    """
+    Return ``(queries, requests)`` summed over the http_request_db_queries
+    series of a /metrics page, the scrapes excluded.
+    """
+    queries = requests = 0
+    for line in text.splitlines():
+        if 'view="metrics"' in line:
+            continue
+        if line.startswith("http_request_db_queries_sum{"):
+            queries += float(line.rsplit(" ", 1)[1])
+        elif line.startswith("http_request_db_queries_count{"):
+            requests += int(line.rsplit(" ", 1)[1])
+    return queries, requests
+
+
+class InProcessTransport:
+    """
+    Call the WSGI application of this process, from the runner threads.
+    """
+    name = "inprocess"
+
+    def __init__(self):
+        from django.conf import settings
+        from django.core.handlers.wsgi import WSGIHandler
+
+        # Queries per request come from the metrics, read before the
+        # middleware chain is built
+        settings.METRICS_ENABLED = 1
+        self.application = WSGIHandler()
+
+    def request(self, method, path, query, token):
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "HTTP_HOST": "localhost",
+            "CONTENT_LENGTH": "0",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+        }
+        if token:
+            environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        statuses = []
+        body = self.application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return int(statuses[0].split()[0])
+
+    def query_totals(self):
+        from core import metrics
+
+        queries = requests = 0
+        for (name, labels), value in metrics.collect().items():
+            if name == "http_request_db_queries" and labels[0] != "metrics":
+                queries += value[-1]
+                requests += sum(value[:-1])
+        return queries, requests
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """
+    Send the requests to a server over HTTP, one keep-alive connection per
+    runner thread.
+    """
+    name = "http"
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.url = url
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.local = threading.local()
+
+    def connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+    def request(self, method, path, query, token):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        target = f"{path}?{query}" if query else path
+        connection = getattr(self.local, "connection", None) or self.connect()
+        self.local.connection = connection
+        for attempt in range(2):
+            try:
+                connection.request(method, target, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, ConnectionError) as exc:
+                # Closed by the server between two requests, retry once
+                connection.close()
+                if attempt:
+                    raise ConnectionError(f"{method} {target}: {exc!r}") from exc
+
+    def query_totals(self):
+        connection = self.connect()
+        try:
+            connection.request("GET", "/metrics")
+            response = connection.getresponse()
+            text = response.read().decode()
+        except OSError:
+            return None
+        finally:
+            connection.close()
+        return parse_query_totals(text) if response.status == 200 else None
+
+    def close(self):
+        pass
+
+
+class LocalServerTransport(HTTPTransport):
+    """
+    HTTPTransport to a threaded WSGI server started in a subprocess (so
+    that it does not share the GIL with the runner), with metrics enabled.
+    """
+
+    def __init__(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.load", "serve", "--port", str(port)],
+            env={**os.environ, "METRICS_ENABLED": "1", "METRICS_DIR": ""},
+        )
+        super().__init__(f"http://127.0.0.1:{port}")
+
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection((self.host, self.port), timeout=1).close()
+                break
+            except OSError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.close()
+                    raise RuntimeError("The benchmark server did not start")
+                time.sleep(0.1)
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def serve(port):
+    """
+    Serve the WSGI application on ``port`` with a thread per connection,
+    like runserver without its logging and autoreloader.
+    """
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+
+    class Handler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    class Server(ThreadedWSGIServer):
+        request_queue_size = 1024
+
+    server = Server(("127.0.0.1", port), Handler)
+    server.set_app(get_wsgi_application())
+    server.serve_forever()
+
+
+def run_scenario(transport, name, fixtures, requests, concurrency, seed, warmup=0):
+    """
+    Send ``requests`` requests of a scenario from ``concurrency`` threads,
+    after ``warmup`` unrecorded ones. Request ``i`` is built from a generator
+    seeded with (seed, name, i), so runs send the same requests whatever the
+    concurrency.
+
+    Return the latencies (seconds), the statuses (None for failed
+    connections), the elapsed time and the ``(queries, requests)`` served
+    during the run, None when the transport cannot tell.
+    """
+    def send(index):
+        rng = random.Random(f"{seed}-{name}-{index}")
+        request = build_request(name, rng, fixtures)
+        started = time.perf_counter()
+        try:
+            status = transport.request(*request)
+        except OSError:
+            status = None
+        return time.perf_counter() - started, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(-warmup, 0)))
+        before = transport.query_totals()
+        started = time.perf_counter()
+        results = list(executor.map(send, range(requests)))
+        elapsed = time.perf_counter() - started
+    after = transport.query_totals()
+
+    served = None
+    if before is not None and after is not None:
+        served = (after[0] - before[0], after[1] - before[1])
+    latencies = [latency for latency, _ in results]
+    statuses = [status for _, status in results]
+    return latencies, statuses, elapsed, served
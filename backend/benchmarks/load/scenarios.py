@@ -0,0 +1,75 @@
+"""
+Scenarios of the load runner.
+
+Each scenario builds one request from a random generator and the fixtures of
+the run (see data.load_fixtures) and lists the statuses it expects; any other
+status counts as an error. A request is ``(method, path, query, token)``,
+``token`` being the bearer token to send, or None.
+"""
+from urllib.parse import urlencode
+
+from benchmarks.organization_filters import NATIONS, WORDS
+
+
+def organization_list(rng, fixtures):
+    return "GET", "/api/organizations/", {"page": rng.randint(1, 10)}, None
+
+
+def organization_filter(rng, fixtures):
+    params = {
+        "country": rng.choice(NATIONS),
+        "org_type": rng.randint(0, 3),
+        "headcount_max": rng.choice([10, 50, 500]),
+    }
+    return "GET", "/api/organizations/", params, None
+
+
+def organization_search(rng, fixtures):
+    return "GET", "/api/organizations/", {"q": rng.choice(WORDS)}, None
+
+
+def organization_cursor(rng, fixtures):
+    params = {"pagination": "cursor", "country": rng.choice(NATIONS)}
+    return "GET", "/api/organizations/", params, None
+
+
+def organization_detail(rng, fixtures):
+    return "GET", f"/api/organizations/{rng.choice(fixtures['slugs'])}/", {}, None
+
+
+def organization_facets(rng, fixtures):
+    return "GET", "/api/organizations/facets/", {"country": rng.choice(NATIONS)}, None
+
+
+def followed_organizations(rng, fixtures):
+    params = {"ordering": "name"} if rng.random() < 0.5 else {}
+    return "GET", "/api/userbase/followed-organizations/", params, rng.choice(fixtures["tokens"])
+
+
+def follow_unfollow(rng, fixtures):
+    # Half follows, half unfollows of random pairs: the 400s are the pairs
+    # already (not) followed
+    action = rng.choice(["follow", "unfollow"])
+    path = f"/api/userbase/{action}/{rng.choice(fixtures['slugs'])}/"
+    return "POST", path, {}, rng.choice(fixtures["tokens"])
+
+
+# name: (build, expected statuses)
+SCENARIOS = {
+    "organization-list": (organization_list, {200}),
+    "organization-filter": (organization_filter, {200}),
+    "organization-search": (organization_search, {200}),
+    "organization-cursor": (organization_cursor, {200}),
+    "organization-detail": (organization_detail, {200}),
+    "organization-facets": (organization_facets, {200}),
+    "followed-organizations": (followed_organizations, {200}),
+    "follow-unfollow": (follow_unfollow, {200, 400}),
+}
+
+
+def build_request(name, rng, fixtures):
+    """
+    Return the next ``(method, path, query string, token)`` of a scenario.
+    """
+    method, path, params, token = SCENARIOS[name][0](rng, fixtures)
+    return method, path, urlencode(params), token
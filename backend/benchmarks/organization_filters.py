@@ -0,0 +1,178 @@
+"""
+Query plans and latencies of the organization list filters, with and
+without the indexes declared on Organization.
+
+    python -m benchmarks.organization_filters --rows 1000000 --repeat 5
+
+The table is topped up to ``--rows`` organizations first. Every scenario is
+run twice: once after dropping the indexes, once after re-creating them.
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+from datetime import date, timedelta
+
+from benchmarks import setup
+
+SCENARIOS = [
+    ("name search", {"name": "tech"}),
+    ("full-text search", {"q": "tech glob"}),
+    ("type filter", {"org_type": "2,3"}),
+    ("country", {"country": "TR"}),
+    ("country + type + headcount", {"country": "TR", "org_type": "2", "headcount_max": "50"}),
+    ("country + founding range", {
+        "country": "US", "founding_date_from": "2000-01-01", "founding_date_to": "2010-12-31"
+    }),
+    ("headcount range", {"headcount_min": "1000", "headcount_max": "5000"}),
+]
+
+NATIONS = ["US", "TR", "DE", "GB", "FR", "NL", "JP", "IN", "BR", "CA"]
+WORDS = ["tech", "global", "labs", "group", "systems", "foods", "energy", "civic", "health", "media"]
+
+
+def seed(rows, batch_size=10000):
+    """
+    Insert organizations until the table holds ``rows`` of them.
+
+    Rows are written with plain INSERTs so that slug generation does not
+    dominate the setup time.
+    """
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from organization.models import Organization
+
+    existing = Organization.objects.count()
+    missing = rows - existing
+    if missing <= 0:
+        return 0
+
+    rng = random.Random(rows)
+    now = timezone.now()
+    table = connection.ops.quote_name(Organization._meta.db_table)
+    sql = (
+        f"INSERT INTO {table} (name, slug, logo, logo_variants, org_type, nation, founding_date, "
+        f"headcount, follower_count, created_at, updated_at) "
+        f"VALUES (%s, %s, '', '{{}}', %s, %s, %s, %s, 0, %s, %s)"
+    )
+    for start in range(existing, rows, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, rows)):
+            name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}"
+            suffix = "".join(rng.choices(string.ascii_lowercase, k=4))
+            batch.append((
+                name[:50],
+                f"bench-{i}-{suffix}",
+                rng.randint(0, 3),
+                rng.choice(NATIONS),
+                date(1950, 1, 1) + timedelta(days=rng.randint(0, 27000)),
+                None if rng.random() < 0.1 else int(rng.paretovariate(1.2) * 5),
+                now,
+                now,
+            ))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+    return missing
+
+
+def build_queryset(params):
+    """
+    Return the queryset OrganizationViewSet.list would run for ``params``.
+    """
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from organization.views import OrganizationViewSet
+
+    view = OrganizationViewSet()
+    view.request = Request(APIRequestFactory().get("/api/organizations/", params))
+    return view.get_queryset()
+
+
+def measure(queryset, repeat):
+    """
+    Time the two queries of a list page: the COUNT and the first page.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        queryset.count()
+        list(queryset[:20])
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def set_indexes(enabled):
+    """
+    Create or drop every index declared for the organization filters.
+    """
+    from django.db import connection
+    from organization.indexes import create_name_trigram_index, drop_name_trigram_index
+    from organization.models import Organization
+    from organization.search import create_search_index, drop_search_index
+
+    with connection.cursor() as cursor:
+        existing = connection.introspection.get_constraints(cursor, Organization._meta.db_table)
+    for index in Organization._meta.indexes:
+        if (index.name in existing) == enabled:
+            continue  # already in the requested state
+        # One schema editor per statement: on PostgreSQL a failed DDL aborts
+        # the editor's transaction, and errors must not hide a wrong index set
+        with connection.schema_editor() as editor:
+            if enabled:
+                editor.add_index(Organization, index)
+            else:
+                editor.remove_index(Organization, index)
+    if enabled:
+        create_name_trigram_index(connection)
+        create_search_index(connection)
+    else:
+        drop_name_trigram_index(connection)
+        drop_search_index(connection)
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(Organization._meta.db_table)}")
+
+
+def run(repeat, show_plans):
+    from django.db import connection
+
+    analyze = {"analyze": True} if connection.vendor == "postgresql" else {}
+    results = {}
+    for label, enabled in (("without indexes", False), ("with indexes", True)):
+        set_indexes(enabled)
+        print(f"\n== {label} ==")
+        for name, params in SCENARIOS:
+            queryset = build_queryset(params)
+            latency = measure(queryset, repeat)
+            results.setdefault(name, {})[label] = latency
+            print(f"{name:<30} {latency:10.2f} ms")
+            if show_plans:
+                print(queryset[:20].explain(**analyze))
+                print()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-plans", action="store_true", help="Skip EXPLAIN output")
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+
+    print(f"Backend: {connection.vendor}")
+    inserted = seed(args.rows)
+    print(f"Seeded {inserted} organizations")
+    results = run(args.repeat, not args.no_plans)
+
+    print("\n== summary (median ms, count + first page) ==")
+    for name, timings in results.items():
+        before, after = timings["without indexes"], timings["with indexes"]
+        print(f"{name:<30} {before:10.2f} -> {after:10.2f}  ({before / max(after, 1e-6):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
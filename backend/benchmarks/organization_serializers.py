@@ -0,0 +1,79 @@
+"""
+Rows per second of an organization list page through OrganizationSerializer
+and through the values_list() fast path (ORGANIZATION_FAST_LIST).
+
+    python -m benchmarks.organization_serializers --rows 10000 --repeat 20
+
+Each page size is read, serialized and rendered to JSON both ways; the two
+outputs are checked to be byte-identical before timing.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks import setup
+from benchmarks.organization_filters import seed
+
+PAGE_SIZES = (20, 100, 1000)
+
+
+def serializer_page(queryset, size, request):
+    from rest_framework.renderers import JSONRenderer
+    from organization.serializers import OrganizationSerializer
+
+    data = OrganizationSerializer(list(queryset[:size]), many=True, context={"request": request}).data
+    return JSONRenderer().render(data)
+
+
+def fast_page(queryset, size, request):
+    from core.renderers import FastJSONRenderer
+    from organization.serializers import OrganizationSerializer, build_rows, row_columns
+
+    fields = OrganizationSerializer.Meta.fields
+    columns = row_columns(fields)
+    rows = list(queryset.values_list(*columns, named=True)[:size])
+    return FastJSONRenderer().render(build_rows(rows, fields, columns, request.build_absolute_uri))
+
+
+def measure(func, queryset, size, request, repeat):
+    """
+    Return the median rows per second of ``func`` over ``repeat`` runs.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(queryset, size, request)
+        timings.append(time.perf_counter() - started)
+    return size / statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from organization.models import Organization
+
+    print(f"Backend: {connection.vendor}")
+    inserted = seed(max(args.rows, max(PAGE_SIZES)))
+    print(f"Seeded {inserted} organizations")
+
+    request = Request(APIRequestFactory().get("/api/organizations/"))
+    queryset = Organization.objects.order_by("name", "id")
+
+    print(f"\n{'page size':>10} {'serializer':>14} {'fast path':>14}  (rows/s, read + serialize + render)")
+    for size in PAGE_SIZES:
+        if serializer_page(queryset, size, request) != fast_page(queryset, size, request):
+            raise SystemExit(f"Outputs differ at page size {size}")
+        slow = measure(serializer_page, queryset, size, request, args.repeat)
+        fast = measure(fast_page, queryset, size, request, args.repeat)
+        print(f"{size:>10} {slow:>14,.0f} {fast:>14,.0f}  ({fast / slow:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
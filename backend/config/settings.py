@@ -14,6 +14,7 @@ import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
+from django.core.exceptions import ImproperlyConfigured
 
 # -------------------------------
 # BASE DIRECTORY
@@ -78,6 +79,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',  # Unused unless METRICS_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Enable CORS
@@ -90,7 +92,7 @@ MIDDLEWARE = [
 
 # CSRF middleware active for production
 if not DEBUG:
-    MIDDLEWARE.insert(3, 'django.middleware.csrf.CsrfViewMiddleware')
+    MIDDLEWARE.insert(4, 'django.middleware.csrf.CsrfViewMiddleware')
 
 
 # URL & WSGI
@@ -119,6 +121,7 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+_conn_max_age = int(os.environ.get("SQL_CONN_MAX_AGE", default=0))
 DATABASES = {
     "default": {
         "ENGINE": os.environ.get("SQL_ENGINE", "django.db.backends.sqlite3"),
@@ -127,9 +130,85 @@ DATABASES = {
         "PASSWORD": os.environ.get("SQL_PASSWORD", "password"),
         "HOST": os.environ.get("SQL_HOST", "localhost"),
         "PORT": os.environ.get("SQL_PORT", "5432"),
+        # Seconds a connection is reused by the requests of a thread (0 = one
+        # connection per request, -1 = unlimited), checked before reuse with
+        # SQL_CONN_HEALTH_CHECKS (Django skips this check with SQL_POOL)
+        "CONN_MAX_AGE": _conn_max_age if _conn_max_age >= 0 else None,
+        "CONN_HEALTH_CHECKS": bool(int(os.environ.get("SQL_CONN_HEALTH_CHECKS", default=0))),
     }
 }
 
+# PostgreSQL: connect timeout and, with SQL_POOL, a psycopg 3 connection pool
+# per process (SQL_POOL_MIN_SIZE to SQL_POOL_MAX_SIZE connections, waited for
+# at most SQL_POOL_TIMEOUT seconds). The pool replaces persistent connections.
+# Django does not apply CONN_HEALTH_CHECKS to it: SQL_CONN_HEALTH_CHECKS gives
+# the pool its own check of connections before handing them out
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"]["OPTIONS"] = {
+        "connect_timeout": int(os.environ.get("SQL_CONNECT_TIMEOUT", default=10)),
+    }
+    if int(os.environ.get("SQL_POOL", default=0)):
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("SQL_POOL_MIN_SIZE", default=2)),
+            "max_size": int(os.environ.get("SQL_POOL_MAX_SIZE", default=10)),
+            "timeout": float(os.environ.get("SQL_POOL_TIMEOUT", default=30)),
+        }
+        if DATABASES["default"]["CONN_HEALTH_CHECKS"]:
+            from psycopg_pool import ConnectionPool
+
+            DATABASES["default"]["OPTIONS"]["pool"]["check"] = ConnectionPool.check_connection
+
+
+# -------------------------------
+# CACHE
+# -------------------------------
+# CACHE_BACKEND selects the cache: "locmem" (default), "db" (table created by
+# `manage.py createcachetable`) or "file". CACHE_LOCATION overrides its location.
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "orgtracker"),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "django_cache"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "cache")),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[os.environ.get("CACHE_BACKEND", "locmem")]
+CACHES = {
+    "default": {
+        "BACKEND": _cache_backend,
+        "LOCATION": os.environ.get("CACHE_LOCATION", _cache_location),
+    }
+}
+
+# Organization list/detail response cache, 0 disables it (default). Writes
+# from any process (workers, run_jobs, loaders) invalidate it through a counter
+# stored in the cache itself, so it needs a cache shared by the processes:
+# CACHE_BACKEND "db" or "file", not "locmem"
+ORGANIZATION_CACHE_ALIAS = "default"
+ORGANIZATION_CACHE_TIMEOUT = int(os.environ.get("ORGANIZATION_CACHE_TIMEOUT", 0))
+if ORGANIZATION_CACHE_TIMEOUT > 0 and _cache_backend == CACHE_BACKENDS["locmem"][0]:
+    raise ImproperlyConfigured(
+        "ORGANIZATION_CACHE_TIMEOUT needs a cache shared by the processes, set CACHE_BACKEND to db or file."
+    )
+
+
+# -------------------------------
+# BACKGROUND JOBS
+# -------------------------------
+# Jobs are stored in the database and run by `manage.py run_jobs`, see
+# core/jobs.py. JOBS_EAGER runs them in the enqueuing process on commit
+# (development without a worker)
+JOBS_EAGER = int(os.environ.get("JOBS_EAGER", default=0))
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_BACKOFF = 30  # seconds before the first retry, doubled per attempt
+JOBS_HEARTBEAT_INTERVAL = 60  # seconds between refreshes of the lock of a running job
+JOBS_LOCK_TIMEOUT = 600  # seconds without a refresh after which a running job is considered dead
+JOBS_RETENTION_DAYS = 7
+
+# Scheduled by the cron container (`manage.py crontab add`)
+CRONJOBS = [
+    ("* * * * *", "django.core.management.call_command", ["run_jobs"], {"burst": True, "max_time": 55}),
+    ("30 3 * * *", "core.jobs.purge_finished_jobs"),
+    ("0 4 * * *", "django.core.management.call_command", ["reconcile_follower_counts"]),
+]
 
 # -------------------------------
 # AUTHENTICATION
@@ -159,18 +238,44 @@ AUTH_PASSWORD_VALIDATORS = [
 # REST FRAMEWORK GLOBAL SETTINGS
 # -------------------------------
 REST_FRAMEWORK = {
+    # DRF / simplejwt classes that also authenticate async views
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.TokenAuthentication",
+        "core.authentication.SessionAuthentication",
+        "core.authentication.JWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.AsyncPageNumberPagination",
     "PAGE_SIZE": 20,
 }
 
+# Build organization list pages from values_list() rows instead of model
+# instances and serializers, same output (see organization/serializers/rows.py)
+ORGANIZATION_FAST_LIST = int(os.environ.get("ORGANIZATION_FAST_LIST", default=0))
+
+# Serve GET of the organization list/detail and of the followed organizations
+# with async views, for ASGI deployments (see config/asgi.py)
+ASYNC_VIEWS = int(os.environ.get("ASYNC_VIEWS", default=0))
+
+# Per-view latency, query and response size metrics, served at /metrics in
+# the Prometheus text format (see core/metrics.py). With METRICS_DIR, the
+# processes of a server add up their metrics through files of that directory
+METRICS_ENABLED = int(os.environ.get("METRICS_ENABLED", default=0))
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", default=1))
+
+# Token and JWT users resolved from an in-process cache for AUTH_CACHE_TIMEOUT
+# seconds (0 = off, the default), at most AUTH_CACHE_MAX_ENTRIES entries (see
+# core/auth_cache.py). With AUTH_CACHE_ALIAS, also from that cache shared by
+# the processes, for AUTH_CACHE_SHARED_TIMEOUT seconds. Logouts and
+# deactivations reach other processes once their local entry expires
+AUTH_CACHE_TIMEOUT = int(os.environ.get("AUTH_CACHE_TIMEOUT", default=0))
+AUTH_CACHE_MAX_ENTRIES = int(os.environ.get("AUTH_CACHE_MAX_ENTRIES", default=10000))
+AUTH_CACHE_ALIAS = os.environ.get("AUTH_CACHE_ALIAS", "")
+AUTH_CACHE_SHARED_TIMEOUT = int(os.environ.get("AUTH_CACHE_SHARED_TIMEOUT", default=600))
+
 
 # -------------------------------
 # DJANGO ALLAUTH SETTINGS
@@ -212,8 +317,19 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    # Tokens carry the claims of core.authentication.TokenUser
+    'TOKEN_OBTAIN_SERIALIZER': 'userbase.serializers.jwt.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'userbase.serializers.jwt.TokenRefreshSerializer',
+}
+REST_AUTH = {
+    'JWT_TOKEN_CLAIMS_SERIALIZER': 'userbase.serializers.jwt.TokenObtainPairSerializer',
 }
 
+# Authenticate JWT requests of the follow endpoints from the token claims,
+# without loading the user row (see core.authentication.StatelessUserMixin).
+# A deactivated user keeps access until the access token expires
+JWT_STATELESS = int(os.environ.get("JWT_STATELESS", default=0))
+
 # -------------------------------
 # INTERNATIONALIZATION
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -232,6 +348,9 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "mediafiles"
 
+# Organization logo uploads, see organization/logos.py
+ORGANIZATION_LOGO_MAX_BYTES = int(os.environ.get("ORGANIZATION_LOGO_MAX_BYTES", 5 * 1024 * 1024))
+
 
 # -------------------------------
 # DEFAULT AUTO FIELD
@@ -48,4 +48,7 @@ urlpatterns = [
     # API endpoints
     path('api/', include('apps.organization.urls')),
     path("api/userbase/", include("userbase.urls")),
+
+    # Prometheus metrics
+    path("", include("core.urls")),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)